@@ -0,0 +1,277 @@
+# llm_ddx_control_app/analysis.py
+# 연구 종료 후 결과 파일(results/*_control_*, *_case_*)을 모아 채점용 DDx 테이블을 만드는 오프라인 파이프라인.
+#   python -m llm_ddx_control_app.analysis results --out analysis_out --format parquet --workers 4
+#
+# - 파일은 청크 단위로 읽고(.csv) 줄 단위로 읽어(.jsonl) 전체를 한 번에 메모리에 올리지 않습니다.
+# - 중복 제거는 render_download_button과 같은 규칙: save_ns > timestamp > 파일 순서로 정렬 후 키별 마지막 행.
+# - 파일별 처리는 프로세스 풀로 병렬화하고, 결과(파일별 최신 행)만 모아 합칩니다.
+# - {root}/events/ 에 타이밍 이벤트(timing.py)가 있으면 증례별 체류 시간 테이블(case_dwell)도 만듭니다.
+#   이벤트도 청크별로 부분 집계(방문 수/체류 합/최초 시각)만 남기고 합칩니다.
+# - 로컬 백엔드가 sqlite면 결과 파일로 내보내지 않은(마무리 전) 행이 DB에만 있으므로 백엔드에서도 읽습니다.
+
+import os
+import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from llm_ddx_control_app.config import LOCAL_RESULT_FORMAT
+from llm_ddx_control_app.parsing import parse_listish_series
+from llm_ddx_control_app.storage import LOCAL_BACKENDS, local_backend
+
+KEY_COLS = ["arm", "participant_id", "file_name"]
+DEFAULT_PATTERNS = ["*_control_*.csv", "*_case_*.csv", "*_control_*.jsonl", "*_case_*.jsonl"]
+EVENTS_SUBDIR = "events"  # config.TIMING_EVENTS_DIR (결과 디렉터리 기준)
+SUMMARY_OPTIONAL_COLS = ["seconds", "case_seconds"]
+DWELL_COLS = ["arm", "participant_id", "session_uuid", "case_id", "visits", "dwell_seconds", "first_input_seconds"]
+
+
+def find_result_files(root: str, patterns: List[str] = DEFAULT_PATTERNS) -> List[str]:
+    files = set()
+    for pat in patterns:
+        files.update(glob.glob(os.path.join(root, pat)))
+    return sorted(files)
+
+
+def _iter_chunks(path: str, chunksize: int):
+    if path.endswith(".jsonl"):
+        buf = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    buf.append(json.loads(line))
+                except ValueError:
+                    continue  # 잘린 줄
+                if len(buf) >= chunksize:
+                    yield pd.DataFrame(buf)
+                    buf = []
+        if buf:
+            yield pd.DataFrame(buf)
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype={"participant_id": str, "file_name": str})
+
+
+def _latest_in_chunks(chunks, source: str, default_arm: str) -> List[Dict]:
+    """청크 스트림에서 (arm, participant_id, file_name)별 마지막 행 (keep="last" 규칙)."""
+    best: Dict[Tuple, Tuple[Tuple, Dict]] = {}
+    offset = 0
+    for chunk in chunks:
+        if "arm" not in chunk.columns:
+            chunk["arm"] = default_arm
+        for col in KEY_COLS:
+            chunk[col] = chunk[col].astype(str) if col in chunk.columns else ""
+        # 파일 안 정렬 기준: save_ns가 있으면 save_ns, 없으면 timestamp (sort_values처럼 결측은 뒤로)
+        sort_col = "save_ns" if "save_ns" in chunk.columns else ("timestamp" if "timestamp" in chunk.columns else None)
+        for pos, rec in enumerate(chunk.to_dict(orient="records")):
+            v = rec.get(sort_col) if sort_col else None
+            missing = v is None or (isinstance(v, float) and pd.isna(v))
+            order = (missing, 0 if missing else (v if sort_col == "save_ns" else str(v)), offset + pos)
+            key = tuple(rec[c] for c in KEY_COLS)
+            cur = best.get(key)
+            if cur is None or order >= cur[0]:
+                best[key] = (order, rec)
+        offset += len(chunk)
+    return [dict(rec, __source__=source) for _, rec in best.values()]
+
+
+def latest_rows_in_file(path: str, chunksize: int = 50_000) -> List[Dict]:
+    """파일 하나에서 (arm, participant_id, file_name)별 마지막 행 (keep="last" 규칙)."""
+    name = os.path.basename(path)
+    return _latest_in_chunks(_iter_chunks(path, chunksize), name, "case" if "_case_" in name else "control")
+
+
+def latest_rows_in_backend(kind: str, root: str, chunksize: int = 50_000) -> List[Dict]:
+    """파일로 남지 않는 백엔드(sqlite)의 행을 read_rows()로 청크 단위로 읽어 키별 마지막 행."""
+    def chunks():
+        buf = []
+        for row in local_backend(kind, root).read_rows():
+            buf.append(row)
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf)
+
+    return _latest_in_chunks(chunks(), kind, "control")
+
+
+def collect_latest(files: List[str], workers: int = 1, chunksize: int = 50_000,
+                   extra: Optional[List[List[Dict]]] = None) -> pd.DataFrame:
+    """모든 파일(과 extra로 받은 백엔드 행)의 최신 행을 합치고, 파일 간에도 같은 키는 마지막 행만 유지."""
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(latest_rows_in_file, files, [chunksize] * len(files)))
+    else:
+        parts = [latest_rows_in_file(p, chunksize) for p in files]
+    parts += extra or []
+    rows = [r for part in parts for r in part]
+    if not rows:
+        return pd.DataFrame(columns=KEY_COLS)
+    # 파일 간: timestamp 순(같으면 파일 순서)으로 정렬 후 마지막 행
+    df = pd.DataFrame(rows)
+    if "timestamp" in df.columns:
+        df = df.sort_values("timestamp", kind="stable", key=lambda s: s.astype(str))
+    df = df.drop_duplicates(subset=KEY_COLS, keep="last")
+    return df.reset_index(drop=True)
+
+
+def add_timing(df: pd.DataFrame) -> pd.DataFrame:
+    """seconds(세션 시작 후 누적 경과)로 증례별 소요 시간(case_seconds) 계산."""
+    if df.empty or "seconds" not in df.columns:
+        return df.assign(case_seconds=pd.Series(dtype=float))
+    df = df.copy()
+    df["seconds"] = pd.to_numeric(df["seconds"], errors="coerce")
+    if "case_index" in df.columns:
+        df["case_index"] = pd.to_numeric(df["case_index"], errors="coerce")
+    else:
+        df["case_index"] = range(len(df))
+    group = [c for c in ("arm", "participant_id", "session_uuid") if c in df.columns]
+    df = df.sort_values(group + ["case_index"], kind="stable")
+    prev = df.groupby(group, sort=False)["seconds"].shift(1).fillna(0)
+    df["case_seconds"] = (df["seconds"] - prev).clip(lower=0)
+    return df
+
+
+DWELL_GROUP = DWELL_COLS[:4]
+_DWELL_AGG = {"visits": "sum", "dwell_ms": "sum", "first_enter_ms": "min", "first_input_ms": "min"}
+
+
+def _dwell_partial(events: pd.DataFrame) -> pd.DataFrame:
+    """이벤트 청크 하나의 부분 집계 (그룹별 leave 수/dwell_ms 합, 최초 enter/first_input 시각)."""
+    group = DWELL_GROUP
+    ev = events.copy()
+    for col in group:
+        ev[col] = ev[col].astype(str) if col in ev.columns else ""
+    ev["t_ms"] = pd.to_numeric(ev["t_ms"], errors="coerce")
+    ev["dwell_ms"] = pd.to_numeric(ev.get("dwell_ms"), errors="coerce") if "dwell_ms" in ev.columns else 0.0
+    leaves = ev[ev["event"] == "leave"].groupby(group).agg(visits=("event", "size"), dwell_ms=("dwell_ms", "sum"))
+    first_enter = ev[ev["event"] == "enter"].groupby(group)["t_ms"].min().rename("first_enter_ms")
+    first_input = ev[ev["event"] == "first_input"].groupby(group)["t_ms"].min().rename("first_input_ms")
+    return leaves.join(first_enter, how="outer").join(first_input, how="outer")
+
+
+def case_dwell(events, chunked: bool = False) -> pd.DataFrame:
+    """타이밍 이벤트로 증례별 누적 체류 시간(leave의 dwell_ms 합), 방문 수, 첫 진입→첫 입력 시간 계산.
+
+    chunked=True면 events는 DataFrame 청크의 iterable이며, 청크별 부분 집계만 메모리에 남깁니다.
+    """
+    parts = [_dwell_partial(c) for c in (events if chunked else [events]) if not c.empty and "event" in c.columns]
+    if not parts:
+        return pd.DataFrame(columns=DWELL_COLS)
+    out = pd.concat(parts).groupby(level=list(range(len(DWELL_GROUP)))).agg(_DWELL_AGG)
+    out = out[(out["visits"] > 0) | out["first_enter_ms"].notna()]  # leave나 enter가 있는 증례만
+    out["visits"] = out["visits"].fillna(0).astype(int)
+    out["dwell_seconds"] = out["dwell_ms"].fillna(0) / 1000
+    out["first_input_seconds"] = (out["first_input_ms"] - out["first_enter_ms"]) / 1000
+    return out.reset_index()[DWELL_COLS]
+
+
+def explode_ddx(df: pd.DataFrame) -> pd.DataFrame:
+    """entered_ddx_list를 (행 하나당 진단 하나) long 테이블로 펼침."""
+    if df.empty or "entered_ddx_list" not in df.columns:
+        return df.assign(ddx_rank=pd.Series(dtype=int), ddx=pd.Series(dtype=str))
+    out = df.copy()
+    out["ddx"] = parse_listish_series(out["entered_ddx_list"])
+    out["n_ddx"] = out["ddx"].map(len)
+    out = out.explode("ddx", ignore_index=True)
+    out["ddx_rank"] = out.groupby(KEY_COLS, sort=False).cumcount() + 1
+    out.loc[out["ddx"].isna(), "ddx_rank"] = 0
+    return out
+
+
+def add_reference_match(long_df: pd.DataFrame, index_prefix: str) -> pd.DataFrame:
+    """ddx_long의 각 진단을 참조 어휘 인덱스(ddx_index)로 매칭해 대표명/점수 컬럼 추가."""
+    from llm_ddx_control_app.ddx_index import DdxIndex
+
+    idx = DdxIndex(index_prefix)
+    texts = long_df["ddx"].fillna("").astype(str)
+    matched = idx.match_many(texts)
+    return long_df.assign(
+        ddx_concept=[m[0] for m in matched],
+        ddx_match_score=[m[1] for m in matched],
+        ddx_match_method=[m[2] for m in matched],
+    )
+
+
+def summarize(latest: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """증례별/참가자별 요약. 이전 형식 파일처럼 seconds 등이 없으면 해당 지표는 NaN."""
+    n_ddx = parse_listish_series(latest["entered_ddx_list"]).map(len) if "entered_ddx_list" in latest else float("nan")
+    base = latest.assign(n_ddx=n_ddx)
+    for col in SUMMARY_OPTIONAL_COLS:
+        base[col] = pd.to_numeric(base[col], errors="coerce") if col in base.columns else float("nan")
+    per_case = base.groupby(["arm", "file_name"], as_index=False).agg(
+        participants=("participant_id", "nunique"),
+        mean_n_ddx=("n_ddx", "mean"),
+        median_case_seconds=("case_seconds", "median"),
+        mean_case_seconds=("case_seconds", "mean"),
+    )
+    per_participant = base.groupby(["arm", "participant_id"], as_index=False).agg(
+        cases=("file_name", "nunique"),
+        total_seconds=("seconds", "max"),
+        mean_case_seconds=("case_seconds", "mean"),
+        mean_n_ddx=("n_ddx", "mean"),
+    )
+    return {"per_case": per_case, "per_participant": per_participant}
+
+
+def _write(df: pd.DataFrame, out_dir: str, name: str, fmt: str) -> str:
+    path = os.path.join(out_dir, f"{name}.{fmt}")
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)  # pyarrow 또는 fastparquet 필요
+    else:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+def run(root: str, out_dir: str, fmt: str = "csv", workers: int = 1, chunksize: int = 50_000,
+        patterns: Optional[List[str]] = None, reference: Optional[str] = None,
+        backend: str = LOCAL_RESULT_FORMAT) -> Dict[str, str]:
+    files = find_result_files(root, patterns or DEFAULT_PATTERNS)
+    extra = None
+    if backend not in LOCAL_BACKENDS:  # csv/journal은 위 파일 스캔이 곧 백엔드 내용
+        extra = [latest_rows_in_backend(backend, root, chunksize)]
+    latest = add_timing(collect_latest(files, workers, chunksize, extra))
+    long_df = explode_ddx(latest)
+    if reference and not long_df.empty:
+        long_df = add_reference_match(long_df, reference)
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = {
+        "latest": _write(latest, out_dir, "latest", fmt),
+        "ddx_long": _write(long_df, out_dir, "ddx_long", fmt),
+    }
+    if not latest.empty:
+        for name, table in summarize(latest).items():
+            outputs[name] = _write(table, out_dir, name, fmt)
+    event_files = find_result_files(os.path.join(root, EVENTS_SUBDIR), ["*.jsonl"])
+    if event_files:
+        chunks = (c for p in event_files for c in _iter_chunks(p, chunksize))
+        outputs["case_dwell"] = _write(case_dwell(chunks, chunked=True), out_dir, "case_dwell", fmt)
+    return outputs
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="결과 파일을 모아 참가자/증례별 최신 답안과 DDx long 테이블 생성")
+    ap.add_argument("root", nargs="?", default="results")
+    ap.add_argument("--out", default="analysis_out")
+    ap.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunksize", type=int, default=50_000)
+    ap.add_argument("--pattern", action="append", help="파일 glob (여러 번 지정 가능)")
+    ap.add_argument("--reference", help="ddx_index로 빌드한 참조 어휘 인덱스 prefix (지정 시 진단 매칭)")
+    ap.add_argument("--backend", choices=["csv", "journal", "sqlite"], default=LOCAL_RESULT_FORMAT,
+                    help="연구 중 사용한 로컬 저장 백엔드 (sqlite면 DB의 행도 읽음)")
+    args = ap.parse_args(argv)
+    outputs = run(args.root, args.out, args.format, args.workers, args.chunksize, args.pattern, args.reference,
+                  args.backend)
+    for name, path in outputs.items():
+        print(f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,31 +9,14 @@ if str(PROJECT_ROOT) not in sys.path:
 import os
 import time
 import uuid
+import json
+import math
 import hashlib
-from typing import List
-from datetime import datetime, date
+from typing import List, Optional
+from datetime import datetime, date, timedelta
 
-import pandas as pd
 import streamlit as st
 
-# === dependency-free auto-refresh every N ms (keeps timer live) ===
-def auto_refresh(enabled: bool, interval_ms: int = 1000):
-    if not enabled:
-        return
-    st.markdown(
-        f"""
-        <script>
-        const __key = "st_js_autorefresh_{interval_ms}";
-        if (!window[__key]) {{
-          window[__key] = setInterval(() => {{
-            window.parent.postMessage({{isStreamlitMessage: true, type: "rerun"}}, "*");
-          }}, {interval_ms});
-        }}
-        </script>
-        """,
-        unsafe_allow_html=True,
-    )
-
 # --- app-specific imports (CONTROL) ---
 from llm_ddx_control_app.config import (
     APP_TITLE,
@@ -41,19 +24,50 @@ from llm_ddx_control_app.config import (
     REQUIRE_AT_LEAST,
     REQUIRE_AT_MOST,
     AUTOSAVE_SEC,
+    AUTOSAVE_ON_CHANGE_ONLY,
+    LAZY_CASE_LOADING,
+    ADMIN_QUERY_PARAM,
+    TIMING_EVENTS,
+)
+from llm_ddx_control_app.case_sets import open_case_set
+from llm_ddx_control_app.checkpoint import resumable
+from llm_ddx_control_app.data_io import (
+    read_uploaded_csv,
+    open_case_source,
+    case_keys_for_frame,
+    case_cache_info,
+    upload_digest,
 )
-from llm_ddx_control_app.data_io import read_uploaded_csv
-from llm_ddx_control_app.persistence import build_row, save_progress
+from llm_ddx_control_app.hpi_edits import HpiEditStore
+from llm_ddx_control_app.metrics import REGISTRY, Metrics, start_exporter, timer
+from llm_ddx_control_app.persistence import (
+    build_row,
+    save_progress,
+    save_events,
+    save_session_meta,
+    flush_progress,
+    load_resume_state,
+)
+from llm_ddx_control_app.results_index import get_index
+from llm_ddx_control_app.session_store import SessionResultStore
+from llm_ddx_control_app.timing import TimingLog
+from llm_ddx_control_app.warmup import start_warmup
+from llm_ddx_control_app.write_behind import get_writer
 
 
 # ---------------------
 # CSV 다운로드 헬퍼
 # ---------------------
+def _result_store() -> SessionResultStore:
+    if "result_store" not in st.session_state:
+        st.session_state["result_store"] = SessionResultStore()
+    return st.session_state["result_store"]
+
 def _append_buffer(row: dict):
-    """세션 버퍼에 현재 행을 누적 (배포 환경에서도 즉시 다운로드 가능)."""
-    buf = st.session_state.get("result_rows", [])
-    buf.append(row)
-    st.session_state["result_rows"] = buf
+    """세션 버퍼(증례별 최신 행 + 최근 이력)와 다운로드용 최신 행 인덱스를 갱신."""
+    _result_store().put(row)
+    pid = row.get("participant_id", "")
+    get_index(_local_control_path(pid), pid).update(row)
 
 
 def _local_control_path(participant_id: str) -> str:
@@ -61,82 +75,66 @@ def _local_control_path(participant_id: str) -> str:
     return os.path.join("results", f"{participant_id}_control_{today}.csv")
 
 def render_download_button(participant_id: str):
-    """로컬 CSV + 세션 버퍼를 합쳐서 후처리 후 다운로드."""
-    local_path = _local_control_path(participant_id)
-
-    dfs = []
-
-    # 1) 로컬 CSV가 있으면 읽기
-    if os.path.exists(local_path):
-        try:
-            df_local = pd.read_csv(local_path)
-            dfs.append(df_local)
-        except Exception:
-            pass
-
-    # 2) 세션 버퍼(result_rows)도 함께 사용
-    rows = st.session_state.get("result_rows", [])
-    if rows:
-        df_buf = pd.DataFrame(rows)
-        dfs.append(df_buf)
-
-    # 3) 둘 다 없으면 빈 DF
-    if dfs:
-        df_src = pd.concat(dfs, ignore_index=True)
-    else:
-        df_src = pd.DataFrame()
-
-    # 4) 후처리 & 중복 제거
-    if not df_src.empty:
-        df = df_src.copy()
+    """참가자별 최신 행 인덱스로 다운로드 (CSV는 클릭 시에만 생성)."""
+    index = get_index(_local_control_path(participant_id), participant_id)
 
-        # 정렬 기준 먼저 결정: save_ns > timestamp > index
-        if "save_ns" in df.columns:
-            df = df.sort_values("save_ns")
-        elif "timestamp" in df.columns:
-            df = df.sort_values("timestamp")
-        else:
-            df["__order__"] = range(len(df))
-            df = df.sort_values("__order__")
-
-        df = df.drop_duplicates(
-            subset=["participant_id", "file_name"],  # 또는 ["participant_id", "case_index"]
-            keep="last",
+    today = date.today().strftime("%Y%m%d")
+    with timer("download_render", _session_metrics()):
+        st.download_button(
+            label="📥 결과 CSV 다운로드",
+            data=index.csv_data(),
+            file_name=f"{participant_id}_control_{today}.csv",
+            mime="text/csv",
+            use_container_width=True,
         )
 
-        # 임시 컬럼 정리
-        df = df.drop(columns=["__order__"], errors="ignore")
-
-        # 5) 로컬 파일도 최신 상태로 저장 (가능한 경우)
-        try:
-            os.makedirs("results", exist_ok=True)
-            tmp = f"{local_path}.tmp"
-            df.to_csv(tmp, index=False)
-            os.replace(tmp, local_path)
-            #st.success("후처리 완료: 최신 1줄만 남기고 CSV를 갱신했습니다.")
-        except Exception as e:
-            st.info(f"로컬 저장은 생략하고, 후처리된 데이터만 다운로드합니다. ({e})")
 
-        csv_bytes = df.to_csv(index=False).encode("utf-8-sig")
-    else:
-        # 데이터가 하나도 없을 때
-        csv_bytes = pd.DataFrame().to_csv(index=False).encode("utf-8-sig")
-
-    today = date.today().strftime("%Y%m%d")
-    st.download_button(
-        label="📥 결과 CSV 다운로드",
-        data=csv_bytes,
-        file_name=f"{participant_id}_control_{today}.csv",
-        mime="text/csv",
-        use_container_width=True,
-    )
+# ---------------------
+# 계측 / 관리자 패널
+# ---------------------
+def _session_metrics() -> Metrics:
+    if "session_metrics" not in st.session_state:
+        st.session_state["session_metrics"] = Metrics()
+    return st.session_state["session_metrics"]
+
+def _timer_table(snapshot: dict):
+    import pandas as pd
+
+    rows = [
+        {"name": name, "count": t["count"], "errors": t["errors"],
+         **{k: round(t[k] * 1000, 2) for k in ("p50", "p90", "p99", "max")}}
+        for name, t in sorted(snapshot["timers"].items())
+    ]
+    return pd.DataFrame(rows, columns=["name", "count", "errors", "p50", "p90", "p99", "max"])
+
+def render_admin_panel():
+    """?admin=1 일 때만 보이는 지표 패널 (시간 단위 ms)."""
+    if st.query_params.get(ADMIN_QUERY_PARAM) != "1":
+        return
+    with st.expander("관리자: 성능 지표", expanded=False):
+        session = _session_metrics().snapshot()
+        process = REGISTRY.snapshot()
+        st.caption("이 세션 (ms)")
+        st.dataframe(_timer_table(session), hide_index=True, use_container_width=True)
+        st.caption("프로세스 전체 (ms)")
+        st.dataframe(_timer_table(process), hide_index=True, use_container_width=True)
+        st.json({
+            "counters": process["counters"],
+            "write_behind": {**get_writer().stats, "pending": get_writer().pending()},
+            "case_cache": case_cache_info(),
+            "autosave": st.session_state.get("autosave_stats", {}),
+            "timing": _timing().stats() if _timing() is not None else {},
+        })
 
 
 # ---------------------
 # Utils
 # ---------------------
 def elapsed_seconds() -> int:
-    """세션 시작 이후 경과 시간(초)만 기록 (제한시간 없음)."""
+    """세션 시작 이후 경과 시간(초)만 기록 (제한시간 없음). 시스템 시계 변경에 영향받지 않도록 monotonic 기준."""
+    start_mono = st.session_state.get("start_mono")
+    if start_mono is not None:
+        return max(0, int(time.monotonic() - start_mono))
     start_ts = st.session_state.get("start_ts")
     if not start_ts:
         return 0
@@ -157,54 +155,293 @@ def init_order(df_len: int, randomize: bool):
         st.session_state.case_idx = 0
         st.session_state["notes"] = ""
 
-def _ddx_key(i: int, row) -> str:
-    """file_name 기반 해시로 케이스별 위젯 키 충돌 방지."""
-    fid = str(row.get("file_name", ""))
-    h = hashlib.md5(fid.encode("utf-8")).hexdigest()[:8]
-    return f"ddx_{i}_{h}"
+def prepare_case(row, case_id: str) -> dict:
+    """증례 행에서 렌더링에 필요한 값(위젯 키, HPI 원문)을 미리 계산."""
+    hpi = row.get("원본 초진기록", row.get("현병력-Free Text#13", ""))
+    if hpi is None or (isinstance(hpi, float) and math.isnan(hpi)):
+        hpi = ""
+    return {
+        "file_name": str(row.get("file_name", "")),
+        "case_id": case_id,
+        "hpi_key": f"hpi_{case_id}",
+        "ddx_keys": [f"ddx_{i}_{case_id}" for i in range(1, REQUIRE_AT_MOST + 1)],
+        "hpi_text": str(hpi),
+    }
+
+def get_case_prepared(pos: int, get_case, case_keys) -> dict:
+    """order 상의 위치 pos의 준비된 증례 (현재 ±1 범위만 세션에 보관)."""
+    cache = st.session_state.setdefault("prepared_cases", {})
+    case = cache.get(pos)
+    if case is None:
+        idx = st.session_state.order[pos]
+        case = prepare_case(get_case(idx), case_keys.id_at(idx))
+        cache[pos] = case
+    return case
+
+def prefetch_cases(ci: int, total: int, get_case, case_keys):
+    """다음/이전 증례를 미리 준비해 두고, 범위를 벗어난 항목은 버림."""
+    for j in (ci + 1, ci - 1):
+        if 0 <= j < total:
+            get_case_prepared(j, get_case, case_keys)
+    cache = st.session_state.get("prepared_cases", {})
+    for pos in [p for p in cache if abs(p - ci) > 1]:
+        del cache[pos]
+
+def _ddx_key(i: int, case: dict) -> str:
+    """증례 키 테이블의 id로 케이스별 위젯 키 충돌 방지."""
+    return case["ddx_keys"][i - 1]
+
+def _hpi_key(case: dict) -> str:
+    return case["hpi_key"]
+
+def restore_inputs(case: dict):
+    """위젯 상태가 비어 있으면 이 세션에서 마지막으로 저장한 진단으로 채움 (이전 증례로 이동·세션 재개 시)."""
+    if any(k in st.session_state for k in case["ddx_keys"]):
+        return
+    row = _result_store().latest(case["file_name"])
+    if not row:
+        return
+    try:
+        ddx = json.loads(row.get("entered_ddx_list") or "[]")
+    except (TypeError, ValueError):
+        return
+    for k, v in zip(case["ddx_keys"], ddx):
+        st.session_state[k] = v
+
+def dataset_id(study_code: str, case_set, uploaded) -> str:
+    """재개 체크포인트가 같은 증례 세트인지 확인하는 식별자 (연구 코드+원본 해시 또는 업로드 내용 해시).
+
+    같은 연구 코드라도 번들을 다시 빌드해 증례가 바뀌면 이전 세션을 잇지 않습니다.
+    """
+    if case_set is not None:
+        return f"study:{study_code}:{case_set.meta.get('source_sha256', '')}"
+    if uploaded is not None:
+        return f"sha256:{upload_digest(uploaded)}"
+    return ""
+
+def apply_resume_state(total: int):
+    """'세션 시작/재개'에서 읽은 체크포인트로 진행 위치·세션 버퍼·메모를 복원 (한 번만)."""
+    state = st.session_state.pop("resume_state", None)
+    if not state:
+        return
+    store = _result_store()
+    for row in state["rows"].values():
+        store.put(row)
+        if row.get("case_id"):
+            _hpi_edits().load(row["case_id"], row.get("hpi_edit"))
+    # 마지막 저장 증례가 완성(최소 개수 이상)됐고 다음 증례 기록이 없으면 '다음'을 누른 뒤로 보고 한 칸 앞으로
+    pos = state["case_index"] - 1
+    current = state["rows"].get(state["file_name"]) or {}
+    try:
+        complete = len(json.loads(current.get("entered_ddx_list") or "[]")) >= REQUIRE_AT_LEAST
+    except (TypeError, ValueError):
+        complete = False
+    if complete and not any(int(r.get("case_index") or 0) == pos + 2 for r in state["rows"].values()):
+        pos += 1
+    st.session_state.case_idx = min(max(0, pos), max(0, total - 1))
+    if st.session_state.case_idx != state["case_index"] - 1:
+        current = {}
+    st.session_state["notes"] = current.get("notes") or ""
+    st.session_state["prepared_cases"] = {}
+    st.session_state["resumed_case"] = st.session_state.case_idx + 1
+
+def collect_inputs(case: dict) -> List[str]:
+    return [st.session_state.get(k, "").strip() for k in case["ddx_keys"]]
+
 
-def collect_inputs(row) -> List[str]:
-    return [st.session_state.get(_ddx_key(i, row), "").strip() for i in range(1, REQUIRE_AT_MOST + 1)]
+# ---------------------
+# 타이밍 이벤트 (timing.py): 증례별 체류 시간은 결과 행이 아니라 이 이벤트로 측정
+# ---------------------
+def _timing() -> Optional[TimingLog]:
+    return st.session_state.get("timing") if TIMING_EVENTS else None
+
+def start_timing():
+    """세션 시작/재개 버튼: 기록기를 (세션당 한 번) 만들고 start 이벤트를 남김."""
+    if not TIMING_EVENTS:
+        return
+    if "timing" not in st.session_state:
+        st.session_state["timing"] = TimingLog(offset_sec=elapsed_seconds())
+    st.session_state["timing"].record("start")
+
+def timing_event(event: str, case: Optional[dict] = None):
+    log = _timing()
+    if log is not None:
+        log.record(event, case["case_id"] if case else "")
+
+def _on_input(case_id: str):
+    """입력 위젯 on_change: 증례별 첫 입력 시각 (Streamlit은 입력 확정(엔터/포커스 이동) 때 알려줌)."""
+    log = _timing()
+    if log is not None:
+        log.first_input(case_id)
+
+def flush_timing(participant_id: str, force: bool = False):
+    """쌓인 이벤트가 TIMING_FLUSH_EVENTS개 이상이거나 오래됐으면 (force면 항상) 한 번에 전송."""
+    log = _timing()
+    if log is None or not len(log) or not (force or log.due()):
+        return
+    rows = log.drain(session_uuid=st.session_state.get("session_uuid", ""), participant_id=participant_id, arm="control")
+    save_events(participant_id, rows)
+
+def end_timing(participant_id: str, event: str, case: Optional[dict] = None):
+    """마지막 증례 저장/세션 종료: 현재 증례 이탈 + 종료 이벤트를 기록하고 바로 전송."""
+    log = _timing()
+    if log is None:
+        return
+    log.leave()
+    timing_event(event, case)
+    flush_timing(participant_id, force=True)
+
+
+# ---------------------
+# Autosave (변경 감지)
+# ---------------------
+def _input_fingerprint(ci: int, case: dict, inputs: List[str], notes: str) -> str:
+    """현재 증례의 감별진단/메모/HPI 편집 상태 지문."""
+    payload = json.dumps(
+        [ci, case["file_name"], inputs, notes, st.session_state.get(_hpi_key(case), "")],
+        ensure_ascii=False,
+    )
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+def _autosave_stats() -> dict:
+    if "autosave_stats" not in st.session_state:
+        st.session_state["autosave_stats"] = {"written": 0, "skipped": 0}
+    return st.session_state["autosave_stats"]
+
+def autosave_due(fingerprint: str) -> bool:
+    """입력이 바뀌었고 마지막 저장 후 AUTOSAVE_SEC 이상 지난 경우에만 True."""
+    if not AUTOSAVE_ON_CHANGE_ONLY:
+        return True
+    stats = _autosave_stats()
+    if fingerprint == st.session_state.get("autosave_fp"):
+        stats["skipped"] += 1
+        return False
+    last = st.session_state.get("autosave_last_mono")
+    # fragment 주기(AUTOSAVE_SEC)의 타이밍 오차로 한 주기를 건너뛰지 않도록 약간 여유를 둠
+    if last is not None and time.monotonic() - last < AUTOSAVE_SEC - 0.5:
+        stats["skipped"] += 1
+        return False
+    return True
+
+def mark_saved(fingerprint: str, autosave: bool = True):
+    st.session_state["autosave_fp"] = fingerprint
+    st.session_state["autosave_last_mono"] = time.monotonic()
+    if autosave:
+        _autosave_stats()["written"] += 1
+
+def mark_case_saved(ci: int, case: dict):
+    """이전/다음/마지막 저장 버튼으로 저장한 뒤: 자동저장 지문을 저장한 입력으로 맞춤 (같은 행을 다시 쓰지 않도록)."""
+    inputs = collect_inputs(case)
+    mark_saved(_input_fingerprint(ci, case, inputs, st.session_state.get("notes", "")), autosave=False)
+
+@st.fragment(run_every=AUTOSAVE_SEC)
+def autosave_fragment(participant_id: str, ci: int, total: int, case: dict):
+    """자동저장 heartbeat: 전체 스크립트 대신 이 fragment만 AUTOSAVE_SEC마다 다시 실행."""
+    with timer("autosave", _session_metrics()):
+        if disabled():
+            return
+        inputs = collect_inputs(case)
+        non_empty = [d for d in inputs if d]
+        # 입력이 바뀐 경우에만, 최소 AUTOSAVE_SEC 간격으로 저장
+        fingerprint = _input_fingerprint(ci, case, inputs, st.session_state.get("notes", ""))
+        if st.session_state.get("autosave_case") != case["case_id"]:
+            # 증례에 막 들어온 상태(복원된 입력 포함)는 이미 저장된 것으로 보고 기준 지문만 잡음
+            st.session_state["autosave_case"] = case["case_id"]
+            st.session_state["autosave_fp"] = fingerprint
+        elif autosave_due(fingerprint):
+            row_out = build_row(
+                st.session_state.session_uuid,
+                participant_id,
+                ci,
+                total,
+                elapsed_seconds(),
+                case["file_name"],
+                non_empty,
+                st.session_state.get("notes", ""),
+                case_id=case["case_id"],
+                hpi_edit=_hpi_edit_json(case),
+            )
+            save_progress(participant_id, row_out)
+            _append_buffer(row_out)
+            mark_saved(fingerprint)
+            st.session_state["last_saved_ts"] = datetime.now().strftime("%H:%M:%S")
+        # 전체 rerun이 없어도 이벤트가 오래 머물지 않도록 heartbeat에서도 확인
+        flush_timing(participant_id)
 
 
 # ---------------------
 # Center pane (CONTROL): Editable HPI only (NO Model Suggestions)
 # ---------------------
-def render_center_hpi_only(row: pd.Series):
+def _hpi_edits() -> HpiEditStore:
+    if "hpi_edits" not in st.session_state:
+        st.session_state["hpi_edits"] = HpiEditStore()
+    return st.session_state["hpi_edits"]
+
+def _hpi_edit_json(case: dict):
+    """저장 시점: 현재 HPI 위젯 값을 편집 저장소에 반영하고 결과 행에 넣을 diff(JSON, 수정 없으면 None)를 반환.
+
+    diff는 마지막 저장 이후 텍스트가 바뀐 경우에만 다시 계산됩니다.
+    """
+    hkey = _hpi_key(case)
+    if hkey in st.session_state:
+        _hpi_edits().record(case["case_id"], case["hpi_text"], st.session_state[hkey])
+    return _hpi_edits().diff_json(case["case_id"])
+
+def leave_case(case: dict):
+    """다른 증례로 이동할 때: 편집은 diff로만 남기고 HPI 전문 위젯 상태는 해제."""
+    _hpi_edit_json(case)
+    _hpi_edits().release(case["case_id"])
+    if _timing() is not None:
+        _timing().leave()
+    st.session_state.pop(_hpi_key(case), None)
+
+def render_center_hpi_only(case: dict):
     st.subheader("환자 초진 기록")
-    fid = str(row.get("file_name", ""))
-    h = hashlib.md5(fid.encode("utf-8")).hexdigest()[:8]
-    hkey = f"hpi_{h}"
-    default_hpi = row.get("원본 초진기록", row.get("현병력-Free Text#13", ""))
+    hkey = _hpi_key(case)
 
     if hkey not in st.session_state:
-        st.session_state[hkey] = str(default_hpi)
+        # 원문 + (수정한 적이 있으면) diff로 복원
+        st.session_state[hkey] = _hpi_edits().text(case["case_id"], case["hpi_text"])
 
     st.text_area(
         "raw_visit",
         key=hkey,
+        on_change=_on_input,
+        args=(case["case_id"],),
         height=460,
         label_visibility="collapsed",
     )
+    _hpi_edits().record(case["case_id"], case["hpi_text"], st.session_state[hkey])  # 텍스트만 기억 (diff는 저장/이탈 때)
 
 
 # ---------------------
 # Main
 # ---------------------
 def main():
-    st.set_page_config(page_title=APP_TITLE, layout="wide")
+    start_exporter()
+    start_warmup()  # 첫 화면은 바로 그리고, pandas 등은 업로드를 기다리는 동안 백그라운드에서 로드
+    with timer("rerun", _session_metrics()):
+        _main()
 
-    # Auto-refresh: 이제는 제한시간이 아니라,
-    # 경과 시간/자동저장을 위한 주기적 rerun 용도로만 사용.
-    auto_refresh(
-        enabled=st.session_state.get("active") and not st.session_state.get("finalized", False),
-        interval_ms=1000,
-    )
+def _main():
+    st.set_page_config(page_title=APP_TITLE, layout="wide")
 
     # Sidebar
     with st.sidebar:
         st.header("CONTROL 설정 (대조군)")
-        uploaded = st.file_uploader("CSV 업로드", type=["csv"], accept_multiple_files=False)
+        # 등록된 연구 코드가 있으면 서버의 증례 세트를 사용하고, 없으면 CSV 업로드로 대체
+        study_code = st.text_input(
+            "연구 코드", value=st.session_state.get("study_code", st.query_params.get("study", ""))
+        ).strip()
+        st.session_state["study_code"] = study_code
+        case_set = open_case_set(study_code) if study_code else None
+        if study_code and case_set is None:
+            st.error("등록되지 않은 연구 코드입니다. CSV를 업로드하세요.")
+        uploaded = None
+        if case_set is not None:
+            st.caption(f"증례 세트: {case_set.title} ({len(case_set)}개)")
+        else:
+            uploaded = st.file_uploader("CSV 업로드", type=["csv"], accept_multiple_files=False)
         participant_id = st.text_input("참가자 ID", value=st.session_state.get("participant_id", ""))
         #randomize_order = st.checkbox("증례 순서 무작위", value=False)
         st.session_state["participant_id"] = participant_id
@@ -219,15 +456,40 @@ def main():
                 if not participant_id:
                     st.error("참가자 ID를 입력하세요.")
                     st.stop()
+                if case_set is None and not uploaded:
+                    st.error("연구 코드를 입력하거나 CSV를 업로드한 뒤 시작하세요.")
+                    st.stop()
+                if "session_uuid" not in st.session_state:
+                    # 서버 재시작 등으로 세션이 사라졌다면 체크포인트에서 이어서 진행
+                    # (종료되지 않았고 같은 증례 세트·같은 날 시작한 세션만; 아니면 새 세션이 이전 체크포인트를 보관 처리)
+                    dataset = dataset_id(study_code, case_set, uploaded)
+                    today = date.today().isoformat()
+                    resume = load_resume_state(participant_id)
+                    if resumable(resume, dataset, today):
+                        st.session_state.session_uuid = resume["session_uuid"]
+                        st.session_state.start_ts = datetime.now() - timedelta(seconds=resume["seconds"])
+                        st.session_state.start_mono = time.monotonic() - resume["seconds"]
+                        st.session_state["resume_state"] = resume
+                    else:
+                        st.session_state.session_uuid = str(uuid.uuid4())
+                        save_session_meta(
+                            participant_id, st.session_state.session_uuid, dataset=dataset, started=today, finalized=False
+                        )
+                elif st.session_state.get("finalized"):
+                    save_session_meta(participant_id, st.session_state.session_uuid, finalized=False)
                 if "start_ts" not in st.session_state:
                     st.session_state.start_ts = datetime.now()
-                if "session_uuid" not in st.session_state:
-                    st.session_state.session_uuid = str(uuid.uuid4())
+                    st.session_state.start_mono = time.monotonic()
                 st.session_state.active = True
                 st.session_state.finalized = False
+                start_timing()
         with c2:
             if st.button("세션 종료", use_container_width=True):
                 st.session_state.finalized = True
+                if "session_uuid" in st.session_state:
+                    save_session_meta(participant_id, st.session_state.session_uuid, finalized=True)
+                end_timing(participant_id, "end")
+                flush_progress(participant_id)
 
         #st.markdown("---")
         #st.subheader("자동 저장")
@@ -235,13 +497,21 @@ def main():
         #st.write("최근 저장:", st.session_state.get("last_saved_ts", "(없음)"))
 
 
-    if not uploaded:
+    if case_set is None and not uploaded:
         st.title(APP_TITLE)
-        st.info("좌측에서 CSV를 업로드하세요.")
+        st.info("좌측에서 연구 코드를 입력하거나 CSV를 업로드하세요.")
         return
 
-    df = read_uploaded_csv(uploaded)
-    init_order(len(df), randomize=False)
+    if case_set is not None:
+        n_cases, get_case, case_keys = len(case_set), case_set.row, case_set.case_keys
+    elif LAZY_CASE_LOADING:
+        cases = open_case_source(uploaded)
+        n_cases, get_case, case_keys = len(cases), cases.row, cases.case_keys
+    else:
+        df = read_uploaded_csv(uploaded)
+        n_cases, get_case, case_keys = len(df), df.iloc.__getitem__, case_keys_for_frame(df)
+    init_order(n_cases, randomize=False)
+    apply_resume_state(n_cases)
 
     # Header
     order = st.session_state.order
@@ -262,31 +532,40 @@ def main():
 
     if disabled():
         st.error("세션이 종료되었습니다. 입력이 비활성화되었습니다.")
-
-    row = df.iloc[order[ci]]
-
-    st.markdown(f"### 증례 {ci+1} / {total} — `{row['file_name']}`")
-
-    # Layout: center(HPI only) | right(inputs)
-    col_center, col_right = st.columns([5, 3])
-
-    with col_center:
-        render_center_hpi_only(row)
-
-    with col_right:
-        st.subheader("감별진단 입력 (3–5개)")
-        for i in range(1, REQUIRE_AT_MOST + 1):
-            st.text_input(f"감별진단 {i}", key=_ddx_key(i, row), disabled=disabled())
-        st.text_area("메모(선택)", key="notes", disabled=disabled())
-
-        #if st.button("입력 초기화", disabled=disabled(), use_container_width=True):
-            #for i in range(1, REQUIRE_AT_MOST + 1):
-            #    st.session_state[_ddx_key(i, row)] = ""
-            #st.session_state["notes"] = ""
-            #st.rerun()
+    if case_keys.duplicates:
+        st.warning(f"CSV에 중복된 file_name이 있습니다: {case_keys.duplicates[:5]}")
+    if st.session_state.pop("resumed_case", None):
+        st.info(f"저장된 기록에서 세션을 이어서 진행합니다 (증례 {ci + 1}부터).")
+
+    with timer("widget_build", _session_metrics()):
+        case = get_case_prepared(ci, get_case, case_keys)
+        if not disabled() and _timing() is not None:
+            _timing().enter(case["case_id"])
+
+        st.markdown(f"### 증례 {ci+1} / {total} — `{case['file_name']}`")
+
+        # Layout: center(HPI only) | right(inputs)
+        col_center, col_right = st.columns([5, 3])
+
+        with col_center:
+            render_center_hpi_only(case)
+
+        with col_right:
+            st.subheader("감별진단 입력 (3–5개)")
+            restore_inputs(case)
+            for i in range(1, REQUIRE_AT_MOST + 1):
+                st.text_input(f"감별진단 {i}", key=_ddx_key(i, case), disabled=disabled(),
+                              on_change=_on_input, args=(case["case_id"],))
+            st.text_area("메모(선택)", key="notes", disabled=disabled(), on_change=_on_input, args=(case["case_id"],))
+
+            #if st.button("입력 초기화", disabled=disabled(), use_container_width=True):
+                #for i in range(1, REQUIRE_AT_MOST + 1):
+                #    st.session_state[_ddx_key(i, case)] = ""
+                #st.session_state["notes"] = ""
+                #st.rerun()
 
     # Validate & collect
-    inputs = collect_inputs(row)
+    inputs = collect_inputs(case)
     non_empty = [d for d in inputs if d]
     valid = REQUIRE_AT_LEAST <= len(non_empty) <= REQUIRE_AT_MOST
 
@@ -304,12 +583,17 @@ def main():
                 ci,
                 total,
                 current_elapsed,  # seconds 대신 경과 시간 저장
-                str(row["file_name"]),
+                case["file_name"],
                 non_empty,
                 st.session_state.get("notes", ""),
+                case_id=case["case_id"],
+                hpi_edit=_hpi_edit_json(case),
             )
             save_progress(participant_id, row_out)
             _append_buffer(row_out)   # ✅ download buffer
+            mark_case_saved(ci, case)
+            timing_event("prev", case)
+            leave_case(case)
             st.session_state.case_idx -= 1
             st.rerun()
 
@@ -325,12 +609,17 @@ def main():
                     ci,
                     total,
                     current_elapsed,  # seconds_left 대신 경과 시간
-                    str(row["file_name"]),
+                    case["file_name"],
                     non_empty,
                     st.session_state.get("notes", ""),
+                    case_id=case["case_id"],
+                    hpi_edit=_hpi_edit_json(case),
                 )
                 save_progress(participant_id, row_out)
                 _append_buffer(row_out)   # ✅ download buffer
+                mark_case_saved(ci, case)
+                timing_event("next", case)
+                leave_case(case)
                 st.session_state.case_idx += 1
                 st.rerun()
 
@@ -343,35 +632,36 @@ def main():
                 ci,
                 total,
                 current_elapsed,  # seconds_left 대신 경과 시간
-                str(row["file_name"]),
+                case["file_name"],
                 non_empty,
                 st.session_state.get("notes", ""),
+                case_id=case["case_id"],
+                hpi_edit=_hpi_edit_json(case),
             )
             save_progress(participant_id, row_out)
             _append_buffer(row_out)   # ✅ download buffer
+            mark_case_saved(ci, case)
+            end_timing(participant_id, "finalize", case)
+            save_session_meta(participant_id, st.session_state.session_uuid, finalized=True)
+            flush_progress(participant_id)
             st.session_state.finalized = True
             st.success("세션이 종료되었습니다. 좌측 하단의 결과 csv 다운로드 버튼을 클릭하세요.")
 
     # Autosave heartbeat (제한시간 없이, 경과 시간을 로그로 저장)
-    if not disabled():
-        row_out = build_row(
-            st.session_state.session_uuid,
-            participant_id,
-            ci,
-            total,
-            elapsed_seconds(),
-            str(row["file_name"]),
-            non_empty,
-            st.session_state.get("notes", ""),
-        )
-        save_progress(participant_id, row_out)
-        _append_buffer(row_out)
-        st.session_state["last_saved_ts"] = datetime.now().strftime("%H:%M:%S")
+    # 1초마다 전체 rerun하던 JS auto-refresh 대신, fragment만 AUTOSAVE_SEC마다 재실행
+    autosave_fragment(participant_id, ci, total, case)
 
     with st.sidebar:
         st.markdown("---")
         st.subheader("결과 다운로드")
         render_download_button(participant_id)
+        store = _result_store()
+        st.caption(f"저장된 증례 {len(store)}개 · 세션 버퍼 {store.memory_bytes() / 1024:.1f} KB")
+        render_admin_panel()
+
+    # 화면을 다 그린 뒤 다음/이전 증례를 미리 준비 (이동 시 저장 + 렌더링만 남도록)
+    prefetch_cases(ci, total, get_case, case_keys)
+    flush_timing(participant_id)
 
 
 if __name__ == "__main__":
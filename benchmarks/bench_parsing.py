@@ -0,0 +1,75 @@
+# parse_listish (셀별) vs parse_listish_series (컬럼 단위) 비교 벤치마크.
+#   python -m llm_ddx_control_app.benchmarks.bench_parsing --rows 50000
+
+import json
+import time
+import random
+import argparse
+
+import pandas as pd
+
+from llm_ddx_control_app.parsing import parse_listish, parse_listish_series
+
+_VOCAB = [
+    "급성 충수염", "담낭염", "췌장염", "위궤양 천공", "장폐색", "신우신염",
+    "요로결석", "자궁외 임신", "난소 염전", "게실염", "Acute MI", "Pneumonia",
+]
+
+
+def _cell(fmt: str, rng: random.Random) -> str:
+    items = rng.sample(_VOCAB, rng.randint(3, 5))
+    if fmt == "json":
+        return json.dumps(items, ensure_ascii=False)
+    if fmt == "python":
+        return repr(items)
+    return rng.choice([", ", "; ", " | ", "\n"]).join(items)
+
+
+def make_series(fmt: str, rows: int, unique: int, outlier_rate: float, seed: int = 0) -> pd.Series:
+    """unique개 고유 셀을 rows개로 반복한 Series (outlier_rate 비율은 다른 형식/빈 값)."""
+    rng = random.Random(seed)
+    pool = [_cell(fmt, rng) for _ in range(unique)]
+    others = [f for f in ("json", "python", "delimited") if f != fmt]
+    vals = []
+    for _ in range(rows):
+        r = rng.random()
+        if r < outlier_rate / 2:
+            vals.append(_cell(rng.choice(others), rng))
+        elif r < outlier_rate:
+            vals.append(rng.choice([None, "", float("nan")]))
+        else:
+            vals.append(rng.choice(pool))
+    return pd.Series(vals, dtype=object)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="parse_listish vs parse_listish_series 벤치마크")
+    ap.add_argument("--rows", type=int, default=20000)
+    ap.add_argument("--unique", type=int, default=2000)
+    ap.add_argument("--outliers", type=float, default=0.02)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    print(f"rows={args.rows} unique={args.unique} outliers={args.outliers:.0%}")
+    print(f"{'format':<10} {'per-cell (s)':>13} {'series (s)':>11} {'speedup':>8}")
+    for fmt in ("json", "python", "delimited"):
+        s = make_series(fmt, args.rows, args.unique, args.outliers)
+        expected = s.map(parse_listish)
+        got = parse_listish_series(s)
+        assert expected.tolist() == got.tolist(), f"{fmt}: results differ"
+        t_cell = _time(lambda: s.map(parse_listish), args.repeat)
+        t_bulk = _time(lambda: parse_listish_series(s), args.repeat)
+        print(f"{fmt:<10} {t_cell:>13.4f} {t_bulk:>11.4f} {t_cell / t_bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# 콜드 스타트 import 시간 측정: 새 인터프리터에서 모듈을 import하는 시간과 무거운 의존성 로드 여부를 봅니다.
+#   python -m llm_ddx_control_app.benchmarks.import_time --repeat 5 --top 15
+#   python -m llm_ddx_control_app.benchmarks.import_time --modules llm_ddx_control_app.app_control --warmup
+#
+# 보고 항목
+# - 모듈별 import 벽시계 시간 중앙값/최소 (매번 새 프로세스, .pyc는 미리 컴파일된 상태)
+# - 그 import로 pandas/numpy가 함께 로드되는지
+# - -X importtime 기준 누적 시간이 큰 하위 모듈 상위 N개
+# - (--warmup) warmup.warm_up() 단계별 소요 시간
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = [
+    "llm_ddx_control_app.app_control",
+    "llm_ddx_control_app.persistence",
+    "llm_ddx_control_app.data_io",
+    "llm_ddx_control_app.parsing",
+]
+HEAVY = ("pandas", "numpy")
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"sec": dt, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_WARMUP = """
+import json
+from llm_ddx_control_app.warmup import warm_up
+print(json.dumps(warm_up()))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    return env
+
+
+def measure(module: str) -> Tuple[float, List[str]]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+        capture_output=True, text=True, check=True, env=_env(),
+    )
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    return res["sec"], res["loaded"]
+
+
+def importtime_top(module: str, top: int) -> List[Tuple[int, str]]:
+    """-X importtime 출력에서 누적(us) 상위 모듈."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, env=_env(),
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cum_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="콜드 스타트 import 시간 측정")
+    ap.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--warmup", action="store_true", help="warm_up() 단계별 시간도 측정")
+    args = ap.parse_args(argv)
+
+    print(f"{'module':<40} {'median_ms':>10} {'min_ms':>8}  heavy deps")
+    for module in args.modules:
+        samples, loaded = [], []
+        for _ in range(max(1, args.repeat)):
+            sec, loaded = measure(module)
+            samples.append(sec * 1000)
+        print(f"{module:<40} {statistics.median(samples):>10.1f} {min(samples):>8.1f}  {','.join(loaded) or '-'}")
+
+    if args.top:
+        print(f"\ntop {args.top} cumulative imports for {args.modules[0]} (ms)")
+        for cum_us, name in importtime_top(args.modules[0], args.top):
+            print(f"  {cum_us / 1000:>8.1f}  {name}")
+
+    if args.warmup:
+        out = subprocess.run([sys.executable, "-c", _WARMUP], capture_output=True, text=True, check=True, env=_env())
+        print("\nwarm_up() (sec):", out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
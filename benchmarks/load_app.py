@@ -0,0 +1,251 @@
+# app_control 부하 테스트: AppTest로 앱을 헤드리스 실행하고 N명의 가상 참가자가 증례를 넘기며 입력.
+#   python -m llm_ddx_control_app.benchmarks.load_app --participants 20 --cases 30 --concurrency 4
+#
+# 보고 항목
+# - rerun 지연 백분위 (입력 / 이동 / 전체) 와 save_progress, render_download_button 호출 비용
+# - 분당 기록 바이트 (작업 디렉터리의 results/ 전체 + 대체 시트 파일)
+# - 세션당 메모리 (session_state pickle 크기, SessionResultStore 버퍼, 선택 시 tracemalloc 증가분)
+# Google Sheets는 secrets의 gsheets.backend = "local" 대체 워크시트로 흉내냅니다 (--sheets).
+
+import os
+import sys
+import time
+import pickle
+import random
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from typing import Dict, List
+
+from llm_ddx_control_app import app_control
+from llm_ddx_control_app.benchmarks.bench_parsing import _VOCAB
+from llm_ddx_control_app.case_sets import build_bundle
+from llm_ddx_control_app.config import REQUIRE_AT_LEAST, REQUIRE_AT_MOST, SAVE_DIR
+from llm_ddx_control_app.metrics import REGISTRY
+
+_TIMINGS: Dict[str, List[float]] = {}
+_TIMINGS_LOCK = threading.Lock()
+
+
+def _record(label: str, sec: float):
+    with _TIMINGS_LOCK:
+        _TIMINGS.setdefault(label, []).append(sec)
+
+
+def _timed(label: str, fn):
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(label, time.perf_counter() - t0)
+    return wrapper
+
+
+def make_cases_csv(cases: int, hpi_chars: int, seed: int = 0) -> bytes:
+    """REQUIRED_COLS를 갖춘 합성 증례 CSV (HPI는 따옴표/줄바꿈 포함)."""
+    rng = random.Random(seed)
+    words = ["복통", "발열", "구토", "3일 전부터", "우하복부", "압통", "\"반발통\"", "식욕 저하", "설사", "\n"]
+    lines = ["file_name,현병력-Free Text#13"]
+    for i in range(cases):
+        parts, n = [], 0
+        while n < hpi_chars:
+            w = rng.choice(words)
+            parts.append(w)
+            n += len(w) + 1
+        hpi = " ".join(parts).replace('"', '""')
+        lines.append(f'case_{i:05d}.txt,"{hpi}"')
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _dir_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+
+def _session_bytes(at) -> int:
+    total = 0
+    for v in at.session_state.to_dict().values():
+        try:
+            total += len(pickle.dumps(v))
+        except Exception:
+            total += sys.getsizeof(v)
+    return total
+
+
+def _widget(elements, label_prefix: str):
+    return next(e for e in elements if e.label.startswith(label_prefix))
+
+
+def _run(at, label: str):
+    t0 = time.perf_counter()
+    at.run()
+    _record(label, time.perf_counter() - t0)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return label
+
+
+def _app_script():
+    # AppTest가 이 함수 본문을 스크립트로 실행 → 패키지의 app_control 모듈(계측 래퍼 적용분)을 그대로 사용
+    from llm_ddx_control_app.app_control import main
+
+    main()
+
+
+def simulate_participant(n: int, csv_bytes: bytes, cases: int, secrets: Dict, timeout: float, seed: int,
+                         study_code: str = ""):
+    """참가자 한 명: 업로드(또는 연구 코드) → ID 입력 → 세션 시작 → 증례마다 진단 입력 후 다음/마지막 저장.
+
+    rerun마다 yield하는 제너레이터이며, 끝나면 세션 측정값을 StopIteration 값으로 반환합니다.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_function(_app_script, default_timeout=timeout)
+    for k, v in secrets.items():
+        at.secrets[k] = v
+    yield _run(at, "rerun_load")
+    if study_code:
+        _widget(at.text_input, "연구 코드").input(study_code)
+    else:
+        at.file_uploader[0].set_value(("cases.csv", csv_bytes, "text/csv"))
+    yield _run(at, "rerun_load")
+    _widget(at.text_input, "참가자 ID").input(f"bench{n:04d}")
+    yield _run(at, "rerun_input")
+    _widget(at.button, "세션 시작").click()
+    yield _run(at, "rerun_load")
+
+    for ci in range(cases):
+        for i in range(rng.randint(REQUIRE_AT_LEAST, REQUIRE_AT_MOST)):
+            _widget(at.text_input, f"감별진단 {i + 1}").input(rng.choice(_VOCAB))
+            yield _run(at, "rerun_input")
+        _widget(at.button, "다음" if ci < cases - 1 else "✅ 마지막").click()
+        yield _run(at, "rerun_nav")
+
+    store = at.session_state["result_store"] if "result_store" in at.session_state.keys() else None
+    return {
+        "app": at,  # 메모리 측정이 끝날 때까지 세션을 살려 둠
+        "session_bytes": _session_bytes(at),
+        "store_bytes": store.memory_bytes() if store is not None else 0,
+    }
+
+
+def run_interleaved(participants, concurrency: int) -> List[Dict]:
+    """참가자 제너레이터를 최대 concurrency명씩 라운드 로빈으로 한 rerun씩 진행.
+
+    AppTest는 스레드 안전하지 않으므로 rerun 자체는 직렬이지만, 동시에 열린 세션 수와
+    세션 간 교차 순서(공유 캐시/저장 워커 경합)는 실제 서버와 같게 유지됩니다.
+    """
+    pending = iter(participants)
+    active, done = [], []
+    while True:
+        while len(active) < concurrency:
+            nxt = next(pending, None)
+            if nxt is None:
+                break
+            active.append(nxt)
+        if not active:
+            return done
+        for gen in list(active):
+            try:
+                next(gen)
+            except StopIteration as stop:
+                active.remove(gen)
+                done.append(stop.value)
+
+
+def _pct(values: List[float], q: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def report(elapsed: float, written: int, sessions: List[Dict], traced: int = 0):
+    print(f"{'metric':<24} {'n':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    all_reruns = [v for k, vs in _TIMINGS.items() if k.startswith("rerun_") for v in vs]
+    rows = sorted(_TIMINGS.items()) + [("rerun_all", all_reruns)]
+    for label, vals in rows:
+        if vals:
+            print(f"{label:<24} {len(vals):>7} {_pct(vals, .5) * 1e3:>9.1f} {_pct(vals, .9) * 1e3:>9.1f} "
+                  f"{_pct(vals, .99) * 1e3:>9.1f} {max(vals) * 1e3:>9.1f}")
+    n = max(1, len(sessions))
+    print(f"elapsed {elapsed:.1f}s · reruns/s {len(all_reruns) / max(elapsed, 1e-9):.1f}")
+    print(f"bytes written {written} · per minute {written / max(elapsed / 60, 1e-9):.0f}")
+    print(f"session_state per session {sum(s['session_bytes'] for s in sessions) / n / 1024:.1f} KB · "
+          f"result buffer per session {sum(s['store_bytes'] for s in sessions) / n / 1024:.1f} KB")
+    if traced:
+        print(f"tracemalloc growth per session {traced / n / 1024:.1f} KB (AppTest 요소 트리 포함)")
+    snap = REGISTRY.snapshot()
+    print("app metrics (metrics.REGISTRY, ms):")
+    for label, t in sorted(snap["timers"].items()):
+        print(f"  {label:<22} {t['count']:>7} {t['p50'] * 1e3:>9.1f} {t['p90'] * 1e3:>9.1f} "
+              f"{t['p99'] * 1e3:>9.1f} {t['max'] * 1e3:>9.1f}  errors={t['errors']}")
+    for label, v in sorted(snap["counters"].items()):
+        print(f"  {label:<22} {v:>7}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="app_control 헤드리스 부하 테스트 (AppTest)")
+    ap.add_argument("--participants", type=int, default=10)
+    ap.add_argument("--cases", type=int, default=10, help="참가자가 진행할 증례 수")
+    ap.add_argument("--csv-rows", type=int, default=0, help="합성 CSV 행 수 (기본: --cases)")
+    ap.add_argument("--hpi-chars", type=int, default=1500)
+    ap.add_argument("--concurrency", type=int, default=1, help="동시에 열려 있는 참가자 세션 수")
+    ap.add_argument("--case-set", action="store_true", help="업로드 대신 작업 디렉터리에 빌드한 증례 번들(연구 코드) 사용")
+    ap.add_argument("--sheets", action="store_true", help="로컬 대체 워크시트를 Google Sheets 대신 사용")
+    ap.add_argument("--sheets-latency", type=float, default=0.2, help="대체 워크시트 append_rows 호출당 지연(초)")
+    ap.add_argument("--workdir", default=None, help="results/가 만들어질 디렉터리 (기본: 임시 디렉터리)")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--tracemalloc", action="store_true", help="세션당 메모리 증가분 측정 (느려짐)")
+    args = ap.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="llm_ddx_load_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)  # SAVE_DIR 등 상대 경로가 여기로
+    csv_bytes = make_cases_csv(max(args.csv_rows, args.cases), args.hpi_chars)
+    study_code = ""
+    if args.case_set:
+        study_code = "BENCH"
+        with open("cases.csv", "wb") as f:
+            f.write(csv_bytes)
+        build_bundle("cases.csv", study_code, "load test")
+    secrets = {}
+    if args.sheets:
+        secrets["gsheets"] = {
+            "backend": "local",
+            "path": os.path.join(SAVE_DIR, "gsheets_standin.csv"),
+            "latency_sec": args.sheets_latency,
+        }
+
+    # 앱 모듈의 전역 이름을 감싸서 호출 비용 측정 (main()이 모듈 전역으로 참조하므로 그대로 적용됨)
+    app_control.save_progress = _timed("save_progress", app_control.save_progress)
+    app_control.render_download_button = _timed("render_download_button", app_control.render_download_button)
+    app_control.flush_progress = _timed("flush_progress", app_control.flush_progress)
+
+    print(f"workdir={workdir} participants={args.participants} cases={args.cases} "
+          f"csv={len(csv_bytes) / 1024:.0f} KB concurrency={args.concurrency} sheets={args.sheets} "
+          f"case_set={args.case_set}")
+    if args.tracemalloc:
+        tracemalloc.start()
+    base_mem = tracemalloc.get_traced_memory()[0] if args.tracemalloc else 0
+    t0 = time.perf_counter()
+    participants = (
+        simulate_participant(n, csv_bytes, args.cases, secrets, args.timeout, n, study_code)
+        for n in range(args.participants)
+    )
+    sessions = run_interleaved(participants, max(1, args.concurrency))
+    app_control.flush_progress(None)
+    elapsed = time.perf_counter() - t0
+    traced = tracemalloc.get_traced_memory()[0] - base_mem if args.tracemalloc else 0
+    report(elapsed, _dir_bytes(SAVE_DIR), sessions, traced)
+
+
+if __name__ == "__main__":
+    main()
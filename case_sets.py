@@ -0,0 +1,219 @@
+# llm_ddx_control_app/case_sets.py
+# 서버에 미리 등록한 증례 세트 (연구 코드로 선택). 참가자마다 같은 CSV를 업로드/파싱하지 않도록
+# REQUIRED_COLS CSV를 오프라인에서 한 번 번들로 컴파일하고, 모든 세션/프로세스가 읽기 전용 mmap으로 공유합니다.
+#
+#   python -m llm_ddx_control_app.case_sets build cases.csv STUDY01 --title "1차 연구"
+#   python -m llm_ddx_control_app.case_sets list
+#
+# 번들 ({CASE_SETS_DIR}/{code} → {code}@{빌드 시각 ns}/ 심볼릭 링크; 다시 빌드하면 링크만 원자적으로 교체):
+#   meta.json    {"code", "title", "columns", "rows", "source_sha256", "built_at"}
+#   offsets.npy  int64, 길이 rows * len(columns) + 1 — 셀 (i, j)는 blob[off[i*C+j]:off[i*C+j+1]]
+#   cells.bin    모든 셀의 UTF-8 바이트를 행 순서로 이어 붙인 것 (결측은 빈 문자열)
+
+import os
+import re
+import json
+import mmap
+import shutil
+import hashlib
+import time
+import argparse
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from llm_ddx_control_app.config import CASE_SETS_DIR, REQUIRED_COLS
+from llm_ddx_control_app.data_io import CaseKeyTable
+
+if TYPE_CHECKING:
+    import pandas as pd  # numpy/pandas는 번들을 빌드하거나 처음 열 때 import
+
+_CODE_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def valid_code(code: str) -> bool:
+    return bool(_CODE_RE.match(code or ""))
+
+
+def bundle_dir(code: str, root: str = CASE_SETS_DIR) -> str:
+    if not valid_code(code):
+        raise ValueError(f"invalid study code: {code!r}")
+    return os.path.join(root, code)
+
+
+def build_bundle(csv_path: str, code: str, title: str = "", root: str = CASE_SETS_DIR) -> str:
+    """증례 CSV를 번들로 컴파일 (새 버전 디렉터리에 만든 뒤 {code} 링크를 교체)."""
+    import numpy as np
+    import pandas as pd
+
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"CSV 누락 컬럼: {missing}")
+
+    columns = [str(c) for c in df.columns]
+    cells = [str(v).encode("utf-8") for row in df.itertuples(index=False, name=None) for v in row]
+    offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in cells], out=offsets[1:])
+
+    out = bundle_dir(code, root)
+    tmp = f"{out}@{time.time_ns()}"  # 유효한 연구 코드가 아니므로 list_case_sets에 나오지 않음
+    os.makedirs(tmp)
+    with open(os.path.join(tmp, "cells.bin"), "wb") as f:
+        for c in cells:
+            f.write(c)
+    np.save(os.path.join(tmp, "offsets.npy"), offsets)
+    meta = {
+        "code": code,
+        "title": title or code,
+        "columns": columns,
+        "rows": len(df),
+        "source_sha256": hashlib.sha256(data).hexdigest(),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    _publish(out, tmp)
+    return out
+
+
+def _publish(out: str, version: str):
+    """out 링크가 version 디렉터리를 가리키도록 원자적으로 교체하고 이전 버전을 지움.
+
+    어느 순간에도 out은 이전 번들 또는 새 번들을 가리킵니다. 이전 버전을 열어 둔 프로세스는
+    이미 mmap한 내용을 계속 읽습니다.
+    """
+    old = os.path.realpath(out) if os.path.islink(out) else None
+    if old is None and os.path.isdir(out):
+        old = f"{out}@0"  # 이전 형식(실제 디렉터리) 번들: 링크로 바꾸기 위해 한 번만 옆으로 옮김
+        os.replace(out, old)
+    link = f"{out}.{os.getpid()}.link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version), link)
+    os.replace(link, out)
+    if old is not None and old != os.path.realpath(version):
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class CaseBundle:
+    """mmap된 증례 번들. CaseSource와 같은 인터페이스 (len, row(i), columns, case_keys)."""
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        self.path = path
+        path = os.path.realpath(path)  # 읽는 도중 링크가 교체돼도 한 버전의 파일만 열도록
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.code: str = self.meta["code"]
+        self.title: str = self.meta.get("title") or self.code
+        self.columns: List[str] = self.meta["columns"]
+        self._n = int(self.meta["rows"])
+        self._offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        blob_path = os.path.join(path, "cells.bin")
+        if os.path.getsize(blob_path):
+            with open(blob_path, "rb") as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._blob = b""
+        self.case_keys = CaseKeyTable(self.column("file_name") if "file_name" in self.columns else [""] * self._n)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def missing_columns(self) -> List[str]:
+        return [c for c in REQUIRED_COLS if c not in self.columns]
+
+    def _cell(self, k: int) -> str:
+        return self._blob[int(self._offsets[k]):int(self._offsets[k + 1])].decode("utf-8")
+
+    def column(self, name: str) -> List[str]:
+        j, c = self.columns.index(name), len(self.columns)
+        return [self._cell(i * c + j) for i in range(self._n)]
+
+    def row(self, i: int) -> "pd.Series":
+        import pandas as pd
+
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        c = len(self.columns)
+        values = [self._cell(i * c + j) for j in range(c)]
+        return pd.Series(dict(zip(self.columns, values)), name=i, dtype=object)
+
+    def close(self):
+        """cells.bin mmap 해제 (더 이상 이 번들을 읽는 곳이 없을 때만)."""
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+
+
+# path → ((meta.json의 inode, 크기, mtime_ns), 번들)
+# 다시 빌드하면 링크가 새 버전 디렉터리를 가리키므로 열 때마다 meta.json stat이 달라졌는지 확인합니다.
+_BUNDLES: Dict[str, Tuple[Tuple[int, int, int], CaseBundle]] = {}
+_BUNDLES_LOCK = threading.Lock()
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(os.path.join(path, "meta.json"))
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def open_case_set(code: str, root: str = CASE_SETS_DIR) -> Optional[CaseBundle]:
+    """연구 코드로 등록된 증례 세트 (프로세스 전역 공유, 없으면 None).
+
+    번들이 다시 빌드됐거나 지워졌으면 캐시에서만 빼고 새로 엽니다. 이전 번들을 쥔 세션은 그대로 읽고,
+    마지막 참조가 사라질 때 mmap이 해제됩니다.
+    """
+    if not valid_code(code):
+        return None
+    path = bundle_dir(code, root)
+    stamp = _stamp(path)
+    with _BUNDLES_LOCK:
+        cached = _BUNDLES.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        if cached is not None:
+            del _BUNDLES[path]
+        if stamp is None:
+            return None
+        b = CaseBundle(path)
+        _BUNDLES[path] = (stamp, b)
+        return b
+
+
+def list_case_sets(root: str = CASE_SETS_DIR) -> List[Dict]:
+    out = []
+    if not os.path.isdir(root):
+        return out
+    for name in sorted(os.listdir(root)):
+        meta_path = os.path.join(root, name, "meta.json")
+        if valid_code(name) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                out.append(json.load(f))
+    return out
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="연구 코드별 증례 세트 번들 빌드/조회")
+    ap.add_argument("--root", default=CASE_SETS_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("csv")
+    b.add_argument("code")
+    b.add_argument("--title", default="")
+    sub.add_parser("list")
+    args = ap.parse_args(argv)
+    if args.cmd == "build":
+        print(build_bundle(args.csv, args.code, args.title, args.root))
+    else:
+        for m in list_case_sets(args.root):
+            print(f"{m['code']}\t{m['rows']} cases\t{m['title']}\t{m['built_at']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# llm_ddx_control_app/checkpoint.py
+# 참가자별 재개(resume) 체크포인트: {CHECKPOINT_DIR}/{participant_id}_{arm}.json
+# 결과 행을 기록하는 같은 sink(같은 write-behind 샤드)에서 함께 갱신되므로 결과 파일보다 앞서지 않습니다.
+# 서버가 재시작된 뒤 "세션 시작/재개"를 누르면 결과 CSV 전체를 다시 읽지 않고 이 파일 하나로 세션을 복원합니다.
+#
+# 파일 내용 (가장 최근 session_uuid 기준):
+#   {"participant_id", "arm", "session_uuid", "dataset", "started", "finalized", "case_index", "cases_total",
+#    "file_name", "seconds", "updated_ns", "rows": {file_name: 마지막 저장 행}}
+#   dataset/started/finalized는 세션 시작·종료 때 write_checkpoint_meta로 따로 기록합니다 (결과 행 스키마와 무관).
+# 다른 세션이 체크포인트를 대체하면 이전 파일은 {CHECKPOINT_DIR}/archive/{participant_id}_{arm}_{updated_ns}.json으로 옮깁니다.
+# 같은 세션의 저장 행은 {participant_id}_{arm}.delta.jsonl에 {"row", "updated_ns"}로 덧붙이고(저장마다 O(1)),
+# CHECKPOINT_COMPACT_EVERY개가 쌓이거나 메타·세션이 바뀌면 .json을 다시 쓰고 delta 파일을 지웁니다.
+# 읽을 때는 .json보다 updated_ns가 큰 같은 세션의 delta만 다시 반영합니다 (압축 도중 중단돼도 되돌아가지 않음).
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_ddx_control_app.config import CHECKPOINT_COMPACT_EVERY, CHECKPOINT_DIR, CHECKPOINT_MAX_STATES, SAVE_DIR
+
+Batch = List[Tuple[str, Dict]]
+
+
+def checkpoint_path(participant_id: str, arm: str = "control", ckpt_dir: str = CHECKPOINT_DIR) -> str:
+    return os.path.join(ckpt_dir, f"{participant_id}_{arm}.json")
+
+
+def delta_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".delta.jsonl"
+
+
+def _new_state(participant_id: str, arm: str, session_uuid: str) -> Dict:
+    return {
+        "participant_id": participant_id,
+        "arm": arm,
+        "session_uuid": session_uuid,
+        "dataset": "",
+        "started": "",
+        "finalized": False,
+        "rows": {},
+    }
+
+
+def _fold(state: Optional[Dict], participant_id: str, row: Dict) -> Dict:
+    """체크포인트 상태에 저장 행 하나를 반영 (다른 세션의 행이면 새 상태로 시작)."""
+    sid = str(row.get("session_uuid", ""))
+    if state is None or state.get("session_uuid") != sid:
+        state = _new_state(participant_id, str(row.get("arm") or "control"), sid)
+    state["rows"][str(row.get("file_name", ""))] = row
+    state["case_index"] = int(row.get("case_index") or 1)
+    state["cases_total"] = int(row.get("cases_total") or 0)
+    state["file_name"] = str(row.get("file_name", ""))
+    state["seconds"] = int(row.get("seconds") or 0)
+    state["updated_ns"] = time.time_ns()
+    return state
+
+
+META_FIELDS = ("dataset", "started", "finalized")
+
+
+def _fold_meta(state: Optional[Dict], participant_id: str, meta: Dict) -> Dict:
+    """세션 메타(dataset/started/finalized)를 반영. 행보다 먼저 와도, 나중에 와도 같은 결과."""
+    sid = str(meta.get("session_uuid", ""))
+    if state is None or state.get("session_uuid") != sid:
+        state = _new_state(participant_id, str(meta.get("arm") or "control"), sid)
+    for k in META_FIELDS:
+        if k in meta:
+            state[k] = meta[k]
+    state["updated_ns"] = time.time_ns()
+    return state
+
+
+def resumable(state: Optional[Dict], dataset: str, today: str) -> bool:
+    """체크포인트로 세션을 이어도 되는지: 종료되지 않았고, 같은 증례 세트·같은 날짜에 시작했으며 저장 행이 있음.
+
+    이전 형식(메타 없음) 체크포인트는 재개하지 않습니다.
+    """
+    return bool(
+        state
+        and state.get("rows")
+        and not state.get("finalized")
+        and dataset
+        and state.get("dataset") == dataset
+        and state.get("started") == today
+    )
+
+
+class CheckpointStore:
+    """참가자별 체크포인트 파일.
+
+    최근 상태는 메모리(LRU)에 두고, 저장 행은 delta 파일에 덧붙이며 가끔 .json을 원자적으로 교체합니다.
+    """
+
+    def __init__(self, ckpt_dir: str = CHECKPOINT_DIR):
+        self.ckpt_dir = ckpt_dir
+        self._states: "OrderedDict[str, Dict]" = OrderedDict()
+        self._deltas: Dict[str, int] = {}  # path → .json 이후 덧붙인 delta 수
+        self._lock = threading.Lock()
+
+    def _read(self, path: str) -> Tuple[Optional[Dict], int]:
+        """.json과 그 이후의 delta를 합친 상태, 반영한 delta 수."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None, 0
+        n = 0
+        try:
+            with open(delta_path(path), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # 잘린 마지막 줄
+                    row = rec.get("row") or {}
+                    if (str(row.get("session_uuid", "")) != state.get("session_uuid")
+                            or rec.get("updated_ns", 0) <= state.get("updated_ns", 0)):
+                        continue  # 이미 .json에 들어간 delta (압축 후 delta 삭제 전에 중단된 경우)
+                    state = _fold(state, state["participant_id"], row)
+                    state["updated_ns"] = rec["updated_ns"]
+                    n += 1
+        except OSError:
+            pass
+        return state, n
+
+    def archive_path(self, path: str, state: Dict) -> str:
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.ckpt_dir, "archive", f"{name}_{state.get('updated_ns') or time.time_ns()}.json")
+
+    def _update(self, batch: Batch, fold: Callable[[Optional[Dict], str, Dict], Dict]):
+        touched: Dict[str, Dict] = {}
+        archived: List[Tuple[str, Dict]] = []
+        appends: Dict[str, List[str]] = {}
+        full = set()
+        with self._lock:
+            for pid, row in batch:
+                path = checkpoint_path(pid, str(row.get("arm") or "control"), self.ckpt_dir)
+                state = self._states.get(path)
+                if state is None:
+                    state, self._deltas[path] = self._read(path)
+                new = fold(state, pid, row)
+                if state is not None and new is not state and path not in touched:
+                    archived.append((path, state))  # 다른 세션이 대체한 체크포인트
+                if new is state and fold is _fold:
+                    appends.setdefault(path, []).append(
+                        json.dumps({"row": row, "updated_ns": new["updated_ns"]}, ensure_ascii=False, default=str)
+                    )
+                else:
+                    full.add(path)  # 새 상태(새 세션) 또는 메타 변경 → .json 전체를 다시 씀
+                self._states[path] = touched[path] = new
+                self._states.move_to_end(path)
+            for path in touched:
+                n = self._deltas.get(path, 0) + len(appends.get(path, ()))
+                if path in full or n > CHECKPOINT_COMPACT_EVERY:
+                    full.add(path)
+                    self._deltas[path] = 0
+                else:
+                    self._deltas[path] = n
+        os.makedirs(self.ckpt_dir, exist_ok=True)
+        for path, state in archived:
+            self._write(self.archive_path(path, state), state)
+        for path, state in touched.items():
+            if path in full:
+                self._write(path, state)
+                try:
+                    os.remove(delta_path(path))
+                except OSError:
+                    pass
+            else:
+                with open(delta_path(path), "a", encoding="utf-8") as f:
+                    f.write("\n".join(appends[path]) + "\n")
+        self._evict([p for p, state in touched.items() if state.get("finalized")])
+
+    def _evict(self, finished: List[str]):
+        """종료된 세션과 LRU 한도를 넘는 상태를 메모리에서 내림 (파일이 원본이므로 다음 사용 때 다시 읽음)."""
+        with self._lock:
+            for path in finished:
+                self._states.pop(path, None)
+                self._deltas.pop(path, None)
+            while len(self._states) > max(1, CHECKPOINT_MAX_STATES):
+                path, _ = self._states.popitem(last=False)
+                self._deltas.pop(path, None)
+
+    def _write(self, path: str, state: Dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+
+    def write_batch(self, batch: Batch):
+        self._update(batch, _fold)
+
+    def write_meta(self, batch: Batch):
+        """(participant_id, {"arm", "session_uuid", dataset/started/finalized 중 일부}) 배치."""
+        self._update(batch, _fold_meta)
+
+    def load(self, participant_id: str, arm: str = "control") -> Optional[Dict]:
+        """참가자의 최신 체크포인트 (없으면 None)."""
+        path = checkpoint_path(participant_id, arm, self.ckpt_dir)
+        with self._lock:
+            state = self._states.get(path)
+        if state is None:
+            state, _ = self._read(path)
+        return json.loads(json.dumps(state)) if state is not None else None
+
+
+_SINKS: Dict[Tuple[object, Optional[CheckpointStore]], Callable[[Batch], None]] = {}
+_SINKS_LOCK = threading.Lock()
+
+
+def checkpointed_sink(backend, store: Optional[CheckpointStore] = None) -> Callable[[Batch], None]:
+    """backend.write_batch 후 체크포인트(store, 없으면 프로세스 전역 저장소)를 갱신하는 sink.
+
+    write-behind 워커가 같은 sink끼리 배치로 묶을 수 있도록 (백엔드, 저장소)마다 같은 객체를 재사용합니다.
+    """
+    with _SINKS_LOCK:
+        sink = _SINKS.get((backend, store))
+        if sink is None:
+            def sink(batch, _backend=backend, _store=store):
+                _backend.write_batch(batch)
+                (_store or get_checkpoints()).write_batch(batch)
+            _SINKS[(backend, store)] = sink
+        return sink
+
+
+def write_checkpoint_meta(batch: Batch):
+    """세션 메타 sink (write-behind 워커가 결과 행과 같은 샤드에서 순서대로 기록)."""
+    get_checkpoints().write_meta(batch)
+
+
+def checkpoint_dir(save_dir: str) -> str:
+    """결과 디렉터리 save_dir에 딸린 체크포인트 위치 (기본 SAVE_DIR이면 CHECKPOINT_DIR)."""
+    return CHECKPOINT_DIR if save_dir == SAVE_DIR else os.path.join(save_dir, "checkpoints")
+
+
+_STORE: Optional[CheckpointStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_checkpoints() -> CheckpointStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = CheckpointStore()
+        return _STORE
@@ -5,10 +5,61 @@ TIME_LIMIT_MIN = 70
 REQUIRE_AT_LEAST = 3
 REQUIRE_AT_MOST = 5
 AUTOSAVE_SEC = 10
+AUTOSAVE_ON_CHANGE_ONLY = True   # 입력이 바뀐 경우에만 자동저장 (False면 AUTOSAVE_SEC마다 항상 저장)
 SAVE_DIR = "results"
+LOCAL_RESULT_FORMAT = "journal"  # 로컬 저장 백엔드: "journal"(.jsonl append 후 CSV로 압축) / "csv"(행마다 CSV append) / "sqlite"
+SQLITE_PATH = f"{SAVE_DIR}/results.sqlite3"  # sqlite 백엔드 DB 파일 (WAL 모드)
+JOURNAL_FSYNC = "interval"     # "always" / "interval" / "never"
+JOURNAL_FSYNC_SEC = 5.0        # interval 정책의 fsync 간격
+JOURNAL_MAX_OPEN = 64          # 동시에 열어 둘 저널 파일 핸들 수
+WRITE_BEHIND = True            # 결과 저장을 백그라운드 워커로 처리
+WRITE_BEHIND_WORKERS = 2       # 워커 스레드 수 (참가자별 순서는 항상 보장)
+WRITE_BEHIND_QUEUE_MAX = 1000  # 워커별 대기 행 상한 (초과 시 직접 기록)
+WRITE_BEHIND_BATCH_MAX = 200   # 워커가 한 번에 기록할 최대 행 수
+GSHEETS_BATCH_SIZE = 20        # append_rows 한 번에 보낼 최대 행 수
+GSHEETS_BATCH_WINDOW_SEC = 2.0 # 배치를 모으는 최대 대기 시간
+GSHEETS_MAX_RETRIES = 5        # 전송 실패 시 재시도 횟수 (지수 백오프)
+RESULT_HISTORY_LEN = 20       # 세션별로 보관할 최근 저장 행 수 (0이면 이력 없음)
+CASE_CACHE_MAX_ENTRIES = 8   # 프로세스당 캐시할 증례 CSV 개수 (LRU)
+RESULT_INDEX_MAX_ENTRIES = 256  # 프로세스당 메모리에 둘 참가자 결과 인덱스 수 (LRU; 밀려난 인덱스는 다음 사용 때 파일/DB에서 다시 시드)
+LAZY_CASE_LOADING = True     # 증례 CSV를 통째로 읽지 않고 현재(±1) 증례만 파싱
+CASE_SETS_DIR = "case_sets"  # 연구 코드별 사전 컴파일 증례 번들 위치 (case_sets.py)
+CASE_ROW_CACHE = 8           # 지연 로딩 소스가 보관할 파싱된 증례 행 수
+METRICS_ENABLED = True       # 핫패스 타이머/카운터 수집 (metrics.py)
+METRICS_WINDOW = 1024        # 타이머별 백분위 계산에 쓰는 최근 샘플 수
+METRICS_EXPORT_PATH = ""     # 지표 파일 경로 (".prom"이면 Prometheus 텍스트, 그 외 JSONL; 빈 값이면 내보내지 않음)
+METRICS_EXPORT_SEC = 15.0    # 지표 파일 내보내기 간격
+RESUME_CHECKPOINTS = True    # 참가자별 체크포인트로 서버 재시작 후 세션 재개
+CHECKPOINT_DIR = f"{SAVE_DIR}/checkpoints"  # 체크포인트 파일 위치 ({participant_id}_{arm}.json)
+CHECKPOINT_MAX_STATES = 1024  # 프로세스당 메모리에 둘 체크포인트 상태 수 (LRU; 종료된 세션은 바로 내림)
+CHECKPOINT_COMPACT_EVERY = 32  # 저장 행은 .delta.jsonl에 덧붙이고, 이만큼 쌓이면 .json 전체를 다시 씀
+WRITER_SOCKET = ""            # writer 데몬 Unix 소켓 경로 (설정 시 여러 앱 프로세스가 결과 파일을 직접 쓰지 않고 데몬에 제출)
+WRITER_SPILL_DIR = f"{SAVE_DIR}/spill"  # 데몬에 연결할 수 없을 때 프로세스별로 임시 기록 (데몬 시작 시 재생)
+ADMIN_QUERY_PARAM = "admin"  # URL에 ?admin=1 이 있으면 사이드바에 관리자 지표 패널 표시
+WARMUP_ON_START = True       # 첫 rerun에서 pandas import 등 무거운 준비를 백그라운드로 미리 수행 (warmup.py)
+TIMING_EVENTS = True         # 증례별 진입/이탈/첫 입력/이동/종료 이벤트를 monotonic 시각으로 기록 (timing.py)
+TIMING_BUFFER_EVENTS = 256   # 세션별 이벤트 링버퍼 크기 (가득 차면 가장 오래된 미전송 이벤트부터 버림)
+TIMING_FLUSH_EVENTS = 32     # 이만큼 쌓이면 한 번에 전송
+TIMING_FLUSH_SEC = 30.0      # 가장 오래된 미전송 이벤트가 이 시간보다 오래되면 전송
+TIMING_EVENTS_DIR = f"{SAVE_DIR}/events"  # 이벤트 파일 위치 ({participant_id}_{arm}_{날짜}.jsonl; 결과 파일과 분리)
 
 # Expected CSV schema
 REQUIRED_COLS = [
     "file_name",
     "현병력-Free Text#13"
-]
\ No newline at end of file
+]
+# Result row schema (build_row 순서; 모든 저장 백엔드/시트가 같은 컬럼을 씀)
+RESULT_COLUMNS = [
+    "timestamp",
+    "session_uuid",
+    "participant_id",
+    "arm",
+    "case_index",
+    "cases_total",
+    "file_name",
+    "entered_ddx_list",
+    "notes",
+    "seconds",
+    "case_id",
+    "hpi_edit",
+]
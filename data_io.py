@@ -1,17 +1,336 @@
+import io
 import os
-import pandas as pd
+import csv
+import hashlib
+import tempfile
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
 import streamlit as st
-from llm_ddx_control_app.config import REQUIRED_COLS
+from llm_ddx_control_app.config import REQUIRED_COLS, CASE_CACHE_MAX_ENTRIES, CASE_ROW_CACHE
+from llm_ddx_control_app.metrics import timer
+
+if TYPE_CHECKING:
+    import pandas as pd  # 콜드 스타트 단축: pandas는 첫 업로드 파싱 때 import (warmup.py)
+
+
+# ---- 증례 CSV 캐시 (프로세스 전역, 업로드 내용 해시 기준) ----
+# 같은 파일을 올린 모든 세션이 하나의 파싱 결과를 공유합니다.
+# 반환되는 DataFrame은 공유 객체이므로 호출 측에서 수정하면 안 됩니다.
+_CASE_CACHE: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_CASE_CACHE_LOCK = threading.Lock()
+_CASE_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
 
+def _upload_bytes(uploaded_file) -> bytes:
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    data = uploaded_file.read()
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return data
 
-def read_uploaded_csv(uploaded_file) -> pd.DataFrame:
-    df = pd.read_csv(uploaded_file)
+
+def _parse_cases(data: bytes) -> "pd.DataFrame":
+    import pandas as pd
+
+    df = pd.read_csv(io.BytesIO(data))
     missing = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing:
         st.error(f"CSV 누락 컬럼: {missing}")
         st.stop()
-    return df.copy()
+    return df
+
+
+def read_uploaded_csv(uploaded_file) -> "pd.DataFrame":
+    """업로드된 증례 CSV를 읽어 검증된 (읽기 전용) 증례 테이블을 반환.
+
+    rerun마다 다시 파싱하지 않도록 내용 해시로 캐시하며,
+    최대 CASE_CACHE_MAX_ENTRIES개를 LRU 방식으로 유지합니다.
+    """
+    data = _upload_bytes(uploaded_file)
+    key = hashlib.sha256(data).hexdigest()
+
+    with _CASE_CACHE_LOCK:
+        df = _CASE_CACHE.get(key)
+        if df is not None:
+            _CASE_CACHE.move_to_end(key)
+            _CASE_CACHE_STATS["hits"] += 1
+            return df
+
+    # 파싱은 락 밖에서 (검증 실패 시 st.stop()으로 캐시에 들어가지 않음)
+    with timer("csv_load"):
+        df = _parse_cases(data)
+
+    with _CASE_CACHE_LOCK:
+        _CASE_CACHE_STATS["misses"] += 1
+        _CASE_CACHE[key] = df
+        _CASE_CACHE.move_to_end(key)
+        while len(_CASE_CACHE) > max(1, CASE_CACHE_MAX_ENTRIES):
+            _CASE_CACHE.popitem(last=False)
+            _CASE_CACHE_STATS["evictions"] += 1
+        return _CASE_CACHE[key]
+
+
+# ---- 증례 키 테이블 ----
+class CaseKeyTable:
+    """file_name → 짧은 고정 id (데이터셋 로드 시 한 번 계산).
+
+    md5 앞 8자리를 쓰고, 같은 CSV 안에서 접두어가 겹치면 충돌이 없어질 때까지 길이를 늘립니다.
+    위젯 키(ddx_*/hpi_*)와 결과 행의 case_id가 모두 이 id를 사용합니다.
+    """
+
+    def __init__(self, file_names: Iterable):
+        self.file_names: List[str] = [str(f) for f in file_names]
+        counts = Counter(self.file_names)
+        self.duplicates: List[str] = sorted(f for f, n in counts.items() if n > 1)
+        digests = {f: hashlib.md5(f.encode("utf-8")).hexdigest() for f in counts}
+        length = 8
+        while length < 32 and len({d[:length] for d in digests.values()}) < len(digests):
+            length += 2
+        self.length = length
+        self.collisions = length > 8
+        self._ids: Dict[str, str] = {f: d[:length] for f, d in digests.items()}
+
+    def __len__(self) -> int:
+        return len(self.file_names)
+
+    def id_at(self, i: int) -> str:
+        return self._ids[self.file_names[i]]
+
+    def id_for(self, file_name) -> str:
+        fid = str(file_name)
+        return self._ids.get(fid) or hashlib.md5(fid.encode("utf-8")).hexdigest()[:self.length]
+
+
+def case_keys_for_frame(df: "pd.DataFrame") -> CaseKeyTable:
+    """DataFrame 경로용 키 테이블 (공유 DataFrame의 attrs에 한 번만 계산해 둠)."""
+    table = df.attrs.get("case_keys")
+    if table is None:
+        table = CaseKeyTable(df["file_name"].astype(str) if "file_name" in df.columns else [""] * len(df))
+        df.attrs["case_keys"] = table
+    return table
+
+
+# ---- 지연 로딩 증례 소스 (행 오프셋 인덱스) ----
+# 업로드 내용을 디스크(임시 디렉터리)에 한 번 저장하고 각 레코드의 바이트 오프셋만 기억합니다.
+# 현재 증례(와 prefetch한 앞/뒤 증례)만 파싱하므로 세션 메모리는 파일 크기와 무관합니다.
+_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "llm_ddx_cases")
+
+
+def _record_offsets(f) -> array:
+    """레코드 시작 오프셋 목록(마지막은 파일 끝)을 만든다. 첫 레코드는 헤더.
+
+    레코드 경계는 csv.reader가 직접 정하고, 여기서는 reader가 가져간 줄들의 바이트 위치만 따라갑니다.
+    (따옴표 개수 홀짝으로 판단하면 따옴표 없는 필드 안의 '"' 하나에 경계가 어긋남)
+    빈 줄은 csv.reader처럼 건너뜁니다.
+    """
+    offsets = array("q")
+    pos = 0
+
+    def lines():
+        nonlocal pos
+        for k, line in enumerate(f):
+            pos += len(line)
+            yield line.decode("utf-8-sig" if k == 0 else "utf-8")
+
+    start = 0
+    for rec in csv.reader(lines()):
+        if rec:
+            offsets.append(start)
+        start = pos
+    offsets.append(pos)
+    return offsets
+
+
+class CaseSourceError(ValueError):
+    """오프셋 인덱스로 증례 CSV를 읽을 수 없음 (호출 측은 통째로 읽는 경로로 대체)."""
+
+
+class CaseSource:
+    """증례 CSV의 지연 로딩 뷰. len()과 row(i)만 제공 (DataFrame.iloc[i] 대체).
+
+    파일은 연 채로 두므로, 캐시에서 밀려나 스풀 파일이 지워진 뒤에도 소스를 쥔 세션은 계속 읽을 수 있습니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                offsets = _record_offsets(f)
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise CaseSourceError(str(e)) from e
+        with open(path, "rb") as f:
+            f.seek(offsets[0])
+            header = f.read(offsets[1] - offsets[0]) if len(offsets) > 1 else b""
+        self.columns: List[str] = next(csv.reader(io.StringIO(header.decode("utf-8-sig"))), [])
+        self._offsets = offsets[1:]  # 헤더 다음부터 (마지막 항목은 파일 끝)
+        self._rows: "OrderedDict[int, pd.Series]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.case_keys = CaseKeyTable(self._scan_column("file_name"))
+        self._file = open(path, "rb")
+        self._file_lock = threading.Lock()
+
+    def _scan_column(self, name: str) -> List[str]:
+        """한 컬럼만 스트리밍으로 읽음 (키 테이블용, 한 번만).
+
+        오프셋 인덱스와 별개인 csv.reader 패스이므로 레코드 수가 다르면 CaseSourceError를 냅니다.
+        """
+        col = self.columns.index(name) if name in self.columns else None
+        out: List[str] = []
+        with open(self.path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for rec in reader:
+                if rec:
+                    out.append(rec[col] if col is not None and col < len(rec) else "")
+        if len(out) != len(self):
+            raise CaseSourceError(f"레코드 수 불일치: 오프셋 {len(self)}개, csv.reader {len(out)}개")
+        return out
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def missing_columns(self) -> List[str]:
+        return [c for c in REQUIRED_COLS if c not in self.columns]
+
+    def _read(self, i: int) -> "pd.Series":
+        import pandas as pd
+
+        start, end = self._offsets[i], self._offsets[i + 1]
+        with self._file_lock:
+            self._file.seek(start)
+            raw = self._file.read(end - start)
+        values = next(csv.reader(io.StringIO(raw.decode("utf-8"))), [])
+        values = (values + [""] * len(self.columns))[:len(self.columns)]
+        return pd.Series(dict(zip(self.columns, values)), name=i, dtype=object)
+
+    def row(self, i: int) -> "pd.Series":
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        with self._lock:
+            r = self._rows.get(i)
+            if r is not None:
+                self._rows.move_to_end(i)
+                return r
+        r = self._read(i)
+        with self._lock:
+            self._rows[i] = r
+            while len(self._rows) > max(1, CASE_ROW_CACHE):
+                self._rows.popitem(last=False)
+        return r
+
+    def close(self):
+        self._file.close()
+
+
+class FrameCases:
+    """통째로 읽은 DataFrame을 CaseSource와 같은 인터페이스로 감쌈 (지연 로딩 실패 시 대체 경로)."""
+
+    def __init__(self, df: "pd.DataFrame"):
+        self.df = df
+        self.columns: List[str] = list(df.columns)
+        self.case_keys = case_keys_for_frame(df)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def row(self, i: int) -> "pd.Series":
+        return self.df.iloc[i]
+
+
+_SOURCES: "OrderedDict[str, CaseSource]" = OrderedDict()
+_SESSION_KEY = "_case_upload"  # session_state: (uploaded.file_id, 내용 해시, 소스)
+
+
+def open_case_source(uploaded_file):
+    """업로드 파일을 지연 로딩 증례 소스로 연다 (내용 해시 기준으로 프로세스 전역 공유).
+
+    REQUIRED_COLS는 헤더만으로 검증합니다. 오프셋 인덱스가 csv.reader와 어긋나는 파일은
+    read_uploaded_csv로 통째로 읽어 FrameCases로 돌려줍니다.
+    같은 업로드(file_id)에 대해서는 rerun마다 해시·스풀하지 않도록 세션에 결과를 둡니다.
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    cached = st.session_state.get(_SESSION_KEY)
+    if file_id is not None and cached is not None and cached[0] == file_id:
+        return cached[2]
+
+    data = _upload_bytes(uploaded_file)
+    key = hashlib.sha256(data).hexdigest()
+    src = _open_spooled(key, data, uploaded_file)
+    if file_id is not None:
+        st.session_state[_SESSION_KEY] = (file_id, key, src)
+    return src
+
+
+def upload_digest(uploaded_file) -> str:
+    """업로드 내용의 sha256 (open_case_source가 세션에 둔 값이 있으면 다시 해시하지 않음)."""
+    cached = st.session_state.get(_SESSION_KEY)
+    if cached is not None and cached[0] == getattr(uploaded_file, "file_id", None):
+        return cached[1]
+    return hashlib.sha256(_upload_bytes(uploaded_file)).hexdigest()
+
+
+def _open_spooled(key: str, data: bytes, uploaded_file):
+    with _CASE_CACHE_LOCK:
+        src = _SOURCES.get(key)
+        if src is not None:
+            _SOURCES.move_to_end(key)
+            _CASE_CACHE_STATS["hits"] += 1
+            return src
+
+    with timer("csv_load"):
+        os.makedirs(_SPOOL_DIR, exist_ok=True)
+        path = os.path.join(_SPOOL_DIR, f"{key}.csv")
+        if not os.path.exists(path):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        del data
+        try:
+            src = CaseSource(path)
+        except CaseSourceError:
+            src = None
+    if src is None:
+        return FrameCases(read_uploaded_csv(uploaded_file))
+    missing = src.missing_columns()
+    if missing:
+        st.error(f"CSV 누락 컬럼: {missing}")
+        st.stop()
+
+    with _CASE_CACHE_LOCK:
+        _CASE_CACHE_STATS["misses"] += 1
+        _SOURCES[key] = src
+        while len(_SOURCES) > max(1, CASE_CACHE_MAX_ENTRIES):
+            _remove_spool(_SOURCES.popitem(last=False)[1])
+            _CASE_CACHE_STATS["evictions"] += 1
+        return _SOURCES[key]
+
+
+def _remove_spool(src: CaseSource):
+    """밀려난 소스의 스풀 파일 삭제 (열린 핸들은 남으므로 아직 쥐고 있는 세션은 영향 없음)."""
+    try:
+        os.remove(src.path)
+    except OSError:
+        pass  # 이미 지워짐, 또는 열린 파일을 지울 수 없는 플랫폼 (다음 스풀 때 덮어씀)
+
+
+def case_cache_info() -> dict:
+    """캐시 상태 (entries/sources/hits/misses/evictions)."""
+    with _CASE_CACHE_LOCK:
+        return {"entries": len(_CASE_CACHE), "sources": len(_SOURCES), **_CASE_CACHE_STATS}
+
+
+def clear_case_cache():
+    with _CASE_CACHE_LOCK:
+        _CASE_CACHE.clear()
+        for src in _SOURCES.values():
+            _remove_spool(src)
+        _SOURCES.clear()
 
 
 def ensure_results_dir(path: str):
-    os.makedirs(path, exist_ok=True)
\ No newline at end of file
+    os.makedirs(path, exist_ok=True)
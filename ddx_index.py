@@ -0,0 +1,187 @@
+# llm_ddx_control_app/ddx_index.py
+# 자유 입력 감별진단을 참조 진단 어휘(reference vocabulary)와 빠르게 매칭하기 위한 정규화 + 인덱스.
+#
+# 어휘 파일 (UTF-8, 한 줄에 개념 하나, 탭 또는 '|'로 구분, '#'은 주석):
+#     급성 충수염<TAB>충수염<TAB>appendicitis<TAB>acute appendicitis
+# 첫 항목이 대표명(canonical), 나머지는 동의어입니다.
+#
+#   python -m llm_ddx_control_app.ddx_index build vocab.tsv ddx_vocab   # 인덱스 파일 생성
+#   python -m llm_ddx_control_app.ddx_index match ddx_vocab "충수돌기염"
+#
+# 빌드 결과는 {prefix}.meta.json + {prefix}.*.npy이며, npy는 np.load(mmap_mode="r")로 읽기 전용 공유됩니다.
+
+import os
+import re
+import json
+import argparse
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+NGRAM = 2
+MIN_SCORE = 0.5
+
+_PUNCT_RE = re.compile(r"[\s\-_/.,;:()\[\]{}<>\"'`~!?·•]+")
+
+
+def normalize(text: str) -> str:
+    """NFKC(전각/호환 문자 통일, 한글은 완성형) + casefold + 구두점/공백 정리."""
+    s = unicodedata.normalize("NFKC", str(text)).casefold()
+    return _PUNCT_RE.sub(" ", s).strip()
+
+
+def compact(norm: str) -> str:
+    """띄어쓰기 차이 무시용 키 ("급성 충수염" == "급성충수염")."""
+    return norm.replace(" ", "")
+
+
+def ngrams(norm: str, n: int = NGRAM) -> List[str]:
+    s = f"^{compact(norm)}$"
+    if len(s) <= n:
+        return [s]
+    return sorted({s[i:i + n] for i in range(len(s) - n + 1)})
+
+
+def load_vocabulary(path: str) -> List[List[str]]:
+    """어휘 파일 → [[canonical, syn1, ...], ...]"""
+    concepts = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            terms = [t.strip() for t in re.split(r"[\t|]", line) if t.strip()]
+            if terms:
+                concepts.append(terms)
+    return concepts
+
+
+def build_index(concepts: List[List[str]], prefix: str, n: int = NGRAM) -> str:
+    """개념 목록으로 인덱스 파일을 만든다 (prefix.meta.json / prefix.*.npy)."""
+    terms: List[str] = []          # 정규화된 용어
+    term_concept: List[int] = []   # 용어 → 개념 번호
+    seen: Dict[str, int] = {}
+    for cid, names in enumerate(concepts):
+        for name in names:
+            norm = normalize(name)
+            if not norm or norm in seen:
+                continue
+            seen[norm] = len(terms)
+            terms.append(norm)
+            term_concept.append(cid)
+
+    postings: Dict[str, List[int]] = {}
+    term_ngrams = np.zeros(len(terms), dtype=np.int32)
+    for tid, norm in enumerate(terms):
+        grams = ngrams(norm, n)
+        term_ngrams[tid] = len(grams)
+        for g in grams:
+            postings.setdefault(g, []).append(tid)
+
+    gram_list = sorted(postings)
+    offsets = np.zeros(len(gram_list) + 1, dtype=np.int64)
+    flat: List[int] = []
+    for i, g in enumerate(gram_list):
+        flat.extend(postings[g])
+        offsets[i + 1] = len(flat)
+
+    os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+    np.save(f"{prefix}.offsets.npy", offsets)
+    np.save(f"{prefix}.postings.npy", np.asarray(flat, dtype=np.int32))
+    np.save(f"{prefix}.term_concept.npy", np.asarray(term_concept, dtype=np.int32))
+    np.save(f"{prefix}.term_ngrams.npy", term_ngrams)
+    meta = {
+        "ngram": n,
+        "canonical": [c[0] for c in concepts],
+        "terms": terms,
+        "grams": gram_list,
+    }
+    with open(f"{prefix}.meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return prefix
+
+
+class DdxIndex:
+    """빌드된 인덱스를 읽어 진단명을 대표명으로 매칭 (정확 → 띄어쓰기 무시 → n-gram Dice 유사도)."""
+
+    def __init__(self, prefix: str, mmap: bool = True):
+        mode = "r" if mmap else None
+        with open(f"{prefix}.meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.n = meta["ngram"]
+        self.canonical: List[str] = meta["canonical"]
+        self.offsets = np.load(f"{prefix}.offsets.npy", mmap_mode=mode)
+        self.postings = np.load(f"{prefix}.postings.npy", mmap_mode=mode)
+        self.term_concept = np.load(f"{prefix}.term_concept.npy", mmap_mode=mode)
+        self.term_ngrams = np.load(f"{prefix}.term_ngrams.npy", mmap_mode=mode)
+        self._gram_id = {g: i for i, g in enumerate(meta["grams"])}
+        self._exact: Dict[str, int] = {}
+        self._compact: Dict[str, int] = {}
+        for tid, t in enumerate(meta["terms"]):
+            self._exact[t] = tid
+            self._compact.setdefault(compact(t), tid)
+        self._memo: Dict[Tuple[str, float], Tuple[Optional[str], float, str]] = {}
+
+    def _candidates(self, grams: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        slices = []
+        for g in grams:
+            gid = self._gram_id.get(g)
+            if gid is not None:
+                slices.append(self.postings[self.offsets[gid]:self.offsets[gid + 1]])
+        if not slices:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(slices), return_counts=True)
+
+    def match(self, text: str, min_score: float = MIN_SCORE) -> Tuple[Optional[str], float, str]:
+        """(대표명 또는 None, 점수 0~1, 방법 "exact"/"compact"/"ngram"/"none")"""
+        norm = normalize(text)
+        hit = self._memo.get((norm, min_score))
+        if hit is not None:
+            return hit
+        if not norm:
+            res = (None, 0.0, "none")
+        elif norm in self._exact:
+            res = (self.canonical[int(self.term_concept[self._exact[norm]])], 1.0, "exact")
+        elif compact(norm) in self._compact:
+            res = (self.canonical[int(self.term_concept[self._compact[compact(norm)]])], 1.0, "compact")
+        else:
+            grams = ngrams(norm, self.n)
+            tids, overlap = self._candidates(grams)
+            res = (None, 0.0, "none")
+            if len(tids):
+                scores = 2.0 * overlap / (len(grams) + self.term_ngrams[tids])
+                best = int(np.argmax(scores))
+                if scores[best] >= min_score:
+                    res = (self.canonical[int(self.term_concept[tids[best]])], float(scores[best]), "ngram")
+        if len(self._memo) >= 100_000:
+            self._memo.clear()
+        self._memo[(norm, min_score)] = res
+        return res
+
+    def match_many(self, texts: Iterable[str], min_score: float = MIN_SCORE) -> List[Tuple[Optional[str], float, str]]:
+        return [self.match(t, min_score) for t in texts]
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="감별진단 참조 어휘 인덱스 빌드/매칭")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("vocab")
+    b.add_argument("prefix")
+    b.add_argument("--ngram", type=int, default=NGRAM)
+    m = sub.add_parser("match")
+    m.add_argument("prefix")
+    m.add_argument("texts", nargs="+")
+    args = ap.parse_args(argv)
+    if args.cmd == "build":
+        concepts = load_vocabulary(args.vocab)
+        print(build_index(concepts, args.prefix, args.ngram), f"({len(concepts)} concepts)")
+    else:
+        idx = DdxIndex(args.prefix)
+        for t in args.texts:
+            print(t, "→", idx.match(t))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# llm_ddx_control_app/gsheets.py
+# Google Sheets 저장: 프로세스 전역 클라이언트/워크시트 재사용 + 백그라운드 배치 append.
+# 행마다 인증/open/append_row를 반복하지 않고, 크기/시간 창으로 모아 append_rows 한 번에 보냅니다.
+
+import os
+import csv
+import time
+import queue
+import random
+import threading
+from typing import Callable, Dict, List, Optional
+
+from llm_ddx_control_app.config import (
+    RESULT_COLUMNS,
+    SAVE_DIR,
+    GSHEETS_BATCH_SIZE,
+    GSHEETS_BATCH_WINDOW_SEC,
+    GSHEETS_MAX_RETRIES,
+)
+from llm_ddx_control_app.metrics import incr, timer
+
+SHEET_COLUMNS = RESULT_COLUMNS
+
+
+def sheet_values(row: Dict, columns: List[str] = SHEET_COLUMNS) -> List:
+    """시트 한 줄에 들어갈 값 (columns 순서; 기본은 SHEET_COLUMNS)."""
+    out = [row.get(c, "") for c in columns]
+    if "seconds" in columns and "seconds_left" in row:
+        i = columns.index("seconds")
+        if out[i] == "":
+            out[i] = row["seconds_left"]
+    return out
+
+
+def sheet_columns(ws) -> List[str]:
+    """워크시트 헤더(1행)에 맞춘 컬럼 순서. 헤더가 비어 있으면 SHEET_COLUMNS.
+
+    헤더가 SHEET_COLUMNS와 다르면(예: case_id/hpi_edit 이전의 10컬럼 시트) 기존 헤더 순서를 그대로 따르고,
+    헤더에 없는 컬럼은 보내지 않습니다.
+    """
+    header = [str(c).strip() for c in ws.row_values(1)]
+    while header and not header[-1]:
+        header.pop()
+    if not header:
+        return SHEET_COLUMNS
+    if header != SHEET_COLUMNS:
+        incr("sheets.header_mismatch")
+    return header
+
+
+# ---- 워크시트 핸들 ----
+_WS_CACHE: Dict[tuple, object] = {}
+_WS_LOCK = threading.Lock()
+
+
+def open_worksheet(sa_info: Dict, sheet_name: str, worksheet: str):
+    """인증된 gspread 워크시트를 (시트/탭별로) 한 번만 열어 재사용."""
+    key = (sa_info.get("client_email", ""), sheet_name, worksheet)
+    with _WS_LOCK:
+        ws = _WS_CACHE.get(key)
+        if ws is not None:
+            return ws
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        scopes = ["https://www.googleapis.com/auth/spreadsheets"]
+        creds = Credentials.from_service_account_info(dict(sa_info), scopes=scopes)
+        gc = gspread.authorize(creds)
+        ws = gc.open(sheet_name).worksheet(worksheet)
+        _WS_CACHE[key] = ws
+        return ws
+
+
+def reset_worksheet_cache():
+    with _WS_LOCK:
+        _WS_CACHE.clear()
+
+
+class LocalWorksheet:
+    """오프라인 테스트용 대체 워크시트 (append_rows만 구현, 선택적으로 CSV에 기록)."""
+
+    def __init__(self, path: Optional[str] = None, fail_times: int = 0, latency_sec: float = 0.0):
+        self.path = path
+        self.rows: List[List] = []
+        self.calls = 0
+        self._fail_times = fail_times
+        self._latency_sec = latency_sec
+        self._lock = threading.Lock()
+
+    def row_values(self, row: int) -> List:
+        """헤더 조회용 (1행만 지원): CSV 파일의 첫 줄, 파일이 없으면 빈 목록."""
+        if row != 1 or not self.path or not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+
+    def append_rows(self, values: List[List], value_input_option: str = "USER_ENTERED"):
+        if self._latency_sec:
+            time.sleep(self._latency_sec)
+        with self._lock:
+            self.calls += 1
+            if self._fail_times > 0:
+                self._fail_times -= 1
+                raise RuntimeError("local_worksheet_simulated_failure")
+            self.rows.extend(values)
+            if self.path:
+                new = not os.path.exists(self.path)
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", newline="", encoding="utf-8") as f:
+                    w = csv.writer(f)
+                    if new:
+                        w.writerow(SHEET_COLUMNS)
+                    w.writerows(values)
+
+
+# ---- 배치 writer ----
+class SheetsBatchWriter:
+    """큐에 쌓인 행을 batch_size개 또는 window_sec마다 append_rows로 전송.
+
+    실패 시 지수 백오프로 max_retries번 재시도하고, 그래도 실패한 행은 on_failure(row)로 넘깁니다.
+    """
+
+    def __init__(
+        self,
+        worksheet_factory: Callable[[], object],
+        batch_size: int = GSHEETS_BATCH_SIZE,
+        window_sec: float = GSHEETS_BATCH_WINDOW_SEC,
+        max_retries: int = GSHEETS_MAX_RETRIES,
+        on_failure: Optional[Callable[[Dict], None]] = None,
+        backoff_base_sec: float = 0.5,
+    ):
+        self._factory = worksheet_factory
+        self.batch_size = max(1, batch_size)
+        self.window_sec = window_sec
+        self.max_retries = max_retries
+        self.on_failure = on_failure
+        self.backoff_base_sec = backoff_base_sec
+        self._q: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._ws = None
+        self._columns: List[str] = SHEET_COLUMNS
+        self._stopped = threading.Event()
+        self.stats = {"rows_sent": 0, "batches": 0, "retries": 0, "rows_failed": 0}
+        self._thread = threading.Thread(target=self._run, name="gsheets-batch-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Dict):
+        if self._stopped.is_set():
+            raise RuntimeError("writer_stopped")
+        self._q.put(row)
+
+    def pending(self) -> int:
+        return self._q.qsize()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 제출된 행이 모두 처리될 때까지 대기. close() 이후에는 기다리지 않음."""
+        if self._stopped.is_set():
+            return not self._thread.is_alive()
+        done = threading.Event()
+        self._q.put({"__flush__": done})
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """남은 행을 보내고 스레드 종료."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._q.put(None)
+        self._thread.join(timeout)
+
+    def _collect(self, first: Dict) -> tuple:
+        batch, waiters = [], []
+        item = first
+        deadline = time.monotonic() + self.window_sec
+        stop = False
+        while True:
+            if item is None:
+                stop = True
+            elif "__flush__" in item:
+                waiters.append(item["__flush__"])
+                break  # flush 요청은 창을 기다리지 않고 즉시 전송
+            else:
+                batch.append(item)
+            if stop or len(batch) >= self.batch_size:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._q.get(timeout=remaining)
+            except queue.Empty:
+                break
+        return batch, waiters, stop
+
+    def _send(self, batch: List[Dict]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with timer("sheets_append"):
+                    if self._ws is None:
+                        ws = self._factory()
+                        self._columns = sheet_columns(ws)
+                        self._ws = ws
+                    values = [sheet_values(r, self._columns) for r in batch]
+                    self._ws.append_rows(values, value_input_option="USER_ENTERED")
+                self.stats["rows_sent"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    break
+                self.stats["retries"] += 1
+                incr("sheets_append.retries")
+                delay = self.backoff_base_sec * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay / 2))
+        self.stats["rows_failed"] += len(batch)
+        incr("sheets_append.rows_failed", len(batch))
+        if self.on_failure:
+            for r in batch:
+                try:
+                    self.on_failure(r)
+                except Exception:
+                    pass
+
+    def _run(self):
+        while True:
+            first = self._q.get()
+            batch, waiters, stop = self._collect(first)
+            if batch:
+                self._send(batch)
+            for w in waiters:
+                w.set()
+            if stop:
+                # 종료 신호 이후에 들어온 행도 비움
+                rest, late_waiters = [], []
+                while True:
+                    try:
+                        item = self._q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        continue
+                    if "__flush__" in item:
+                        late_waiters.append(item["__flush__"])
+                    else:
+                        rest.append(item)
+                for i in range(0, len(rest), self.batch_size):
+                    self._send(rest[i:i + self.batch_size])
+                for w in late_waiters:
+                    w.set()
+                return
+
+
+def local_standin_factory(path: Optional[str] = None, latency_sec: float = 0.0) -> Callable[[], LocalWorksheet]:
+    """secrets의 gsheets.backend = "local" 일 때 쓰는 오프라인 워크시트 (latency_sec: 호출당 지연)."""
+    ws = LocalWorksheet(path or os.path.join(SAVE_DIR, "gsheets_standin.csv"), latency_sec=latency_sec)
+    return lambda: ws
@@ -0,0 +1,148 @@
+# llm_ddx_control_app/hpi_edits.py
+# 세션별 HPI 편집 저장소: 원문은 증례 데이터(번들/CSV)에만 두고, 참가자가 실제로 고친 증례만 작은 diff로 보관합니다.
+# diff 형식 (JSON으로 결과 행의 hpi_edit 컬럼에 저장):
+#   {"base": 원문 md5 앞 8자리, "ops": [[i1, i2, 대체 문자열], ...]}  — 원문[i1:i2]를 대체 문자열로 바꿈 (원문 기준 위치)
+#
+# rerun마다는 편집 중인 텍스트만 기억하고(record), diff는 저장·증례 이탈 때(commit/release)
+# 텍스트 해시가 마지막 diff 이후 바뀐 경우에만 만듭니다.
+
+import json
+import hashlib
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+
+def _base(original: str) -> str:
+    return hashlib.md5(original.encode("utf-8")).hexdigest()[:8]
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    """a[:k] == b[:k]인 최대 k (k <= limit). 슬라이스 비교로 이분 탐색."""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """a[-k:] == b[-k:]인 최대 k (k <= limit)."""
+    na, nb = len(a), len(b)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[na - mid:na - lo] == b[nb - mid:nb - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def make_diff(original: str, edited: str) -> Dict:
+    """공통 앞/뒤를 잘라낸 가운데 구간만 줄 단위로 비교 (보통 편집 한 곳이면 비교 없이 op 하나)."""
+    p = _common_prefix(original, edited, min(len(original), len(edited)))
+    s = _common_suffix(original, edited, min(len(original), len(edited)) - p)
+    a, b = original[p:len(original) - s], edited[p:len(edited) - s]
+    ops: List[list] = []
+    if not a or not b or ("\n" not in a and "\n" not in b):
+        if a or b:
+            ops.append([p, p + len(a), b])
+        return {"base": _base(original), "ops": ops}
+
+    a_lines, b_lines = a.splitlines(keepends=True), b.splitlines(keepends=True)
+    a_pos, b_pos = [0], [0]
+    for line in a_lines:
+        a_pos.append(a_pos[-1] + len(line))
+    for line in b_lines:
+        b_pos.append(b_pos[-1] + len(line))
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a_lines, b_lines, autojunk=False).get_opcodes():
+        if tag != "equal":
+            ops.append([p + a_pos[i1], p + a_pos[i2], b[b_pos[j1]:b_pos[j2]]])
+    return {"base": _base(original), "ops": ops}
+
+
+def apply_diff(original: str, diff: Dict) -> str:
+    """원문에 diff를 적용. 원문이 바뀌어 base가 다르면 원문을 그대로 반환."""
+    if diff.get("base") != _base(original):
+        return original
+    out, pos = [], 0
+    for i1, i2, text in diff.get("ops", []):
+        out.append(original[pos:i1])
+        out.append(text)
+        pos = i2
+    out.append(original[pos:])
+    return "".join(out)
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.md5(text.encode("utf-8")).digest()
+
+
+class HpiEditStore:
+    """case_id → diff (수정한 증례만). 원문과 같아지면 항목을 지움."""
+
+    def __init__(self):
+        self._diffs: Dict[str, Dict] = {}
+        self._json: Dict[str, str] = {}
+        self._pending: Dict[str, Tuple[str, str]] = {}  # case_id → (원문, 편집 중 텍스트) — 위젯 값 참조만 보관
+        self._digests: Dict[str, bytes] = {}  # case_id → 마지막으로 diff를 만든 텍스트의 해시
+        self.diffs_made = 0
+
+    def record(self, case_id: str, original: str, edited: str):
+        """rerun마다 호출: 최신 텍스트만 기억 (diff는 commit 때)."""
+        self._pending[case_id] = (original, edited)
+
+    def commit(self, case_id: str):
+        """편집 중 텍스트를 diff로 반영 (마지막 diff 이후 텍스트가 바뀐 경우에만 계산)."""
+        pending = self._pending.get(case_id)
+        if pending is None:
+            return
+        original, edited = pending
+        digest = _digest(edited)
+        if self._digests.get(case_id) == digest:
+            return
+        self._digests[case_id] = digest
+        if edited == original:
+            self._diffs.pop(case_id, None)
+            self._json.pop(case_id, None)
+            return
+        diff = self._diffs[case_id] = make_diff(original, edited)
+        self._json[case_id] = json.dumps(diff, ensure_ascii=False)
+        self.diffs_made += 1
+
+    def release(self, case_id: str):
+        """증례를 떠날 때: diff를 확정하고 편집 중 텍스트는 놓음."""
+        self.commit(case_id)
+        self._pending.pop(case_id, None)
+
+    def load(self, case_id: str, diff_json: Optional[str]):
+        """결과 행의 hpi_edit 값으로 복원 (세션 재개 시)."""
+        if not diff_json:
+            return
+        try:
+            self._diffs[case_id] = json.loads(diff_json)
+        except (TypeError, ValueError):
+            return
+        self._json[case_id] = diff_json
+        self._pending.pop(case_id, None)
+        self._digests.pop(case_id, None)
+
+    def text(self, case_id: str, original: str) -> str:
+        pending = self._pending.get(case_id)
+        if pending is not None and pending[0] == original:
+            return pending[1]
+        diff = self._diffs.get(case_id)
+        return apply_diff(original, diff) if diff else original
+
+    def diff_json(self, case_id: str) -> Optional[str]:
+        self.commit(case_id)
+        return self._json.get(case_id)
+
+    def __len__(self) -> int:
+        return len(self._diffs)
+
+    def memory_chars(self) -> int:
+        return sum(len(t) for d in self._diffs.values() for _, _, t in d["ops"])
@@ -0,0 +1,221 @@
+# llm_ddx_control_app/journal.py
+# 결과 행 append-only 저널 (줄 단위 JSON, pandas 미사용) + 참가자별 CSV로의 압축(compaction).
+# 저장 경로에서는 파일 핸들을 열어 둔 채 한 줄씩 쓰고, 중복 제거된 CSV는 필요할 때만 만듭니다.
+# 압축이 끝나면 저널을 비우므로 다음 압축/인덱스 시드는 마지막 압축 이후의 행만 읽습니다.
+
+import os
+import csv
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain
+from typing import Dict, Iterator, List, Optional
+
+from llm_ddx_control_app.config import JOURNAL_FSYNC, JOURNAL_FSYNC_SEC, JOURNAL_MAX_OPEN
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class ResultJournal:
+    """한 파일에 대한 append 핸들. fsync 정책: always(매 행) / interval(fsync_sec마다) / never(flush만)."""
+
+    def __init__(self, path: str, fsync: str = JOURNAL_FSYNC, fsync_sec: float = JOURNAL_FSYNC_SEC):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"unknown fsync policy: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_sec = fsync_sec
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        self._refs = 0         # 사용 중인 호출 수 (_OPEN_LOCK으로 보호)
+        self._retired = False  # LRU에서 빠졌거나 close 요청됨 → 마지막 사용이 끝나면 닫음
+
+    def append(self, row: Dict):
+        line = json.dumps(row, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            if self.fsync == "always":
+                os.fsync(self._f.fileno())
+            elif self.fsync == "interval":
+                now = time.monotonic()
+                if now - self._last_sync >= self.fsync_sec:
+                    os.fsync(self._f.fileno())
+                    self._last_sync = now
+
+    @contextmanager
+    def exclusive(self):
+        """append를 막은 채 (버퍼를 비운 파일로) 작업. 압축 중 끼어드는 행이 없도록."""
+        with self._lock:
+            self._f.flush()
+            yield self._f
+
+    def sync(self):
+        with self._lock:
+            if not self._f.closed:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+                self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._f.closed:
+                self._f.flush()
+                if self.fsync != "never":
+                    os.fsync(self._f.fileno())
+                self._f.close()
+
+
+# ---- 열린 저널 핸들 (프로세스 전역, LRU로 개수 제한) ----
+# 핸들은 참조 수로 관리합니다: LRU에서 밀려나거나 close를 요청받아도 다른 워커가 쓰는 중이면
+# 그 사용이 끝날 때 닫으므로, 닫힌 파일에 append하다 행을 잃지 않습니다.
+_OPEN: "OrderedDict[str, ResultJournal]" = OrderedDict()
+_OPEN_LOCK = threading.Lock()
+
+
+def _retire_locked(j: ResultJournal) -> bool:
+    """_OPEN_LOCK 안에서 호출. 지금 닫아도 되면 True."""
+    j._retired = True
+    return j._refs == 0
+
+
+def _acquire(path: str) -> ResultJournal:
+    to_close = []
+    with _OPEN_LOCK:
+        j = _OPEN.get(path)
+        if j is not None:
+            _OPEN.move_to_end(path)
+        else:
+            j = _OPEN[path] = ResultJournal(path)
+            while len(_OPEN) > max(1, JOURNAL_MAX_OPEN):
+                _, old = _OPEN.popitem(last=False)
+                if _retire_locked(old):
+                    to_close.append(old)
+        j._refs += 1
+    for old in to_close:
+        old.close()
+    return j
+
+
+def _release(j: ResultJournal):
+    with _OPEN_LOCK:
+        j._refs -= 1
+        close = j._retired and j._refs == 0
+    if close:
+        j.close()
+
+
+@contextmanager
+def open_journal(path: str):
+    """사용하는 동안 닫히지 않는 저널 핸들."""
+    j = _acquire(path)
+    try:
+        yield j
+    finally:
+        _release(j)
+
+
+def append_row(path: str, row: Dict):
+    with open_journal(path) as j:
+        j.append(row)
+
+
+def close_journal(path: str):
+    with _OPEN_LOCK:
+        j = _OPEN.pop(path, None)
+        close = j is not None and _retire_locked(j)
+    if close:
+        j.close()
+
+
+def close_all():
+    with _OPEN_LOCK:
+        items = [j for j in _OPEN.values() if _retire_locked(j)]
+        _OPEN.clear()
+    for j in items:
+        j.close()
+
+
+# ---- 읽기 / 압축 ----
+def read_journal(path: str) -> Iterator[Dict]:
+    """저널의 행을 순서대로 읽음. 비정상 종료로 잘린 마지막 줄 등은 건너뜀."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def read_csv_rows(path: str) -> Iterator[Dict]:
+    """기존 CSV 행 (이전 압축 결과나 CSV 모드로 쓴 행)."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def latest_rows(rows: Iterator[Dict], keys=("participant_id", "file_name")) -> List[Dict]:
+    """keys별 마지막 행만 남김 (마지막 저장 순서 유지)."""
+    latest: "OrderedDict[tuple, Dict]" = OrderedDict()
+    for r in rows:
+        k = tuple(str(r.get(c, "")) for c in keys)
+        latest.pop(k, None)
+        latest[k] = r
+    return list(latest.values())
+
+
+def write_csv(rows: List[Dict], csv_path: str):
+    """rows를 CSV로 원자적으로 기록 (컬럼은 처음 등장한 순서)."""
+    columns: List[str] = []
+    seen = set()
+    for r in rows:
+        for c in r:
+            if c not in seen:
+                seen.add(c)
+                columns.append(c)
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+    tmp = f"{csv_path}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+    os.replace(tmp, csv_path)
+
+
+def compact_journal(journal_path: str, csv_path: Optional[str] = None, truncate: bool = True) -> str:
+    """저널을 (participant_id, file_name)별 최신 행 CSV로 materialize. 생성된 CSV 경로 반환.
+
+    CSV를 원자적으로 교체한 뒤 저널을 비웁니다 (truncate=False면 유지). 그 사이 같은 프로세스의 append는 대기하며,
+    교체 후 비우기 전에 중단되더라도 다음 압축에서 같은 행이 다시 합쳐질 뿐 결과는 같습니다.
+    """
+    csv_path = csv_path or os.path.splitext(journal_path)[0] + ".csv"
+    with open_journal(journal_path) as j, j.exclusive() as f:
+        write_csv(latest_rows(chain(read_csv_rows(csv_path), read_journal(journal_path))), csv_path)
+        if truncate:
+            f.truncate(0)
+            os.fsync(f.fileno())
+    return csv_path
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="결과 저널(.jsonl)을 중복 제거된 CSV로 압축")
+    ap.add_argument("journals", nargs="+")
+    args = ap.parse_args(argv)
+    for p in args.journals:
+        print(compact_journal(p))
+    close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# llm_ddx_control_app/metrics.py
+# 핫패스 계측: 이름별 타이머/카운터를 프로세스 전역 REGISTRY(및 선택적으로 세션별 Metrics)에 모읍니다.
+# 타이머는 누적 count/sum/errors와 최근 METRICS_WINDOW개 샘플의 rolling 히스토그램(백분위)을 유지합니다.
+# METRICS_EXPORT_PATH가 설정되면 백그라운드 스레드가 METRICS_EXPORT_SEC마다 내보냅니다:
+#   *.prom  → Prometheus 텍스트 형식 (파일 교체; node_exporter textfile collector 등에서 수집)
+#   그 외   → JSONL (스냅샷 한 줄씩 append)
+
+import os
+import re
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional
+
+from llm_ddx_control_app.config import METRICS_ENABLED, METRICS_WINDOW, METRICS_EXPORT_PATH, METRICS_EXPORT_SEC
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Metrics:
+    """스레드 안전 타이머/카운터 모음 (프로세스 전역 또는 세션별)."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = max(1, window)
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._totals: Dict[str, List[float]] = {}  # name → [count, sum, errors]
+        self._counters: Dict[str, int] = {}
+
+    def observe(self, name: str, sec: float, error: bool = False):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0, 0]
+            samples.append(sec)
+            tot = self._totals[name]
+            tot[0] += 1
+            tot[1] += sec
+            if error:
+                tot[2] += 1
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self) -> Dict:
+        """{"timers": {name: {count, sum, errors, p50, p90, p99, max}}, "counters": {name: n}} (초 단위)"""
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            totals = {k: list(v) for k, v in self._totals.items()}
+            counters = dict(self._counters)
+        timers = {}
+        for name, s in samples.items():
+            count, total, errors = totals[name]
+            stat = {"count": int(count), "sum": total, "errors": int(errors), "max": s[-1] if s else 0.0}
+            for q in QUANTILES:
+                stat[f"p{int(q * 100)}"] = s[min(len(s) - 1, int(q * len(s)))] if s else 0.0
+            timers[name] = stat
+        return {"timers": timers, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+
+REGISTRY = Metrics()
+
+
+@contextmanager
+def timer(name: str, session: Optional[Metrics] = None):
+    """블록 실행 시간을 REGISTRY(와 session)에 기록. 예외가 나면 errors도 증가.
+
+    st.rerun()/st.stop() 같은 스크립트 제어 예외(BaseException)는 오류로 세지 않습니다.
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        dt = time.perf_counter() - t0
+        REGISTRY.observe(name, dt, error)
+        if session is not None:
+            session.observe(name, dt, error)
+
+
+def incr(name: str, n: int = 1, session: Optional[Metrics] = None):
+    if not METRICS_ENABLED:
+        return
+    REGISTRY.incr(name, n)
+    if session is not None:
+        session.incr(name, n)
+
+
+# ---- 내보내기 ----
+def _prom_name(name: str) -> str:
+    return "llm_ddx_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def prometheus_text(snapshot: Optional[Dict] = None) -> str:
+    snap = snapshot or REGISTRY.snapshot()
+    lines = []
+    for name, t in sorted(snap["timers"].items()):
+        base = _prom_name(name) + "_seconds"
+        lines.append(f"# TYPE {base} summary")
+        for q in QUANTILES:
+            lines.append(f'{base}{{quantile="{q}"}} {t[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f"{base}_sum {t['sum']:.6f}")
+        lines.append(f"{base}_count {t['count']}")
+        lines.append(f"# TYPE {_prom_name(name)}_errors_total counter")
+        lines.append(f"{_prom_name(name)}_errors_total {t['errors']}")
+    for name, n in sorted(snap["counters"].items()):
+        lines.append(f"# TYPE {_prom_name(name)}_total counter")
+        lines.append(f"{_prom_name(name)}_total {n}")
+    return "\n".join(lines) + "\n"
+
+
+def export(path: str, snapshot: Optional[Dict] = None):
+    """스냅샷을 path에 기록 (.prom은 원자적 교체, 그 외는 JSONL append)."""
+    snap = snapshot or REGISTRY.snapshot()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".prom"):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text(snap))
+        os.replace(tmp, path)
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": time.time(), "pid": os.getpid(), **snap}, ensure_ascii=False) + "\n")
+
+
+_EXPORTER: Optional[threading.Thread] = None
+_EXPORTER_LOCK = threading.Lock()
+
+
+def start_exporter(path: str = METRICS_EXPORT_PATH, interval_sec: float = METRICS_EXPORT_SEC) -> bool:
+    """주기적 내보내기 스레드를 (프로세스당 한 번) 시작. path가 비어 있으면 아무것도 하지 않음."""
+    global _EXPORTER
+    if not path or not METRICS_ENABLED:
+        return False
+    with _EXPORTER_LOCK:
+        if _EXPORTER is not None:
+            return True
+
+        def _loop():
+            while True:
+                time.sleep(interval_sec)
+                try:
+                    export(path)
+                except Exception:
+                    pass
+
+        _EXPORTER = threading.Thread(target=_loop, name="metrics-exporter", daemon=True)
+        _EXPORTER.start()
+        atexit.register(export, path)
+        return True
@@ -1,8 +1,11 @@
 import json
 import ast
 import re
-import pandas as pd
-from typing import List, Optional
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd  # parse_listish는 pandas 없이 동작; Series 경로에서만 import
 
 def _clean_token(t: str) -> str:
     return t.strip().strip("'\"")
@@ -12,7 +15,7 @@ def parse_listish(val: Optional[str]) -> List[str]:
     Supports: JSON arrays, Python list literals, bracketed strings,
     and newline/pipe/semicolon/comma/tab-separated values.
     """
-    if val is None or (isinstance(val, float) and pd.isna(val)):
+    if val is None or (isinstance(val, float) and math.isnan(val)):
         return []
     if isinstance(val, list):
         return [_clean_token(str(x)) for x in val if str(x).strip()]
@@ -47,4 +50,74 @@ def parse_listish(val: Optional[str]) -> List[str]:
     # 4) Safe split on newlines / pipes / semicolons / commas / tabs
     tokens = re.split(r"[\n\r\t]+|\||;|,", s2)
     out = [_clean_token(t) for t in tokens if _clean_token(t)]
-    return out
\ No newline at end of file
+    return out
+
+
+# ---- 컬럼 단위(bulk) 파싱 ----
+_SPLIT_RE = re.compile(r"[\n\r\t]+|\||;|,")
+# 작은따옴표로 시작하는 리스트 리터럴 → json.loads는 항상 실패하므로 literal_eval 결과가 곧 정답
+_PY_LIST_RE = re.compile(r"^\[\s*'")
+
+
+def _clean_list(obj: list) -> List[str]:
+    return [_clean_token(str(x)) for x in obj if str(x).strip()]
+
+
+def sniff_listish_format(values: Iterable[str], sample: int = 200) -> str:
+    """컬럼 대표 형식 추정: "json" / "python" / "delimited"."""
+    counts = {"json": 0, "python": 0, "delimited": 0}
+    for i, s in enumerate(values):
+        if i >= sample:
+            break
+        if s.startswith("["):
+            counts["python" if _PY_LIST_RE.match(s) else "json"] += 1
+        elif s:
+            counts["delimited"] += 1
+    return max(counts, key=counts.get)
+
+
+def parse_listish_series(series: "pd.Series", fmt: Optional[str] = None) -> "pd.Series":
+    """parse_listish를 Series 전체에 적용 (셀별 결과 동일).
+
+    고유 문자열만 한 번씩 파싱(memoize)하고, 컬럼 형식을 한 번 추정해
+    해당 형식의 빠른 경로로 처리합니다. 형식에 맞지 않는 셀만 parse_listish로 폴백.
+    같은 문자열 셀은 같은 list 객체를 공유하므로 결과를 수정하지 마세요.
+    """
+    import pandas as pd
+
+    is_str = series.map(lambda v: isinstance(v, str))
+    uniq = pd.unique(series[is_str])
+    stripped = [u.strip() for u in uniq]
+    fmt = fmt or sniff_listish_format(stripped)
+
+    memo: Dict[str, List[str]] = {}
+    delimited_keys, delimited_vals = [], []
+    for raw, s in zip(uniq, stripped):
+        if not s:
+            memo[raw] = []
+        elif fmt == "json" and s.startswith("[") and not _PY_LIST_RE.match(s):
+            try:
+                obj = json.loads(s)
+            except ValueError:
+                obj = None
+            memo[raw] = _clean_list(obj) if isinstance(obj, list) else parse_listish(raw)
+        elif fmt == "python" and _PY_LIST_RE.match(s):
+            try:
+                obj = ast.literal_eval(s)
+            except Exception:
+                obj = None
+            memo[raw] = _clean_list(obj) if isinstance(obj, list) else parse_listish(raw)
+        elif fmt == "delimited" and s[0] not in "[{":
+            # '['/'{'로 시작하지 않으면 json/literal_eval이 리스트를 돌려줄 수 없으므로 바로 split
+            delimited_keys.append(raw)
+            delimited_vals.append(s)
+        else:
+            memo[raw] = parse_listish(raw)
+
+    if delimited_vals:
+        parts = pd.Series(delimited_vals, dtype=object).str.split(_SPLIT_RE, regex=True)
+        for raw, tokens in zip(delimited_keys, parts):
+            memo[raw] = [c for c in (_clean_token(t) for t in tokens) if c]
+
+    out = series.map(lambda v: memo[v] if isinstance(v, str) else parse_listish(v))
+    return out
@@ -1,66 +1,81 @@
 # llm_ddx_control_app/persistence.py
+# control/case 두 arm 공용 저장 진입점. 실제 쓰기는 storage 백엔드가 담당합니다.
 
-import os
 import json
+import atexit
+import threading
 from datetime import datetime
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 
-import pandas as pd
 import streamlit as st
 
-from llm_ddx_control_app.config import SAVE_DIR
-from llm_ddx_control_app.data_io import ensure_results_dir
-
-
-# ---- 로컬 저장 (control 전용) ----
-def _local_result_path(participant_id: str) -> str:
-    ensure_results_dir(SAVE_DIR)
-    fname = f"{participant_id}_control_{datetime.now().strftime('%Y%m%d')}.csv"
-    return os.path.join(SAVE_DIR, fname)
+from llm_ddx_control_app.config import WRITE_BEHIND, LOCAL_RESULT_FORMAT, RESUME_CHECKPOINTS, WRITER_SOCKET
+from llm_ddx_control_app.checkpoint import checkpointed_sink, get_checkpoints, write_checkpoint_meta
+from llm_ddx_control_app.gsheets import SheetsBatchWriter, local_standin_factory, open_worksheet
+from llm_ddx_control_app.metrics import incr, timer
+from llm_ddx_control_app.timing import write_events
+from llm_ddx_control_app.storage import (
+    StorageBackend,
+    SheetsBackend,
+    close_all,
+    local_backend,
+    result_path,
+)
+from llm_ddx_control_app.write_behind import get_writer
+from llm_ddx_control_app.writer_daemon import WriterClient, get_client
+
+
+# ---- 로컬 저장 ----
+def _local_result_path(participant_id: str, arm: str = "control") -> str:
+    return result_path(participant_id, arm, ".csv")
+
+def _local() -> StorageBackend:
+    """로컬 저장 백엔드. WRITER_SOCKET이 설정되면 모든 프로세스가 writer 데몬 하나로 보냄."""
+    if WRITER_SOCKET:
+        return get_client()
+    return local_backend(LOCAL_RESULT_FORMAT)
 
 def _save_local(participant_id: str, row: Dict):
-    path = _local_result_path(participant_id)
-    df = pd.DataFrame([row])
-    if os.path.exists(path):
-        df.to_csv(path, mode="a", header=False, index=False)
-    else:
-        df.to_csv(path, index=False)
+    _local().write_batch([(participant_id, row)])
 
 
 # ---- (선택) Google Sheets 저장: 환경이 구성된 경우에만 사용 ----
-def _save_gsheets(row: Dict):
-    # gspread/credentials 미구성 시 조용히 실패하도록 처리
-    try:
-        import gspread
-        from google.oauth2.service_account import Credentials
-    except Exception:
-        raise RuntimeError("gsheets_unavailable")
-
-    sa_info = st.secrets.get("gcp_service_account")
-    settings = st.secrets.get("gsheets")
-    if not sa_info or not settings or not settings.get("sheet_name"):
-        raise RuntimeError("no_secrets")
-
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    creds = Credentials.from_service_account_info(sa_info, scopes=scopes)
-    gc = gspread.authorize(creds)
-
-    sh = gc.open(settings["sheet_name"])
-    ws = sh.worksheet(settings.get("worksheet", "submissions"))
-
-    ordered = [
-        row.get("timestamp", ""),
-        row.get("session_uuid", ""),
-        row.get("participant_id", ""),
-        row.get("arm", ""),
-        row.get("case_index", ""),
-        row.get("cases_total", ""),
-        row.get("file_name", ""),
-        row.get("entered_ddx_list", ""),
-        row.get("notes", ""),
-        row.get("seconds_left", ""),
-    ]
-    ws.append_row(ordered, value_input_option="USER_ENTERED")
+# 프로세스당 writer 하나가 워크시트 핸들을 재사용하며 행을 모아 append_rows로 전송.
+# 재시도 후에도 실패한 행은 로컬 백엔드로 폴백합니다.
+_SHEETS_BACKEND: Optional[SheetsBackend] = None
+_SHEETS_LOCK = threading.Lock()
+
+
+def _sheets_backend() -> SheetsBackend:
+    global _SHEETS_BACKEND
+    with _SHEETS_LOCK:
+        if _SHEETS_BACKEND is not None:
+            return _SHEETS_BACKEND
+
+        settings = st.secrets.get("gsheets")
+        if not settings:
+            raise RuntimeError("no_secrets")
+        settings = dict(settings)
+
+        if settings.get("backend") == "local":
+            factory = local_standin_factory(settings.get("path"), float(settings.get("latency_sec", 0.0)))
+        else:
+            try:
+                import gspread  # noqa: F401
+                from google.oauth2.service_account import Credentials  # noqa: F401
+            except Exception:
+                raise RuntimeError("gsheets_unavailable")
+            sa_info = st.secrets.get("gcp_service_account")
+            if not sa_info or not settings.get("sheet_name"):
+                raise RuntimeError("no_secrets")
+            sa_info = dict(sa_info)
+            sheet_name = settings["sheet_name"]
+            worksheet = settings.get("worksheet", "submissions")
+            factory = lambda: open_worksheet(sa_info, sheet_name, worksheet)
+
+        _SHEETS_BACKEND = SheetsBackend(SheetsBatchWriter(factory), fallback=_local())
+        atexit.register(_SHEETS_BACKEND.writer.close, 10)
+        return _SHEETS_BACKEND
 
 
 def build_row(
@@ -72,45 +87,161 @@ def build_row(
     file_name,
     ddx_list,
     notes,
+    arm: str = "control",
+    case_id: Optional[str] = None,
+    hpi_edit: Optional[str] = None,
 ) -> Dict:
-    return {
+    """결과 행 (컬럼은 항상 config.RESULT_COLUMNS 전체, 값이 없으면 빈 문자열)."""
+    row = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "session_uuid": session_uuid,
         "participant_id": participant_id,
-        "arm": "control",  # ✅ control
+        "arm": arm,  # "control" / "case"
         "case_index": idx + 1,
         "cases_total": total,
         "file_name": file_name,
         "entered_ddx_list": json.dumps(ddx_list, ensure_ascii=False),
         "notes": notes,
         "seconds": seconds_left,
+        "case_id": case_id or "",  # 증례 키 테이블의 짧은 id
+        "hpi_edit": hpi_edit or "",  # HPI 원문 대비 diff (hpi_edits.py, 수정한 증례만)
     }
+    return row
+
+
+def _remote_enabled() -> bool:
+    """원격 저장 환경(secrets)이 구성되어 있고 Sheets 백엔드를 만들 수 있는지 확인."""
+    try:
+        sa = st.secrets.get("gcp_service_account")
+        gs = st.secrets.get("gsheets")
+        if not (gs and (gs.get("backend") == "local" or (sa and gs.get("sheet_name")))):
+            return False
+        _sheets_backend()
+        return True
+    except Exception:
+        return False
+
+
+# 저장마다 st.secrets를 조회하지 않도록 백엔드 선택은 프로세스당 한 번만 합니다.
+# (secrets를 바꾸면 프로세스를 재시작하거나 reset_backend()를 호출)
+_BACKEND: Optional[StorageBackend] = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def _backend() -> StorageBackend:
+    global _BACKEND
+    backend = _BACKEND
+    if backend is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = _sheets_backend() if _remote_enabled() else _local()
+            backend = _BACKEND
+    return backend
+
+
+def resolve_backend() -> str:
+    """저장 백엔드를 미리 결정 (워밍업용). 선택된 백엔드 이름을 반환."""
+    return _backend().name
+
+
+def reset_backend():
+    global _BACKEND
+    with _BACKEND_LOCK:
+        _BACKEND = None
+
+
+def _sink(backend: StorageBackend) -> Callable:
+    """백엔드 기록 + 재개 체크포인트 갱신 (writer 데몬을 쓰면 체크포인트도 데몬이 기록)."""
+    if not RESUME_CHECKPOINTS or isinstance(backend, WriterClient):
+        return backend.write_batch
+    return checkpointed_sink(backend)
 
 
 def save_progress(participant_id: str, row: Dict):
     """
     원격 저장 환경(secrets)이 제대로 구성된 경우에만 Google Sheets에 저장을 시도하고,
-    그 외에는 조용히 로컬 CSV로 저장합니다. (UI에 경고/로그 출력 안 함)
+    그 외에는 조용히 로컬 백엔드(LOCAL_RESULT_FORMAT)로 저장합니다. (UI에 경고/로그 출력 안 함)
+    WRITE_BEHIND가 켜져 있으면 백그라운드 워커에 맡기고 바로 반환합니다.
+    실패는 화면에 표시하지 않고 metrics 카운터(save_progress.errors, write_behind.rows_failed)로 집계합니다.
     """
-    # 원격 저장 가능 여부 체크
-    use_remote = False
+    with timer("save_progress"):
+        # 백엔드 선택 (secrets 조회는 스크립트 스레드에서)
+        backend = _backend()
+
+        if WRITE_BEHIND:
+            get_writer().submit(participant_id, _sink(backend), row)
+            return
+        try:
+            _sink(backend)([(participant_id, row)])
+        except Exception:
+            # UI에는 보이지 않게 하되 실패 횟수는 지표로 남김
+            incr("save_progress.errors")
+
+
+def save_events(participant_id: str, rows: List[Dict]):
+    """타이밍 이벤트 배치 저장 (timing.py). 결과 행과 같은 write-behind 샤드를 쓰지만 파일은 따로 둡니다.
+
+    이벤트는 로컬(또는 writer 데몬)에만 기록하며 Sheets로는 보내지 않습니다. 실패는 save_events.errors로 집계.
+    """
+    if not rows:
+        return
     try:
-        sa = st.secrets.get("gcp_service_account")
-        gs = st.secrets.get("gsheets")
-        use_remote = bool(sa and gs and gs.get("sheet_name"))
+        if WRITER_SOCKET:
+            get_client().write_events([(participant_id, r) for r in rows])
+        elif WRITE_BEHIND:
+            writer = get_writer()
+            for r in rows:
+                writer.submit(participant_id, write_events, r)
+        else:
+            write_events([(participant_id, r) for r in rows])
     except Exception:
-        use_remote = False
+        incr("save_events.errors")
 
-    if use_remote:
+
+def flush_progress(participant_id: Optional[str] = None, arm: str = "control", timeout: float = 10.0) -> bool:
+    """대기 중인 저장을 모두 반영하고 참가자 CSV를 materialize (세션 종료/마지막 증례 저장 시 호출)."""
+    ok = True
+    if WRITE_BEHIND:
+        ok = get_writer().flush(participant_id, timeout)
+    try:
+        (_SHEETS_BACKEND or _local()).flush(participant_id, arm)
+    except Exception:
+        ok = False
+    return ok
+
+
+def load_resume_state(participant_id: str, arm: str = "control") -> Optional[Dict]:
+    """참가자의 최신 체크포인트 (대기 중인 저장을 먼저 반영). 없거나 비활성화면 None."""
+    if not RESUME_CHECKPOINTS or not participant_id:
+        return None
+    if WRITE_BEHIND:
+        get_writer().flush(participant_id, 5.0)
+    local = _local()
+    if isinstance(local, WriterClient):
         try:
-            _save_gsheets(row)
-            return
+            return local.load_checkpoint(participant_id, arm)
         except Exception:
-            pass  # 조용히 로컬로 폴백
+            return None
+    return get_checkpoints().load(participant_id, arm)
+
 
-    # 로컬 저장 (기본)
+def save_session_meta(participant_id: str, session_uuid: str, arm: str = "control", **meta):
+    """재개 체크포인트에 세션 메타(dataset/started/finalized)를 기록. 결과 행과 같은 경로·순서로 보냅니다.
+
+    실패는 save_session_meta.errors로 집계합니다.
+    """
+    if not RESUME_CHECKPOINTS or not participant_id:
+        return
+    row = {"participant_id": participant_id, "arm": arm, "session_uuid": session_uuid, **meta}
     try:
-        _save_local(participant_id, row)
+        if WRITER_SOCKET:
+            get_client().write_checkpoint_meta([(participant_id, row)])
+        elif WRITE_BEHIND:
+            get_writer().submit(participant_id, write_checkpoint_meta, row)
+        else:
+            write_checkpoint_meta([(participant_id, row)])
     except Exception:
-        # 최종 실패도 조용히 무시 (요청: 에러 안 보이도록)
-        pass
\ No newline at end of file
+        incr("save_session_meta.errors")
+
+
+atexit.register(close_all)
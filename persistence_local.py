@@ -1,17 +1,12 @@
-import os
-import json
-from datetime import datetime
-from typing import Dict
-import pandas as pd
+# 증례(case) arm 저장: control arm과 같은 persistence/storage 경로를 사용합니다.
+from typing import Dict, Optional
 
-from llm_ddx_case_app.config import SAVE_DIR
-from llm_ddx_case_app.data_io import ensure_results_dir
+from llm_ddx_control_app import persistence
+from llm_ddx_control_app.storage import result_path as _result_path
 
 
 def result_path(participant_id: str) -> str:
-    ensure_results_dir(SAVE_DIR)
-    fname = f"{participant_id}_case_{datetime.now().strftime('%Y%m%d')}.csv"
-    return os.path.join(SAVE_DIR, fname)
+    return _result_path(participant_id, "case", ".csv")
 
 
 def build_row(
@@ -24,24 +19,14 @@ def build_row(
     ddx_list: list,
     notes: str,
 ) -> Dict:
-    return {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "session_uuid": session_uuid,
-        "participant_id": participant_id,
-        "arm": "case",
-        "case_index": idx + 1,
-        "cases_total": total,
-        "file_name": file_name,
-        "entered_ddx_list": json.dumps(ddx_list, ensure_ascii=False),
-        "notes": notes,
-        "seconds": seconds_left,
-    }
+    return persistence.build_row(
+        session_uuid, participant_id, idx, total, seconds_left, file_name, ddx_list, notes, arm="case"
+    )
 
 
 def save_progress(participant_id: str, row: Dict):
-    path = result_path(participant_id)
-    df = pd.DataFrame([row])
-    if os.path.exists(path):
-        df.to_csv(path, mode="a", header=False, index=False)
-    else:
-        df.to_csv(path, index=False)
\ No newline at end of file
+    persistence.save_progress(participant_id, row)
+
+
+def flush_progress(participant_id: Optional[str] = None, timeout: float = 10.0) -> bool:
+    return persistence.flush_progress(participant_id, arm="case", timeout=timeout)
@@ -0,0 +1,98 @@
+# llm_ddx_control_app/results_index.py
+# (participant_id, file_name)별 최신 결과 행 인덱스.
+# 저장할 때마다 증분으로 갱신하고, 다운로드 CSV는 버튼을 눌렀을 때만 만듭니다.
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+from llm_ddx_control_app.config import LOCAL_RESULT_FORMAT, RESULT_INDEX_MAX_ENTRIES
+from llm_ddx_control_app.journal import read_journal
+
+_INDEXES: "OrderedDict[str, ResultIndex]" = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def _row_key(row: Dict) -> Tuple[str, str]:
+    return (str(row.get("participant_id", "")), str(row.get("file_name", "")))
+
+
+class ResultIndex:
+    """저장 순서를 유지하면서 키마다 마지막 행만 보관 (drop_duplicates(keep="last")와 동일)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._rows: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seed(self, participant_id: str = "", arm: str = "control"):
+        """기존 로컬 CSV와 저널(.jsonl)이 있으면 한 번만 읽어 인덱스를 채움.
+
+        sqlite 백엔드를 쓰면 결과는 DB에만 있으므로 참가자 행을 DB에서도 읽습니다.
+        """
+        if os.path.exists(self.path):
+            try:
+                import pandas as pd  # 기존 결과 파일이 있을 때만 필요
+
+                df = pd.read_csv(self.path)
+                if "save_ns" in df.columns:
+                    df = df.sort_values("save_ns", kind="stable")
+                elif "timestamp" in df.columns:
+                    df = df.sort_values("timestamp", kind="stable")
+                for rec in df.to_dict(orient="records"):
+                    self.update(rec)
+            except Exception:
+                pass
+        for rec in read_journal(os.path.splitext(self.path)[0] + ".jsonl"):
+            self.update(rec)
+        if LOCAL_RESULT_FORMAT == "sqlite" and participant_id:
+            from llm_ddx_control_app.storage import local_backend
+
+            for rec in local_backend("sqlite").read_rows(arm, participant_id):
+                self.update(rec)
+
+    def update(self, row: Dict):
+        key = _row_key(row)
+        with self._lock:
+            self._rows.pop(key, None)
+            self._rows[key] = dict(row)
+
+    def rows(self) -> List[Dict]:
+        with self._lock:
+            return list(self._rows.values())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def to_csv_bytes(self) -> bytes:
+        """최신 행만 담은 CSV(utf-8-sig). 메모리 인덱스만 직렬화합니다.
+
+        결과 파일은 write-behind 워커가 append하는 중일 수 있으므로 여기서는 쓰지 않고,
+        참가자 CSV의 materialize는 flush_progress(백엔드 flush/압축)에 맡깁니다.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.rows()).to_csv(index=False).encode("utf-8-sig")
+
+    def csv_data(self) -> Callable[[], bytes]:
+        """st.download_button(data=...)용 지연 생성 콜러블."""
+        return self.to_csv_bytes
+
+
+def get_index(path: str, participant_id: str = "", arm: str = "control") -> ResultIndex:
+    """로컬 결과 파일 경로별 프로세스 전역 인덱스 (최초 호출 시 파일/DB에서 시드).
+
+    최근에 쓴 RESULT_INDEX_MAX_ENTRIES개만 LRU로 유지합니다. 밀려난 참가자는 다음 호출 때 다시 시드됩니다.
+    """
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(path)
+        if idx is not None:
+            _INDEXES.move_to_end(path)
+            return idx
+        idx = ResultIndex(path)
+        idx.seed(participant_id, arm)
+        _INDEXES[path] = idx
+        while len(_INDEXES) > max(1, RESULT_INDEX_MAX_ENTRIES):
+            _INDEXES.popitem(last=False)
+        return idx
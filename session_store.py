@@ -0,0 +1,74 @@
+# llm_ddx_control_app/session_store.py
+# 세션별 결과 버퍼: 증례(file_name)마다 최신 행 1개 + (선택) 최근 편집 이력 링버퍼.
+# 자동저장 행을 리스트에 무한히 쌓지 않도록 session_state["result_rows"]를 대체합니다.
+
+import sys
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from llm_ddx_control_app.config import RESULT_HISTORY_LEN
+
+
+class ResultRecord:
+    """컬럼 튜플(스토어 내 공유) + 값 튜플로 행 하나를 보관."""
+
+    __slots__ = ("columns", "values")
+
+    def __init__(self, columns: Tuple[str, ...], values: Tuple):
+        self.columns = columns
+        self.values = values
+
+    def to_dict(self) -> Dict:
+        return dict(zip(self.columns, self.values))
+
+
+class SessionResultStore:
+    def __init__(self, history_len: int = RESULT_HISTORY_LEN):
+        self._latest: Dict[str, ResultRecord] = {}
+        self._history: Optional[deque] = deque(maxlen=history_len) if history_len > 0 else None
+        self._columns: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self.puts = 0
+
+    def _intern_columns(self, row: Dict) -> Tuple[str, ...]:
+        cols = tuple(row.keys())
+        return self._columns.setdefault(cols, cols)
+
+    def put(self, row: Dict):
+        rec = ResultRecord(self._intern_columns(row), tuple(row.values()))
+        self._latest[str(row.get("file_name", ""))] = rec
+        if self._history is not None:
+            self._history.append(rec)
+        self.puts += 1
+
+    def latest(self, file_name: str) -> Optional[Dict]:
+        rec = self._latest.get(str(file_name))
+        return rec.to_dict() if rec else None
+
+    def latest_rows(self) -> List[Dict]:
+        return [rec.to_dict() for rec in self._latest.values()]
+
+    def history_rows(self) -> List[Dict]:
+        return [rec.to_dict() for rec in (self._history or ())]
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def memory_bytes(self) -> int:
+        """대략적인 메모리 사용량 (레코드/값 객체 포함, 공유 컬럼 튜플은 1회만)."""
+        seen = set()
+        total = sys.getsizeof(self._latest)
+        if self._history is not None:
+            total += sys.getsizeof(self._history)
+        records = list(self._latest.values()) + list(self._history or ())
+        for cols in self._columns.values():
+            total += sys.getsizeof(cols)
+        for rec in records:
+            if id(rec) in seen:
+                continue
+            seen.add(id(rec))
+            total += sys.getsizeof(rec) + sys.getsizeof(rec.values)
+            for v in rec.values:
+                if id(v) not in seen:
+                    seen.add(id(v))
+                    total += sys.getsizeof(v)
+        return total
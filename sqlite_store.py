@@ -0,0 +1,147 @@
+# llm_ddx_control_app/sqlite_store.py
+# SQLite(WAL) 결과 저장소: 한 서버의 여러 세션/프로세스가 동시에 써도 파일 append 경합이 없도록.
+# (session_uuid, participant_id, file_name)별 최신 행을 upsert로 유지하고, 필요할 때 build_row 컬럼 순서의 CSV로 내보냅니다.
+
+import os
+import json
+import argparse
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from llm_ddx_control_app.config import RESULT_COLUMNS, SAVE_DIR, SQLITE_PATH
+from llm_ddx_control_app.journal import latest_rows, write_csv
+from llm_ddx_control_app.metrics import timer
+from llm_ddx_control_app.storage import Batch, StorageBackend, result_path
+
+# build_row()가 만드는 컬럼 (CSV 내보내기 순서)
+COLUMNS = RESULT_COLUMNS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    {", ".join(f"{c} TEXT" if c not in ("case_index", "cases_total", "seconds") else f"{c} INTEGER" for c in COLUMNS)},
+    extra TEXT,
+    updated_ns INTEGER NOT NULL,
+    PRIMARY KEY (session_uuid, participant_id, file_name)
+);
+CREATE INDEX IF NOT EXISTS results_participant ON results (participant_id, arm, updated_ns);
+"""
+
+# 고정 SQL 문자열 → sqlite3 모듈의 연결별 statement 캐시로 재사용됨
+_UPSERT = (
+    f"INSERT INTO results ({', '.join(COLUMNS)}, extra, updated_ns) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)}, ?, ?) "
+    "ON CONFLICT (session_uuid, participant_id, file_name) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c not in ("session_uuid", "participant_id", "file_name"))
+    + ", extra = excluded.extra, updated_ns = excluded.updated_ns"
+)
+
+
+class SqliteResultStore(StorageBackend):
+    """스레드별 연결 (스레드 id 기준, 종료된 스레드의 연결은 새 연결을 만들 때 정리) + WAL 모드 + 배치 단위 트랜잭션."""
+
+    name = "sqlite"
+
+    def __init__(self, save_dir: str = SAVE_DIR, db_path: Optional[str] = None):
+        super().__init__(save_dir)
+        self.db_path = db_path or (SQLITE_PATH if save_dir == SAVE_DIR else os.path.join(save_dir, "results.sqlite3"))
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conns: Dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            # 이전 스키마로 만든 DB에는 나중에 추가된 컬럼(case_id, hpi_edit)을 붙임 (기존 행의 값은 extra에 있음)
+            existing = {rec[1] for rec in conn.execute("PRAGMA table_info(results)")}
+            for c in COLUMNS:
+                if c not in existing:
+                    conn.execute(f"ALTER TABLE results ADD COLUMN {c} TEXT NOT NULL DEFAULT ''")
+
+    def _conn(self) -> sqlite3.Connection:
+        tid = threading.get_ident()
+        with self._lock:
+            conn = self._conns.get(tid)
+            if conn is None:
+                self._prune_locked()
+                conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=64)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA busy_timeout=30000")
+                self._conns[tid] = conn
+            return conn
+
+    def _prune_locked(self):
+        """종료된 스레드가 남긴 연결을 닫음 (파일 디스크립터 누수 방지)."""
+        alive = {t.ident for t in threading.enumerate()}
+        for tid in [t for t in self._conns if t not in alive]:
+            try:
+                self._conns.pop(tid).close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _params(row: Dict, now_ns: int) -> tuple:
+        extra = {k: v for k, v in row.items() if k not in COLUMNS}
+        return tuple(row.get(c, "") for c in COLUMNS) + (
+            json.dumps(extra, ensure_ascii=False, default=str) if extra else None,
+            now_ns,
+        )
+
+    def write_batch(self, batch: Batch):
+        now = time.time_ns()
+        params = [self._params(row, now + i) for i, (_, row) in enumerate(batch)]
+        with timer("local_append"), self._conn() as conn:  # 배치 전체를 한 트랜잭션으로 커밋
+            conn.executemany(_UPSERT, params)
+
+    def read_rows(self, arm: Optional[str] = None, participant_id: Optional[str] = None) -> Iterator[Dict]:
+        sql = f"SELECT {', '.join(COLUMNS)}, extra FROM results"
+        where, args = [], []
+        if arm:
+            where.append("arm = ?")
+            args.append(arm)
+        if participant_id is not None:
+            where.append("participant_id = ?")
+            args.append(participant_id)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_ns"
+        for rec in self._conn().execute(sql, args):
+            row = dict(zip(COLUMNS, rec[:-1]))
+            if rec[-1]:
+                row.update(json.loads(rec[-1]))
+            yield row
+
+    def export_csv(self, csv_path: str, arm: Optional[str] = None, participant_id: Optional[str] = None) -> str:
+        """(participant_id, file_name)별 최신 행을 기존 결과 CSV와 같은 컬럼 순서로 기록."""
+        write_csv(latest_rows(self.read_rows(arm, participant_id)), csv_path)
+        return csv_path
+
+    def flush(self, participant_id: Optional[str] = None, arm: str = "control"):
+        if participant_id is None:
+            return
+        self.export_csv(result_path(participant_id, arm, ".csv", self.save_dir), arm, participant_id)
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = list(self._conns.values()), {}
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="SQLite 결과 저장소를 최신 행 CSV로 내보내기")
+    ap.add_argument("out_csv")
+    ap.add_argument("--db", default=SQLITE_PATH)
+    ap.add_argument("--arm", default=None)
+    ap.add_argument("--participant", default=None)
+    args = ap.parse_args(argv)
+    store = SqliteResultStore(db_path=args.db)
+    print(store.export_csv(args.out_csv, args.arm, args.participant))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# llm_ddx_control_app/storage.py
+# control/case 두 arm이 함께 쓰는 결과 저장 백엔드.
+# 모든 백엔드는 (participant_id, row) 묶음을 한 번에 받는 write_batch를 구현하며,
+# 파일 이름은 row["arm"]으로 나뉩니다: {SAVE_DIR}/{participant_id}_{arm}_{YYYYMMDD}.{csv|jsonl}
+
+import os
+import csv
+import glob
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from llm_ddx_control_app import journal
+from llm_ddx_control_app.config import RESULT_COLUMNS, SAVE_DIR
+from llm_ddx_control_app.gsheets import SheetsBatchWriter
+from llm_ddx_control_app.metrics import timer
+
+Batch = List[Tuple[str, Dict]]
+
+
+def result_path(participant_id: str, arm: str = "control", ext: str = ".csv", save_dir: str = SAVE_DIR) -> str:
+    os.makedirs(save_dir, exist_ok=True)
+    fname = f"{participant_id}_{arm}_{datetime.now().strftime('%Y%m%d')}{ext}"
+    return os.path.join(save_dir, fname)
+
+
+def _row_arm(row: Dict) -> str:
+    return str(row.get("arm") or "control")
+
+
+class StorageBackend(ABC):
+    """결과 저장소 인터페이스 (write_batch는 필수, 나머지는 필요한 백엔드만 재정의)."""
+
+    name = "base"
+
+    def __init__(self, save_dir: str = SAVE_DIR):
+        self.save_dir = save_dir
+
+    @abstractmethod
+    def write_batch(self, batch: Batch):
+        """(participant_id, row) 묶음을 한 번에 기록."""
+
+    def flush(self, participant_id: Optional[str] = None, arm: str = "control"):
+        """대기 중인 쓰기를 반영 (필요하면 참가자 CSV도 materialize)."""
+
+    def read_rows(self, arm: Optional[str] = None, participant_id: Optional[str] = None) -> Iterator[Dict]:
+        """저장된 행을 저장 순서대로 반환 (arm/참가자로 필터)."""
+        return iter(())
+
+    def close(self):
+        pass
+
+    def _paths(self, ext: str, arm: Optional[str], participant_id: Optional[str]) -> List[str]:
+        pattern = f"{participant_id or '*'}_{arm or '*'}_*{ext}"
+        return sorted(glob.glob(os.path.join(self.save_dir, pattern)))
+
+
+class CsvBackend(StorageBackend):
+    """행마다 CSV append (pandas 미사용, 배치 안에서는 파일당 한 번만 open)."""
+
+    name = "csv"
+
+    def __init__(self, save_dir: str = SAVE_DIR):
+        super().__init__(save_dir)
+        self._lock = threading.Lock()
+        self._headers: Dict[str, List[str]] = {}  # path → 파일 헤더 (처음 쓸 때 한 번 읽음)
+
+    def _header(self, path: str) -> Optional[List[str]]:
+        if not os.path.exists(path):
+            self._headers.pop(path, None)
+            return None
+        header = self._headers.get(path)
+        if header is None:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+            if header is not None:
+                self._headers[path] = header
+        return header
+
+    def write_batch(self, batch: Batch):
+        by_path: Dict[str, List[Dict]] = {}
+        for pid, row in batch:
+            by_path.setdefault(result_path(pid, _row_arm(row), ".csv", self.save_dir), []).append(row)
+        with self._lock, timer("local_append"):
+            for path, rows in by_path.items():
+                header = self._header(path)
+                if header is None:
+                    fieldnames = list(RESULT_COLUMNS)
+                    for r in rows:
+                        fieldnames += [c for c in r if c not in fieldnames]
+                else:
+                    # 기존 파일의 헤더를 따름. 헤더에 없는 컬럼이 있으면 행 길이가 어긋나므로 쓰지 않고 실패
+                    extra = sorted({c for r in rows for c in r} - set(header))
+                    if extra:
+                        raise ValueError(f"{path}: columns not in existing CSV header: {extra}")
+                    fieldnames = header
+                with open(path, "a", newline="", encoding="utf-8") as f:
+                    w = csv.DictWriter(f, fieldnames=fieldnames)
+                    if header is None:
+                        w.writeheader()
+                        self._headers[path] = fieldnames
+                    w.writerows(rows)
+
+    def read_rows(self, arm=None, participant_id=None):
+        for p in self._paths(".csv", arm, participant_id):
+            yield from journal.read_csv_rows(p)
+
+
+class JournalBackend(StorageBackend):
+    """append-only JSONL 저널 (열린 핸들 재사용), flush 시 참가자 CSV로 압축."""
+
+    name = "journal"
+
+    def write_batch(self, batch: Batch):
+        with timer("local_append"):
+            for pid, row in batch:
+                journal.append_row(result_path(pid, _row_arm(row), ".jsonl", self.save_dir), row)
+
+    def flush(self, participant_id=None, arm="control"):
+        if participant_id is None:
+            return
+        jpath = result_path(participant_id, arm, ".jsonl", self.save_dir)
+        if os.path.exists(jpath):
+            journal.compact_journal(jpath)
+
+    def read_rows(self, arm=None, participant_id=None):
+        for p in self._paths(".jsonl", arm, participant_id):
+            yield from journal.read_journal(p)
+
+    def close(self):
+        journal.close_all()
+
+
+class SheetsBackend(StorageBackend):
+    """Google Sheets 배치 writer 앞단. 전송 실패 행은 fallback(로컬) 백엔드로 보냄."""
+
+    name = "gsheets"
+
+    def __init__(self, writer: SheetsBatchWriter, fallback: StorageBackend):
+        super().__init__(fallback.save_dir)
+        self.writer = writer
+        self.fallback = fallback
+        writer.on_failure = lambda row: fallback.write_batch([(str(row.get("participant_id", "")), row)])
+
+    def write_batch(self, batch: Batch):
+        for pid, row in batch:
+            try:
+                self.writer.submit(row)
+            except Exception:
+                self.fallback.write_batch([(pid, row)])
+
+    def flush(self, participant_id=None, arm="control"):
+        self.writer.flush(10)
+        self.fallback.flush(participant_id, arm)
+
+    def read_rows(self, arm=None, participant_id=None):
+        # 시트는 조회하지 않고 로컬 폴백분만 반환
+        return self.fallback.read_rows(arm, participant_id)
+
+    def close(self):
+        self.writer.close(10)
+        self.fallback.close()
+
+
+LOCAL_BACKENDS = {
+    "csv": CsvBackend,
+    "journal": JournalBackend,
+}
+
+_LOCAL: Dict[Tuple[str, str], StorageBackend] = {}
+_LOCAL_LOCK = threading.Lock()
+
+
+def local_backend(kind: str, save_dir: str = SAVE_DIR) -> StorageBackend:
+    """kind("csv"/"journal"/"sqlite")별 프로세스 전역 로컬 백엔드."""
+    with _LOCAL_LOCK:
+        b = _LOCAL.get((kind, save_dir))
+        if b is None:
+            if kind == "sqlite":
+                from llm_ddx_control_app.sqlite_store import SqliteResultStore
+                b = SqliteResultStore(save_dir)
+            elif kind in LOCAL_BACKENDS:
+                b = LOCAL_BACKENDS[kind](save_dir)
+            else:
+                raise ValueError(f"unknown storage backend: {kind}")
+            _LOCAL[(kind, save_dir)] = b
+        return b
+
+
+def close_all():
+    with _LOCAL_LOCK:
+        items = list(_LOCAL.values())
+        _LOCAL.clear()
+    for b in items:
+        b.close()
@@ -0,0 +1,24 @@
+# 저장소를 어떤 디렉터리 이름으로 받아도 llm_ddx_control_app 패키지로 import되도록 등록합니다.
+#   python -m pytest -q tests
+import os
+import sys
+import importlib.util
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if "llm_ddx_control_app" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        "llm_ddx_control_app", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT]
+    )
+    _pkg = importlib.util.module_from_spec(_spec)
+    sys.modules["llm_ddx_control_app"] = _pkg
+    _spec.loader.exec_module(_pkg)
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    """config의 상대 경로(results/, case_sets/ 등)가 테스트마다 임시 디렉터리를 가리키도록."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pandas as pd
+
+from llm_ddx_control_app import analysis
+
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def _results(root):
+    os.makedirs(root)
+    _write_csv(os.path.join(root, "p1_control_20260101.csv"), [
+        {"timestamp": "2026-01-01 10:00:00", "session_uuid": "s1", "participant_id": "p1", "arm": "control",
+         "case_index": 1, "file_name": "a", "entered_ddx_list": '["x", "y", "z"]', "seconds": 30},
+        {"timestamp": "2026-01-01 10:01:00", "session_uuid": "s1", "participant_id": "p1", "arm": "control",
+         "case_index": 2, "file_name": "b", "entered_ddx_list": '["x"]', "seconds": 100},
+    ])
+    with open(os.path.join(root, "p1_control_20260101.jsonl"), "w", encoding="utf-8") as f:
+        f.write(json.dumps({"timestamp": "2026-01-01 10:02:00", "session_uuid": "s1", "participant_id": "p1",
+                            "arm": "control", "case_index": 1, "file_name": "a",
+                            "entered_ddx_list": '["x", "w"]', "seconds": 40}) + "\n")
+
+
+def test_latest_rows_and_case_seconds(tmp_path):
+    root = str(tmp_path / "results")
+    _results(root)
+    latest = analysis.add_timing(analysis.collect_latest(analysis.find_result_files(root)))
+    by_file = latest.set_index("file_name")
+    assert by_file.loc["a", "entered_ddx_list"] == '["x", "w"]'
+    assert by_file.loc["b", "case_seconds"] == 60
+
+
+def test_summarize_without_seconds_column():
+    latest = pd.DataFrame([{"arm": "control", "participant_id": "p1", "file_name": "a",
+                            "entered_ddx_list": '["x"]'}])
+    out = analysis.summarize(analysis.add_timing(latest))
+    assert out["per_case"]["mean_n_ddx"].tolist() == [1]
+    assert out["per_participant"]["total_seconds"].isna().all()
+    assert analysis.summarize(latest)["per_case"]["median_case_seconds"].isna().all()
+
+
+def test_run_reads_rows_only_in_sqlite_backend(tmp_path):
+    from llm_ddx_control_app.storage import close_all, local_backend
+
+    root = str(tmp_path / "results")
+    _results(root)
+    row = {"timestamp": "2026-01-01 10:03:00", "session_uuid": "s1", "participant_id": "p1", "arm": "control",
+           "case_index": 3, "file_name": "c", "entered_ddx_list": '["q"]', "seconds": 130}
+    local_backend("sqlite", root).write_batch([("p1", row)])  # 마무리 전이라 CSV로 내보내지 않은 행
+    try:
+        assert len(pd.read_csv(analysis.run(root, str(tmp_path / "csv"), backend="journal")["latest"])) == 2
+        latest = pd.read_csv(analysis.run(root, str(tmp_path / "db"), backend="sqlite")["latest"])
+    finally:
+        close_all()
+    assert sorted(latest["file_name"]) == ["a", "b", "c"]
+    assert latest.set_index("file_name").loc["c", "case_seconds"] == 30
+
+
+def test_case_dwell_is_the_same_when_aggregated_per_chunk():
+    rows = [
+        {"session_uuid": "s1", "participant_id": "p1", "arm": "control", "event": e, "case_id": c, "t_ms": t,
+         "dwell_ms": d}
+        for e, c, t, d in [("enter", "k1", 0, None), ("first_input", "k1", 700, None), ("leave", "k1", 1000, 1000),
+                           ("enter", "k2", 1000, None), ("enter", "k1", 3000, None), ("first_input", "k1", 3100, None),
+                           ("leave", "k1", 4000, 1000), ("first_input", "k3", 5000, None)]
+    ]
+    whole = analysis.case_dwell(pd.DataFrame(rows))
+    chunked = analysis.case_dwell((pd.DataFrame([r]) for r in rows), chunked=True)
+    pd.testing.assert_frame_equal(whole, chunked)
+    assert whole.set_index("case_id")[["visits", "dwell_seconds"]].to_dict("index") == {
+        "k1": {"visits": 2, "dwell_seconds": 2.0}, "k2": {"visits": 0, "dwell_seconds": 0.0}}
+
+
+def test_run_writes_case_dwell_from_events(tmp_path):
+    root = str(tmp_path / "results")
+    _results(root)
+    os.makedirs(os.path.join(root, "events"))
+    events = [
+        {"session_uuid": "s1", "participant_id": "p1", "arm": "control", "event": "enter", "case_id": "k1", "t_ms": 0},
+        {"session_uuid": "s1", "participant_id": "p1", "arm": "control", "event": "first_input", "case_id": "k1",
+         "t_ms": 1500},
+        {"session_uuid": "s1", "participant_id": "p1", "arm": "control", "event": "leave", "case_id": "k1",
+         "t_ms": 4000, "dwell_ms": 4000},
+        {"session_uuid": "s1", "participant_id": "p1", "arm": "control", "event": "enter", "case_id": "k1",
+         "t_ms": 9000},
+        {"session_uuid": "s1", "participant_id": "p1", "arm": "control", "event": "leave", "case_id": "k1",
+         "t_ms": 10000, "dwell_ms": 1000},
+    ]
+    with open(os.path.join(root, "events", "p1_control_20260101.jsonl"), "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(e) + "\n" for e in events)
+    outputs = analysis.run(root, str(tmp_path / "out"))
+    latest = pd.read_csv(outputs["latest"])
+    assert len(latest) == 2  # 이벤트 파일은 결과 행으로 읽지 않음
+    dwell = pd.read_csv(outputs["case_dwell"])
+    assert dwell[["visits", "dwell_seconds", "first_input_seconds"]].values.tolist() == [[2, 5.0, 1.5]]
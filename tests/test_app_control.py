@@ -0,0 +1,123 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from llm_ddx_control_app import app_control
+from llm_ddx_control_app.benchmarks.load_app import _app_script, make_cases_csv
+
+
+def _widget(elements, label_prefix):
+    return next(e for e in elements if e.label.startswith(label_prefix))
+
+
+def _run(at):
+    at.run()
+    assert not at.exception, at.exception[0].value
+    return at
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    """save_progress로 넘어간 행 (실제 저장은 하지 않음)."""
+    rows = []
+    monkeypatch.setattr(app_control, "save_progress", lambda pid, row: rows.append(row))
+    monkeypatch.setattr(app_control, "AUTOSAVE_SEC", 0)  # 간격 제한 없이 지문만으로 판단
+    return rows
+
+
+def _start(pid, cases=3):
+    at = AppTest.from_function(_app_script, default_timeout=30)
+    _run(at)
+    at.file_uploader[0].set_value(("cases.csv", make_cases_csv(cases, 200), "text/csv"))
+    _run(at)
+    _widget(at.text_input, "참가자 ID").input(pid)
+    _run(at)
+    _widget(at.button, "세션 시작").click()
+    return _run(at)
+
+
+def _enter(at, values):
+    for i, v in enumerate(values):
+        _widget(at.text_input, f"감별진단 {i + 1}").input(v)
+        _run(at)
+
+
+def test_navigation_saves_do_not_trigger_a_repeat_autosave(saved):
+    at = _start("app1")
+    assert saved == []  # 방금 들어온 증례(입력 없음)는 저장하지 않음
+    _enter(at, ["a", "b", "c"])
+    n_auto = len(saved)
+    assert n_auto >= 1 and saved[-1]["entered_ddx_list"] == '["a", "b", "c"]'
+
+    _widget(at.button, "다음").click()
+    _run(at)
+    _run(at)  # 다음 증례에서 입력 없이 rerun
+    assert len(saved) == n_auto + 1 and saved[-1]["case_index"] == 1
+
+    _widget(at.button, "⬅️ 이전").click()
+    _run(at)  # 저장된 입력이 복원된 1번 증례
+    _run(at)
+    assert [r["case_index"] for r in saved[n_auto:]] == [1, 2]
+
+
+class _Keys:
+    def id_at(self, idx):
+        return f"k{idx}"
+
+
+@pytest.fixture
+def session():
+    import streamlit as st
+
+    st.session_state.clear()
+    yield st.session_state
+    st.session_state.clear()
+
+
+def test_prepare_case_builds_keys_and_blanks_missing_hpi():
+    case = app_control.prepare_case({"file_name": "a.txt", "현병력-Free Text#13": float("nan")}, "k7")
+    assert case["file_name"] == "a.txt" and case["hpi_text"] == ""
+    assert case["hpi_key"] == "hpi_k7"
+    assert case["ddx_keys"] == [f"ddx_{i}_k7" for i in range(1, app_control.REQUIRE_AT_MOST + 1)]
+    assert app_control.prepare_case({"원본 초진기록": "복통"}, "k1")["hpi_text"] == "복통"
+
+
+def test_get_case_prepared_follows_order_and_caches(session):
+    session.order = [2, 0, 1]
+    reads = []
+
+    def get_case(idx):
+        reads.append(idx)
+        return {"file_name": f"f{idx}", "현병력-Free Text#13": f"hpi {idx}"}
+
+    case = app_control.get_case_prepared(0, get_case, _Keys())
+    assert (case["file_name"], case["case_id"], case["hpi_text"]) == ("f2", "k2", "hpi 2")
+    assert app_control.get_case_prepared(0, get_case, _Keys()) is case
+    assert reads == [2]
+
+
+def test_prefetch_cases_keeps_only_neighbours(session):
+    session.order = list(range(5))
+    reads = []
+
+    def get_case(idx):
+        reads.append(idx)
+        return {"file_name": f"f{idx}"}
+
+    app_control.prefetch_cases(0, 5, get_case, _Keys())
+    assert sorted(session["prepared_cases"]) == [1] and reads == [1]
+    for ci in (1, 2, 3):
+        app_control.get_case_prepared(ci, get_case, _Keys())
+        app_control.prefetch_cases(ci, 5, get_case, _Keys())
+    assert sorted(session["prepared_cases"]) == [2, 3, 4]
+    assert reads == [1, 2, 0, 3, 4]  # 이미 준비된 증례는 다시 읽지 않음
+    app_control.prefetch_cases(4, 5, get_case, _Keys())
+    assert sorted(session["prepared_cases"]) == [3, 4]
+
+
+def test_app_prefetches_the_next_case(saved):
+    at = _start("app2", cases=4)
+    assert sorted(at.session_state["prepared_cases"]) == [0, 1]
+    _enter(at, ["a", "b", "c"])
+    _widget(at.button, "다음").click()
+    _run(at)
+    assert sorted(at.session_state["prepared_cases"]) == [0, 1, 2]
@@ -0,0 +1,63 @@
+import os
+
+from llm_ddx_control_app import case_sets
+
+
+def _csv(tmp_path, rows):
+    path = tmp_path / "cases.csv"
+    lines = ["file_name,현병력-Free Text#13"] + [f"{name},{hpi}" for name, hpi in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_bundle_rows_match_source(tmp_path):
+    root = str(tmp_path / "sets")
+    case_sets.build_bundle(_csv(tmp_path, [("a.txt", "복통"), ("b.txt", "")]), "S1", root=root)
+    b = case_sets.open_case_set("S1", root)
+    assert len(b) == 2 and b.columns == ["file_name", "현병력-Free Text#13"]
+    assert b.row(0)["현병력-Free Text#13"] == "복통" and b.row(1)["현병력-Free Text#13"] == ""
+    assert b.case_keys.file_names == ["a.txt", "b.txt"]
+    assert case_sets.open_case_set("S1", root) is b
+    assert case_sets.open_case_set("nope", root) is None
+    assert case_sets.open_case_set("../x", root) is None
+
+
+def test_rebuilt_bundle_replaces_cached_one(tmp_path):
+    root = str(tmp_path / "sets")
+    case_sets.build_bundle(_csv(tmp_path, [("a.txt", "복통")]), "S2", root=root)
+    old = case_sets.open_case_set("S2", root)
+    case_sets.build_bundle(_csv(tmp_path, [("a.txt", "발열"), ("b.txt", "기침")]), "S2", root=root)
+    new = case_sets.open_case_set("S2", root)
+    assert new is not old
+    assert len(new) == 2 and new.row(0)["현병력-Free Text#13"] == "발열"
+    assert new.meta["source_sha256"] != old.meta["source_sha256"]
+    assert old.row(0)["현병력-Free Text#13"] == "복통"  # 이전 번들을 쥔 세션은 계속 읽음
+    assert [n for n in os.listdir(root) if "@" in n] == [os.path.basename(os.path.realpath(new.path))]
+
+
+def test_rebuild_never_leaves_the_bundle_path_missing(tmp_path, monkeypatch):
+    root = str(tmp_path / "sets")
+    out = case_sets.build_bundle(_csv(tmp_path, [("a.txt", "복통")]), "S4", root=root)
+    seen = []
+
+    def probe(fn):
+        def wrapper(*args, **kwargs):
+            fn(*args, **kwargs)
+            seen.append(case_sets._stamp(out) is not None)  # 교체 단계마다 번들 경로가 열려 있어야 함
+        return wrapper
+
+    monkeypatch.setattr(case_sets.os, "replace", probe(os.replace))
+    monkeypatch.setattr(case_sets.shutil, "rmtree", probe(case_sets.shutil.rmtree))
+    case_sets.build_bundle(_csv(tmp_path, [("a.txt", "발열")]), "S4", root=root)
+    assert seen and all(seen)
+    assert case_sets.open_case_set("S4", root).row(0)["현병력-Free Text#13"] == "발열"
+
+
+def test_removed_bundle_is_dropped(tmp_path):
+    import shutil
+
+    root = str(tmp_path / "sets")
+    out = case_sets.build_bundle(_csv(tmp_path, [("a.txt", "복통")]), "S3", root=root)
+    assert case_sets.open_case_set("S3", root) is not None
+    shutil.rmtree(os.path.realpath(out))
+    assert case_sets.open_case_set("S3", root) is None
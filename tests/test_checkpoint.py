@@ -0,0 +1,98 @@
+import json
+import os
+
+from llm_ddx_control_app import checkpoint
+
+TODAY = "2026-10-17"
+
+
+def _row(sid, idx, file_name):
+    return {"session_uuid": sid, "participant_id": "p1", "arm": "control", "case_index": idx,
+            "cases_total": 3, "file_name": file_name, "entered_ddx_list": "[]", "seconds": 10 * idx}
+
+
+def _meta(sid, **fields):
+    return {"participant_id": "p1", "arm": "control", "session_uuid": sid, **fields}
+
+
+def test_meta_and_rows_fold_in_either_order(tmp_path):
+    a = checkpoint.CheckpointStore(str(tmp_path / "a"))
+    a.write_meta([("p1", _meta("s1", dataset="study:X", started=TODAY, finalized=False))])
+    a.write_batch([("p1", _row("s1", 1, "a.txt"))])
+    b = checkpoint.CheckpointStore(str(tmp_path / "b"))
+    b.write_batch([("p1", _row("s1", 1, "a.txt"))])
+    b.write_meta([("p1", _meta("s1", dataset="study:X", started=TODAY, finalized=False))])
+    sa, sb = a.load("p1"), b.load("p1")
+    for k in ("dataset", "started", "finalized", "case_index", "rows"):
+        assert sa[k] == sb[k]
+    assert checkpoint.resumable(sa, "study:X", TODAY)
+
+
+def test_resume_rejected_unless_everything_matches(tmp_path):
+    store = checkpoint.CheckpointStore(str(tmp_path))
+    store.write_meta([("p1", _meta("s1", dataset="study:X", started=TODAY, finalized=False))])
+    assert not checkpoint.resumable(store.load("p1"), "study:X", TODAY)  # 저장 행 없음
+    store.write_batch([("p1", _row("s1", 2, "b.txt"))])
+    state = store.load("p1")
+    assert checkpoint.resumable(state, "study:X", TODAY)
+    assert not checkpoint.resumable(state, "study:Y", TODAY)
+    assert not checkpoint.resumable(state, "sha256:abc", TODAY)
+    assert not checkpoint.resumable(state, "study:X", "2026-10-18")
+    assert not checkpoint.resumable(state, "", TODAY)
+    store.write_meta([("p1", _meta("s1", finalized=True))])
+    assert not checkpoint.resumable(store.load("p1"), "study:X", TODAY)
+    # 메타가 없는 이전 형식 체크포인트
+    legacy = {k: v for k, v in state.items() if k not in checkpoint.META_FIELDS}
+    assert not checkpoint.resumable(legacy, "study:X", TODAY)
+
+
+def test_new_session_archives_previous_checkpoint(tmp_path):
+    store = checkpoint.CheckpointStore(str(tmp_path))
+    store.write_batch([("p1", _row("s1", 1, "a.txt")), ("p1", _row("s1", 2, "b.txt"))])
+    store.write_meta([("p1", _meta("s1", finalized=True))])
+    store.write_meta([("p1", _meta("s2", dataset="study:X", started=TODAY, finalized=False))])
+    state = store.load("p1")
+    assert (state["session_uuid"], state["rows"]) == ("s2", {})
+    archived = os.listdir(tmp_path / "archive")
+    assert len(archived) == 1 and archived[0].startswith("p1_control_")
+    with open(tmp_path / "archive" / archived[0], encoding="utf-8") as f:
+        old = json.load(f)
+    assert old["session_uuid"] == "s1" and old["finalized"] and set(old["rows"]) == {"a.txt", "b.txt"}
+    # 같은 세션의 갱신은 보관하지 않음
+    store.write_batch([("p1", _row("s2", 1, "a.txt"))])
+    assert len(os.listdir(tmp_path / "archive")) == 1
+
+
+def test_rows_are_appended_as_deltas_and_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_COMPACT_EVERY", 2)
+    store = checkpoint.CheckpointStore(str(tmp_path))
+    path = checkpoint.checkpoint_path("p1", ckpt_dir=str(tmp_path))
+    store.write_batch([("p1", _row("s1", 1, "a.txt"))])
+    store.write_batch([("p1", _row("s1", 2, "b.txt"))])
+    store.write_batch([("p1", _row("s1", 3, "c.txt"))])
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)["rows"]) == {"a.txt"}  # 뒤의 두 행은 delta에만 있음
+    with open(checkpoint.delta_path(path), encoding="utf-8") as f:
+        stale = f.read()
+    assert len(stale.splitlines()) == 2
+    fresh = checkpoint.CheckpointStore(str(tmp_path)).load("p1")
+    assert (fresh["case_index"], set(fresh["rows"])) == (3, {"a.txt", "b.txt", "c.txt"})
+
+    store.write_batch([("p1", _row("s1", 4, "d.txt"))])  # 한도 초과 → .json 다시 쓰고 delta 삭제
+    assert not os.path.exists(checkpoint.delta_path(path))
+    with open(checkpoint.delta_path(path), "w", encoding="utf-8") as f:
+        f.write(stale)  # 압축 후 delta 삭제 전에 중단된 경우
+    fresh = checkpoint.CheckpointStore(str(tmp_path)).load("p1")
+    assert (fresh["case_index"], len(fresh["rows"])) == (4, 4)
+
+
+def test_finalized_and_least_recent_states_leave_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_MAX_STATES", 2)
+    store = checkpoint.CheckpointStore(str(tmp_path))
+    for pid in ("p1", "p2", "p3"):
+        store.write_batch([(pid, dict(_row("s1", 1, "a.txt"), participant_id=pid))])
+    assert sorted(os.path.basename(p) for p in store._states) == ["p2_control.json", "p3_control.json"]
+    assert store.load("p1")["rows"]["a.txt"]["participant_id"] == "p1"  # 파일에서 다시 읽음
+    store.write_meta([("p3", dict(_meta("s1", finalized=True), participant_id="p3"))])
+    assert [os.path.basename(p) for p in store._states] == ["p2_control.json"]
+    assert store.load("p3")["finalized"]
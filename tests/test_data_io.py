@@ -0,0 +1,94 @@
+import io
+import os
+
+from llm_ddx_control_app import data_io
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, data: bytes, file_id: str = "f1"):
+        super().__init__(data)
+        self.file_id = file_id
+
+
+CSV = "file_name,현병력-Free Text#13\na.txt,복통\nb.txt,발열\n".encode("utf-8")
+
+
+def test_read_uploaded_csv_shares_parsed_frame():
+    data_io.clear_case_cache()
+    before = data_io.case_cache_info()
+    df1 = data_io.read_uploaded_csv(_Upload(CSV))
+    df2 = data_io.read_uploaded_csv(_Upload(CSV, "f2"))
+    assert df1 is df2
+    info = data_io.case_cache_info()
+    assert (info["hits"] - before["hits"], info["misses"] - before["misses"]) == (1, 1)
+    assert list(df1["file_name"]) == ["a.txt", "b.txt"]
+
+
+def _csv_reader_rows(data: bytes):
+    import csv
+
+    rows = [r for r in csv.reader(io.StringIO(data.decode("utf-8-sig"), newline="")) if r]
+    return rows[0], rows[1:]
+
+
+def test_case_source_offsets_match_csv_reader(tmp_path):
+    # 따옴표 없는 필드 안의 '"'(5" 병변)와 따옴표 안의 줄바꿈/이스케이프가 섞인 파일
+    data = ('﻿file_name,현병력-Free Text#13\n'
+            'a.txt,5" 크기 병변\n'
+            '\n'
+            'b.txt,"여러 줄\n""인용"" 포함"\n'
+            'c.txt,끝\n').encode("utf-8")
+    path = tmp_path / "cases.csv"
+    path.write_bytes(data)
+    header, rows = _csv_reader_rows(data)
+    src = data_io.CaseSource(str(path))
+    assert src.columns == header
+    assert len(src) == len(rows) == 3
+    assert [list(src.row(i)) for i in range(len(src))] == rows
+    assert src.case_keys.file_names == ["a.txt", "b.txt", "c.txt"]
+
+
+def test_open_case_source_falls_back_to_eager_read():
+    # 따옴표 없는 필드 안의 CR은 csv.reader 오프셋 인덱스로 다룰 수 없음 → 통째로 읽기
+    data = "file_name,현병력-Free Text#13\na.txt,x\ry\n".encode("utf-8")
+    src = data_io.open_case_source(_Upload(data, "fallback"))
+    assert isinstance(src, data_io.FrameCases)
+    assert len(src) == len(src.case_keys)
+
+
+class _OnceUpload(_Upload):
+    def getvalue(self):
+        assert not getattr(self, "_read_once", False), "같은 업로드를 다시 해시함"
+        self._read_once = True
+        return super().getvalue()
+
+
+def test_open_case_source_caches_per_file_id():
+    up = _OnceUpload(CSV, "session-cached")
+    src = data_io.open_case_source(up)
+    assert data_io.open_case_source(up) is src
+    assert src.row(1)["file_name"] == "b.txt"
+
+
+def test_case_key_table_ids_and_duplicates():
+    import hashlib
+
+    table = data_io.CaseKeyTable(["a.txt", "b.txt", "a.txt", 3])
+    assert len(table) == 4 and table.duplicates == ["a.txt"]
+    assert table.length == 8 and not table.collisions
+    assert table.id_at(0) == table.id_at(2) == hashlib.md5(b"a.txt").hexdigest()[:8]
+    assert table.id_for(3) == table.id_at(3)
+    assert table.id_for("unknown.txt") == hashlib.md5(b"unknown.txt").hexdigest()[:8]  # 테이블 밖 이름도 같은 규칙
+
+
+def test_evicted_spool_files_are_removed_but_stay_readable(tmp_path, monkeypatch):
+    data_io.clear_case_cache()
+    monkeypatch.setattr(data_io, "_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(data_io, "CASE_CACHE_MAX_ENTRIES", 1)
+    first = data_io.open_case_source(_Upload(CSV, "spool1"))
+    second = data_io.open_case_source(_Upload(CSV + b"c.txt,x\n", "spool2"))
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(second.path)]
+    assert first.row(1)["file_name"] == "b.txt"  # 스풀 파일이 지워져도 열린 핸들로 읽음
+    data_io.clear_case_cache()
+    assert list(tmp_path.iterdir()) == []
+    assert second.row(2)["file_name"] == "c.txt"
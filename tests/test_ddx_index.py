@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from llm_ddx_control_app.ddx_index import DdxIndex, build_index, load_vocabulary, ngrams, normalize
+
+VOCAB = """# 대표명<TAB>동의어...
+급성 충수염\t충수염\tappendicitis\tacute appendicitis
+급성 담낭염|담낭염|cholecystitis
+요로결석\t신장결석\turolithiasis
+장폐색\tbowel obstruction
+"""
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    d = tmp_path_factory.mktemp("ddx")
+    path = d / "vocab.tsv"
+    path.write_text(VOCAB, encoding="utf-8")
+    concepts = load_vocabulary(str(path))
+    return concepts, DdxIndex(build_index(concepts, str(d / "idx")))
+
+
+def test_load_vocabulary_splits_tabs_and_pipes(index):
+    concepts, _ = index
+    assert [c[0] for c in concepts] == ["급성 충수염", "급성 담낭염", "요로결석", "장폐색"]
+    assert concepts[1] == ["급성 담낭염", "담낭염", "cholecystitis"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Acute-Appendicitis", ("급성 충수염", 1.0, "exact")),
+    ("ＡＰＰＥＮＤＩＣＩＴＩＳ", ("급성 충수염", 1.0, "exact")),
+    ("급성충수염", ("급성 충수염", 1.0, "compact")),
+    ("", (None, 0.0, "none")),
+    ("골절", (None, 0.0, "none")),
+])
+def test_match_methods(index, text, expected):
+    assert index[1].match(text) == expected
+
+
+def _dice(a, b):
+    ga, gb = set(ngrams(a)), set(ngrams(b))
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+
+def test_ngram_scores_match_brute_force(index):
+    concepts, idx = index
+    terms = [(normalize(t), c[0]) for c in concepts for t in c]
+    rng = random.Random(1)
+    for _ in range(100):
+        norm, _ = rng.choice(terms)
+        chars = list(norm.replace(" ", ""))
+        chars[rng.randrange(len(chars))] = "뷁"
+        query = "".join(chars)
+        name, score, method = idx.match(query, min_score=0.0)
+        if method != "ngram":
+            continue
+        best = max(_dice(query, t) for t, _ in terms)
+        assert score == pytest.approx(best)
+        assert any(c == name and _dice(query, t) == pytest.approx(best) for t, c in terms)
+
+
+def test_min_score_threshold(index):
+    _, idx = index
+    name, score, method = idx.match("충수염증", min_score=0.0)
+    assert (name, method) == ("급성 충수염", "ngram") and 0 < score < 1
+    assert idx.match("충수염증", min_score=0.99) == (None, 0.0, "none")
+    assert idx.match_many(["충수염", "장 폐색"]) == [("급성 충수염", 1.0, "exact"), ("장폐색", 1.0, "compact")]
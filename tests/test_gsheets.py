@@ -0,0 +1,83 @@
+from llm_ddx_control_app.gsheets import SHEET_COLUMNS, LocalWorksheet, SheetsBatchWriter, sheet_values
+
+
+def _row(i):
+    return {"participant_id": "p1", "file_name": f"c{i}", "case_index": i}
+
+
+def test_batches_rows_into_append_rows_calls():
+    ws = LocalWorksheet()
+    w = SheetsBatchWriter(lambda: ws, batch_size=5, window_sec=5.0)
+    for i in range(12):
+        w.submit(_row(i))
+    assert w.flush(5)
+    w.close(5)
+    assert [r[SHEET_COLUMNS.index("file_name")] for r in ws.rows] == [f"c{i}" for i in range(12)]
+    assert ws.calls <= 4  # 5 + 5 + 2 (flush 표식에서 끊기는 경우 한 번 더)
+    assert w.stats["rows_sent"] == 12
+
+
+def test_retries_then_falls_back():
+    failed = []
+    ws = LocalWorksheet(fail_times=10)
+    w = SheetsBatchWriter(lambda: ws, batch_size=10, window_sec=0.01, max_retries=2,
+                          on_failure=failed.append, backoff_base_sec=0.001)
+    w.submit(_row(1))
+    assert w.flush(5)
+    w.close(5)
+    assert ws.calls == 3 and w.stats["retries"] == 2
+    assert [r["file_name"] for r in failed] == ["c1"]
+
+
+def test_retry_succeeds_without_fallback():
+    failed = []
+    ws = LocalWorksheet(fail_times=1)
+    w = SheetsBatchWriter(lambda: ws, window_sec=0.01, on_failure=failed.append, backoff_base_sec=0.001)
+    w.submit(_row(1))
+    w.flush(5)
+    w.close(5)
+    assert len(ws.rows) == 1 and not failed
+
+
+def test_sheet_values_follow_column_order():
+    assert len(sheet_values({"file_name": "a"})) == len(SHEET_COLUMNS)
+
+
+def test_existing_sheet_keeps_its_header_layout(tmp_path):
+    import csv
+
+    path = tmp_path / "sheet.csv"
+    old = SHEET_COLUMNS[:10]  # case_id/hpi_edit 이전 시트
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(old)
+    ws = LocalWorksheet(str(path))
+    w = SheetsBatchWriter(lambda: ws, window_sec=0.01)
+    w.submit({**_row(1), "case_id": "k1", "hpi_edit": "{}"})
+    assert w.flush(5)
+    w.close(5)
+    with open(path, newline="", encoding="utf-8") as f:
+        lines = list(csv.reader(f))
+    assert [len(r) for r in lines] == [10, 10]
+    assert lines[1][old.index("file_name")] == "c1"
+
+
+def test_new_sheet_uses_full_layout(tmp_path):
+    ws = LocalWorksheet(str(tmp_path / "sheet.csv"))
+    w = SheetsBatchWriter(lambda: ws, window_sec=0.01)
+    w.submit({**_row(1), "case_id": "k1"})
+    w.flush(5)
+    w.close(5)
+    assert ws.row_values(1) == SHEET_COLUMNS
+    assert ws.rows[0][SHEET_COLUMNS.index("case_id")] == "k1"
+
+
+def test_flush_after_close_returns_immediately():
+    import threading
+
+    w = SheetsBatchWriter(LocalWorksheet, window_sec=0.01)
+    w.close(5)
+    result = []
+    t = threading.Thread(target=lambda: result.append(w.flush()), daemon=True)  # timeout=None
+    t.start()
+    t.join(5)
+    assert result == [True]
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from llm_ddx_control_app import hpi_edits
+from llm_ddx_control_app.hpi_edits import HpiEditStore, apply_diff, make_diff
+
+ORIGINAL = "\n".join(f"{i}번째 줄: 환자는 {i}일 전부터 복통과 발열을 호소함." for i in range(200)) + "\n"
+
+
+def _random_edit(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(1, 6)):
+        i = rng.randint(0, len(chars))
+        op = rng.choice(["ins", "del", "sub", "line"])
+        if op == "ins":
+            chars[i:i] = list("추가")
+        elif op == "del":
+            del chars[i:i + rng.randint(1, 30)]
+        elif op == "sub" and i < len(chars):
+            chars[i] = "X"
+        else:
+            chars[i:i] = list("\n새 줄\n")
+    return "".join(chars)
+
+
+def test_round_trip_on_random_edits():
+    rng = random.Random(0)
+    for _ in range(200):
+        edited = _random_edit(rng, ORIGINAL)
+        assert apply_diff(ORIGINAL, make_diff(ORIGINAL, edited)) == edited
+    for a, b in [("", "abc"), ("abc", ""), ("abc", "abc"), ("aaa", "aa"), ("a\nb\n", "a\nc\nb\n")]:
+        assert apply_diff(a, make_diff(a, b)) == b
+
+
+def test_single_edit_is_one_small_op_without_sequence_matching(monkeypatch):
+    def _no_matcher(*args, **kwargs):
+        raise AssertionError("한 곳만 고친 경우 SequenceMatcher가 필요 없음")
+
+    monkeypatch.setattr(hpi_edits, "SequenceMatcher", _no_matcher)
+    big = ORIGINAL * 50
+    i = len(big) // 2
+    diff = make_diff(big, big[:i] + "수정" + big[i + 3:])
+    assert diff["ops"] == [[i, i + 3, "수정"]]
+
+
+def test_multi_line_edit_diffs_only_changed_lines():
+    lines = ORIGINAL.splitlines(keepends=True)
+    edited = lines[:]
+    edited[10] = "고친 줄\n"
+    edited[150] = "또 고친 줄\n"
+    diff = make_diff(ORIGINAL, "".join(edited))
+    assert len(diff["ops"]) == 2
+    assert sum(len(t) for _, _, t in diff["ops"]) <= len("고친 줄\n또 고친 줄\n")
+    assert apply_diff(ORIGINAL, diff) == "".join(edited)
+
+
+def test_store_diffs_lazily_and_only_when_text_changes(monkeypatch):
+    calls = []
+    real = hpi_edits.make_diff
+    monkeypatch.setattr(hpi_edits, "make_diff", lambda a, b: calls.append(1) or real(a, b))
+    store = HpiEditStore()
+    edited = ORIGINAL.replace("1일", "하루", 1)
+    for _ in range(50):  # rerun마다 record만
+        store.record("k1", ORIGINAL, edited)
+    assert calls == []
+    assert store.text("k1", ORIGINAL) == edited
+    first = store.diff_json("k1")
+    assert store.diff_json("k1") == first  # 텍스트가 그대로면 다시 계산하지 않음
+    store.release("k1")
+    assert len(calls) == 1
+    assert store.text("k1", ORIGINAL) == edited  # 이탈 후에는 diff로 복원
+
+    store.record("k1", ORIGINAL, edited)  # 다시 방문, 수정 없음
+    store.release("k1")
+    assert len(calls) == 1
+
+    store.record("k1", ORIGINAL, ORIGINAL)  # 원문으로 되돌림
+    assert store.diff_json("k1") is None and len(store) == 0
+
+
+def test_load_restores_from_result_row():
+    edited = ORIGINAL + "추가 메모"
+    a = HpiEditStore()
+    a.record("k1", ORIGINAL, edited)
+    b = HpiEditStore()
+    b.load("k1", a.diff_json("k1"))
+    assert b.text("k1", ORIGINAL) == edited
+    assert b.text("k1", "다른 원문") == "다른 원문"  # base가 다르면 원문 그대로
+
+
+@pytest.mark.parametrize("n", [1_000, 100_000])
+def test_make_diff_cost_is_bounded_by_edit_size(n, monkeypatch):
+    compared = []
+    real = hpi_edits.SequenceMatcher
+
+    def _matcher(junk, a, b, **kwargs):
+        compared.append(len(a) + len(b))
+        return real(junk, a, b, **kwargs)
+
+    monkeypatch.setattr(hpi_edits, "SequenceMatcher", _matcher)
+    text = ("가나다라마바사\n" * (n // 8 + 1))[:n]
+    k = (n // 3) // 8 * 8  # 줄 시작
+    inserted = text[:k] + "수정됨" + text[k:]
+    diff = make_diff(text, inserted)
+    assert diff["ops"] == [[k, k, "수정됨"]] and compared == []
+
+    edited = text[:k] + "첫 줄 수정\n둘째 줄 수정\n" + text[k + 16:]  # 이웃한 두 줄 교체
+    diff = make_diff(text, edited)
+    assert apply_diff(text, diff) == edited
+    assert sum(len(t) for _, _, t in diff["ops"]) <= len("첫 줄 수정\n둘째 줄 수정\n")
+    assert compared and max(compared) <= 4  # 원문 길이와 무관하게 바뀐 줄만 비교
@@ -0,0 +1,84 @@
+import csv
+import os
+import threading
+import time
+
+from llm_ddx_control_app import journal
+from llm_ddx_control_app.storage import JournalBackend
+from llm_ddx_control_app.write_behind import WriteBehindWriter
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def test_eviction_under_two_workers_loses_no_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(journal, "JOURNAL_MAX_OPEN", 1)
+    orig_append = journal.ResultJournal.append
+
+    def slow_append(self, row):
+        time.sleep(0.0005)  # 핸들을 받은 뒤 쓰기 전까지의 창을 넓혀 다른 워커의 eviction과 겹치게 함
+        orig_append(self, row)
+
+    monkeypatch.setattr(journal.ResultJournal, "append", slow_append)
+    backend = JournalBackend(str(tmp_path / "results"))
+    writer = WriteBehindWriter(workers=2, batch_max=1)
+    pids = [f"p{i:02d}" for i in range(20)]  # JOURNAL_MAX_OPEN보다 훨씬 많은 참가자
+    for n in range(40):
+        for pid in pids:
+            writer.submit(pid, backend.write_batch, {"participant_id": pid, "file_name": f"c{n}", "n": n})
+    assert writer.flush(timeout=30)
+    writer.close(30)
+    assert writer.stats["errors"] == 0
+    assert len(journal._OPEN) <= 1
+    journal.close_all()
+    for pid in pids:
+        rows = list(backend.read_rows(participant_id=pid))
+        assert [r["n"] for r in rows] == list(range(40))
+
+
+def test_retired_handle_stays_open_until_released(tmp_path):
+    path = str(tmp_path / "a.jsonl")
+    with journal.open_journal(path) as j:
+        journal.close_all()  # 다른 스레드가 닫기를 요청해도
+        j.append({"participant_id": "p", "file_name": "x"})
+        assert not j._f.closed
+    assert j._f.closed
+    assert _lines(path) == 1
+
+
+def test_compaction_writes_latest_rows_and_truncates(tmp_path):
+    jpath = str(tmp_path / "p1_control_20260101.jsonl")
+    for i, f in enumerate(["a", "b", "a"]):
+        journal.append_row(jpath, {"participant_id": "p1", "file_name": f, "v": i})
+    csv_path = journal.compact_journal(jpath)
+    assert os.path.getsize(jpath) == 0
+    journal.append_row(jpath, {"participant_id": "p1", "file_name": "b", "v": 9})
+    journal.compact_journal(jpath)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["file_name"], r["v"]) for r in rows] == [("a", "2"), ("b", "9")]
+    journal.close_all()
+
+
+def test_compaction_blocks_concurrent_appends(tmp_path):
+    jpath = str(tmp_path / "p1_control_20260101.jsonl")
+    stop = threading.Event()
+    count = [0]
+
+    def appender():
+        while not stop.is_set():
+            journal.append_row(jpath, {"participant_id": "p1", "file_name": f"c{count[0]}"})
+            count[0] += 1
+
+    t = threading.Thread(target=appender)
+    t.start()
+    for _ in range(20):
+        journal.compact_journal(jpath)
+    stop.set()
+    t.join()
+    journal.compact_journal(jpath)
+    with open(os.path.splitext(jpath)[0] + ".csv", newline="", encoding="utf-8") as f:
+        assert sum(1 for _ in csv.DictReader(f)) == count[0]
+    journal.close_all()
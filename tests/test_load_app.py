@@ -0,0 +1,47 @@
+import csv
+import io
+
+from llm_ddx_control_app.benchmarks import load_app
+
+
+def test_make_cases_csv_round_trips_through_csv_reader():
+    data = load_app.make_cases_csv(5, 80, seed=1)
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+    assert rows[0] == ["file_name", "현병력-Free Text#13"]
+    assert [r[0] for r in rows[1:]] == [f"case_{i:05d}.txt" for i in range(5)]
+    assert all(len(r[1]) >= 80 for r in rows[1:])
+    assert any('"반발통"' in r[1] or "\n" in r[1] for r in rows[1:])  # 따옴표/줄바꿈이 실제로 들어감
+    assert load_app.make_cases_csv(5, 80, seed=1) == data
+
+
+def _steps(name, n, log):
+    for i in range(n):
+        log.append(f"{name}{i}")
+        yield
+    return name
+
+
+def test_run_interleaved_round_robins_within_concurrency():
+    log = []
+    done = load_app.run_interleaved([_steps("a", 2, log), _steps("b", 1, log), _steps("c", 2, log)], 2)
+    # a, b가 먼저 열리고 b가 끝나야 c가 들어옴
+    assert log == ["a0", "b0", "a1", "c0", "c1"]
+    assert done == ["b", "a", "c"]
+    assert load_app.run_interleaved([], 3) == []
+
+
+def test_pct_picks_nearest_rank():
+    vals = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert load_app._pct(vals, 0) == 1.0
+    assert load_app._pct(vals, .5) == 3.0
+    assert load_app._pct(vals, .99) == load_app._pct(vals, 1) == 5.0
+
+
+def test_simulate_participant_finishes_a_session():
+    load_app._TIMINGS.clear()
+    gen = load_app.simulate_participant(1, load_app.make_cases_csv(2, 100), 2, {}, timeout=30, seed=0)
+    [session] = load_app.run_interleaved([gen], 1)
+    assert session["session_bytes"] > 0
+    assert session["app"].session_state["participant_id"] == "bench0001"
+    assert {"rerun_load", "rerun_input", "rerun_nav"} <= set(load_app._TIMINGS)
+    assert len(load_app._TIMINGS["rerun_nav"]) == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from llm_ddx_control_app import metrics
+
+
+def test_timer_counts_errors_but_not_script_control():
+    m = metrics.Metrics()
+
+    class _Stop(BaseException):  # st.stop()/st.rerun()과 같은 계열
+        pass
+
+    for exc in (None, ValueError, _Stop):
+        try:
+            with metrics.timer("t", m):
+                if exc is not None:
+                    raise exc()
+        except BaseException:
+            pass
+    t = m.snapshot()["timers"]["t"]
+    assert (t["count"], t["errors"]) == (3, 1)
+
+
+def test_snapshot_window_and_quantiles():
+    m = metrics.Metrics(window=10)
+    for i in range(20):
+        m.observe("x", float(i))
+    m.incr("c", 2)
+    snap = m.snapshot()
+    t = snap["timers"]["x"]
+    assert t["count"] == 20 and t["sum"] == sum(range(20))
+    assert (t["p50"], t["max"]) == (15.0, 19.0)  # 최근 10개(10~19)만 백분위에 반영
+    assert snap["counters"] == {"c": 2}
+    text = metrics.prometheus_text(snap)
+    assert 'llm_ddx_x_seconds{quantile="0.5"} 15.000000' in text
+    assert "llm_ddx_c_total 2" in text
+
+
+@pytest.mark.parametrize("name", ["m.prom", "m.jsonl"])
+def test_export_formats(tmp_path, name):
+    m = metrics.Metrics()
+    m.observe("a.b", 0.5)
+    path = tmp_path / "out" / name
+    metrics.export(str(path), m.snapshot())
+    metrics.export(str(path), m.snapshot())
+    lines = path.read_text(encoding="utf-8").splitlines()
+    if name.endswith(".prom"):
+        assert "llm_ddx_a_b_seconds_count 1" in lines  # 교체라 한 번만
+    else:
+        assert len(lines) == 2
@@ -0,0 +1,41 @@
+import math
+
+import pandas as pd
+import pytest
+
+from llm_ddx_control_app.parsing import parse_listish, parse_listish_series, sniff_listish_format
+
+CELLS = [
+    '["충수염", "게실염"]',
+    "['충수염', '난소 염전']",
+    "충수염, 게실염; 장염",
+    "충수염|게실염\n장염",
+    "[충수염, 게실염]",
+    '{"name": "충수염"}',
+    "",
+    "   ",
+    None,
+    math.nan,
+    '["a", ""]',
+    "['unterminated",
+    "[",
+]
+
+
+@pytest.mark.parametrize("fmt", [None, "json", "python", "delimited"])
+def test_series_matches_cellwise_parse(fmt):
+    s = pd.Series(CELLS * 3, dtype=object)
+    out = parse_listish_series(s, fmt)
+    assert out.tolist() == [parse_listish(v) for v in s]
+
+
+def test_parse_listish_formats():
+    assert parse_listish('["A", " B "]') == ["A", "B"]
+    assert parse_listish("A;B|C") == ["A", "B", "C"]
+    assert parse_listish(math.nan) == []
+
+
+def test_sniff_picks_majority_format():
+    assert sniff_listish_format(['["a"]', '["b"]', "c"]) == "json"
+    assert sniff_listish_format(["['a']", "['b']"]) == "python"
+    assert sniff_listish_format(["a, b", "c"]) == "delimited"
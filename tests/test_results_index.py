@@ -0,0 +1,51 @@
+import io
+import os
+
+import pandas as pd
+
+from llm_ddx_control_app.results_index import ResultIndex
+
+
+def _row(pid, fname, ddx, ts):
+    return {"timestamp": ts, "participant_id": pid, "file_name": fname, "entered_ddx_list": ddx}
+
+
+def test_latest_row_per_key_in_save_order():
+    idx = ResultIndex("results/p1_control.csv")
+    idx.update(_row("p1", "a", "[1]", "t1"))
+    idx.update(_row("p1", "b", "[2]", "t2"))
+    idx.update(_row("p1", "a", "[3]", "t3"))
+    assert [(r["file_name"], r["entered_ddx_list"]) for r in idx.rows()] == [("b", "[2]"), ("a", "[3]")]
+
+
+def test_download_does_not_touch_result_file():
+    os.makedirs("results")
+    path = "results/p1_control.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("timestamp,participant_id,file_name,entered_ddx_list\nt0,p1,a,[0]\n")
+    before = os.stat(path).st_mtime_ns, open(path, encoding="utf-8").read()
+    idx = ResultIndex(path)
+    idx.seed()
+    idx.update(_row("p1", "a", "[9]", "t9"))
+    df = pd.read_csv(io.BytesIO(idx.to_csv_bytes()), encoding="utf-8-sig")
+    assert df["entered_ddx_list"].tolist() == ["[9]"]
+    assert (os.stat(path).st_mtime_ns, open(path, encoding="utf-8").read()) == before
+
+
+def test_index_cache_is_bounded_and_reseeds(monkeypatch):
+    from llm_ddx_control_app import results_index
+
+    monkeypatch.setattr(results_index, "RESULT_INDEX_MAX_ENTRIES", 2)
+    monkeypatch.setattr(results_index, "_INDEXES", results_index.OrderedDict())
+    os.makedirs("results")
+    paths = [f"results/p{i}_control.csv" for i in range(3)]
+    a = results_index.get_index(paths[0])
+    a.update(_row("p0", "a", "[1]", "t1"))
+    results_index.get_index(paths[1])
+    assert results_index.get_index(paths[0]) is a  # 최근 사용 → 유지
+    results_index.get_index(paths[2])
+    assert list(results_index._INDEXES) == [paths[0], paths[2]]
+    with open(paths[1], "w", encoding="utf-8") as f:
+        f.write("timestamp,participant_id,file_name,entered_ddx_list\nt0,p1,a,[0]\n")
+    assert [r["entered_ddx_list"] for r in results_index.get_index(paths[1]).rows()] == ["[0]"]
+    assert len(results_index._INDEXES) == 2
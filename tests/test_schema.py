@@ -0,0 +1,80 @@
+import csv
+import sqlite3
+
+import pytest
+
+from llm_ddx_control_app import journal
+from llm_ddx_control_app.config import RESULT_COLUMNS
+from llm_ddx_control_app.gsheets import SHEET_COLUMNS, sheet_values
+from llm_ddx_control_app.persistence import build_row
+from llm_ddx_control_app.sqlite_store import SqliteResultStore
+from llm_ddx_control_app.storage import CsvBackend, JournalBackend, result_path
+
+
+def _rows():
+    # 증례 id/편집이 있는 행과 없는 행이 섞여 있어도 컬럼은 같아야 함
+    return [
+        build_row("s1", "p1", 0, 3, 10, "a.txt", ["x"], ""),
+        build_row("s1", "p1", 1, 3, 20, "b.txt", ["y"], "메모", case_id="kb", hpi_edit='{"base": "1", "ops": []}'),
+        build_row("s1", "p1", 2, 3, 30, "c.txt", [], "", case_id="kc"),
+    ]
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_build_row_always_has_every_column():
+    for row in _rows():
+        assert list(row) == RESULT_COLUMNS
+    assert SHEET_COLUMNS == RESULT_COLUMNS
+    assert len(sheet_values(_rows()[0])) == len(RESULT_COLUMNS)
+
+
+@pytest.mark.parametrize("kind", ["csv", "journal", "sqlite"])
+def test_materialized_csv_has_fixed_header(kind, tmp_path):
+    backend = {"csv": CsvBackend, "journal": JournalBackend, "sqlite": SqliteResultStore}[kind](str(tmp_path))
+    for row in _rows():  # 행마다 따로 (CSV는 새 파일의 첫 행이 헤더를 정함)
+        backend.write_batch([("p1", row)])
+    backend.flush("p1")
+    backend.close()
+    journal.close_all()
+    lines = _read(result_path("p1", "control", ".csv", str(tmp_path)))
+    assert lines[0] == RESULT_COLUMNS
+    assert [len(r) for r in lines[1:]] == [len(RESULT_COLUMNS)] * 3
+    assert [r[RESULT_COLUMNS.index("case_id")] for r in lines[1:]] == ["", "kb", "kc"]
+
+
+def test_csv_backend_follows_existing_header_or_fails(tmp_path):
+    path = result_path("p1", "control", ".csv", str(tmp_path))
+    old = RESULT_COLUMNS[:10]  # case_id/hpi_edit 이전 형식
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(old)
+    backend = CsvBackend(str(tmp_path))
+    backend.write_batch([("p1", {k: v for k, v in _rows()[0].items() if k in old})])
+    with pytest.raises(ValueError, match="case_id"):
+        backend.write_batch([("p1", _rows()[1])])
+    lines = _read(path)
+    assert [len(r) for r in lines] == [10, 10]
+
+
+def test_sqlite_adds_new_columns_to_old_database(tmp_path):
+    db = tmp_path / "results.sqlite3"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE results (" + ", ".join(f"{c} TEXT" for c in RESULT_COLUMNS[:10])
+        + ", extra TEXT, updated_ns INTEGER NOT NULL, PRIMARY KEY (session_uuid, participant_id, file_name))"
+    )
+    conn.execute(
+        "INSERT INTO results (session_uuid, participant_id, arm, file_name, extra, updated_ns) "
+        "VALUES ('s0', 'p1', 'control', 'old.txt', '{\"case_id\": \"kold\"}', 1)"
+    )
+    conn.commit()
+    conn.close()
+    store = SqliteResultStore(str(tmp_path), db_path=str(db))
+    store.write_batch([("p1", _rows()[1])])
+    rows = list(store.read_rows("control", "p1"))
+    assert [r["case_id"] for r in rows] == ["kold", "kb"]
+    assert all(set(RESULT_COLUMNS) <= set(r) for r in rows)
+    store.close()
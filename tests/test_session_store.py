@@ -0,0 +1,27 @@
+from llm_ddx_control_app.session_store import SessionResultStore
+
+
+def _row(fname, ddx, **extra):
+    return {"participant_id": "p1", "file_name": fname, "entered_ddx_list": ddx, **extra}
+
+
+def test_keeps_latest_row_per_case_and_bounded_history():
+    store = SessionResultStore(history_len=2)
+    store.put(_row("a", "[1]"))
+    store.put(_row("b", "[2]"))
+    store.put(_row("a", "[3]"))
+    assert len(store) == 2
+    assert store.latest("a")["entered_ddx_list"] == "[3]"
+    assert store.latest("missing") is None
+    assert [r["entered_ddx_list"] for r in store.history_rows()] == ["[2]", "[3]"]
+    assert store.puts == 3
+
+
+def test_no_history_when_disabled_and_columns_shared():
+    store = SessionResultStore(history_len=0)
+    store.put(_row("a", "[1]"))
+    store.put(_row("b", "[2]"))
+    assert store.history_rows() == []
+    recs = list(store._latest.values())
+    assert recs[0].columns is recs[1].columns
+    assert store.memory_bytes() > 0
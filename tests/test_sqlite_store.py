@@ -0,0 +1,42 @@
+import threading
+
+from llm_ddx_control_app import results_index, storage
+from llm_ddx_control_app.sqlite_store import SqliteResultStore
+
+
+def _row(pid, fname, ddx, sid="s1"):
+    return {"session_uuid": sid, "participant_id": pid, "arm": "control", "file_name": fname,
+            "entered_ddx_list": ddx, "case_id": "k" + fname}
+
+
+def test_upsert_keeps_latest_row_and_extra_columns(tmp_path):
+    store = SqliteResultStore(str(tmp_path))
+    store.write_batch([("p1", _row("p1", "a", "[1]")), ("p1", _row("p1", "b", "[2]"))])
+    store.write_batch([("p1", _row("p1", "a", "[3]"))])
+    rows = list(store.read_rows("control", "p1"))
+    assert [(r["file_name"], r["entered_ddx_list"]) for r in rows] == [("b", "[2]"), ("a", "[3]")]
+    assert rows[0]["case_id"] == "kb"
+    store.close()
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    store = SqliteResultStore(str(tmp_path))
+    for i in range(10):
+        t = threading.Thread(target=store.write_batch, args=([("p1", _row("p1", f"c{i}", "[]"))],))
+        t.start()
+        t.join()
+    store._conn()  # 새 연결을 만들 때 종료된 스레드의 연결을 정리
+    assert len(store._conns) <= 2
+    assert len(list(store.read_rows(participant_id="p1"))) == 10
+    store.close()
+
+
+def test_download_index_seeds_from_sqlite(monkeypatch):
+    monkeypatch.setattr(results_index, "LOCAL_RESULT_FORMAT", "sqlite")
+    try:
+        storage.local_backend("sqlite").write_batch([("p9", _row("p9", "a", "[7]"))])
+        idx = results_index.ResultIndex("results/p9_control_20260101.csv")
+        idx.seed("p9")
+        assert [r["entered_ddx_list"] for r in idx.rows()] == ["[7]"]
+    finally:
+        storage.close_all()
@@ -0,0 +1,31 @@
+import pytest
+
+from llm_ddx_control_app import storage
+from llm_ddx_control_app.storage import CsvBackend, JournalBackend, StorageBackend, local_backend
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+@pytest.mark.parametrize("cls", [CsvBackend, JournalBackend])
+def test_rows_are_split_by_arm_and_read_back_in_order(cls, tmp_path):
+    b = cls(str(tmp_path))
+    b.write_batch([
+        ("p1", {"participant_id": "p1", "arm": "control", "file_name": "a"}),
+        ("p1", {"participant_id": "p1", "arm": "case", "file_name": "b"}),
+        ("p1", {"participant_id": "p1", "arm": "control", "file_name": "c"}),
+    ])
+    assert [r["file_name"] for r in b.read_rows(arm="control", participant_id="p1")] == ["a", "c"]
+    assert [r["file_name"] for r in b.read_rows(arm="case")] == ["b"]
+    b.close()
+
+
+def test_local_backend_is_shared_per_kind_and_dir(tmp_path):
+    try:
+        assert local_backend("journal", str(tmp_path)) is local_backend("journal", str(tmp_path))
+        with pytest.raises(ValueError):
+            local_backend("nope", str(tmp_path))
+    finally:
+        storage.close_all()
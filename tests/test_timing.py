@@ -0,0 +1,60 @@
+from llm_ddx_control_app import journal, timing
+from llm_ddx_control_app.timing import TimingLog
+
+
+def test_ring_buffer_drops_oldest_and_keeps_seq():
+    log = TimingLog(capacity=4)
+    for i in range(6):
+        log.record("next", f"k{i}", now_ns=log.anchor_ns + i * 1_000_000)
+    assert log.stats() == {"pending": 4, "recorded": 6, "flushed": 0, "dropped": 2}
+    rows = log.drain(session_uuid="s1")
+    assert [r["seq"] for r in rows] == [3, 4, 5, 6]  # 빠진 seq 1, 2 = 버린 이벤트
+    assert [r["case_id"] for r in rows] == ["k2", "k3", "k4", "k5"]
+    assert [r["t_ms"] for r in rows] == [2.0, 3.0, 4.0, 5.0]
+    assert all(r["session_uuid"] == "s1" for r in rows)
+    assert len(log) == 0 and log.drain() == []
+    log.record("end")
+    assert [r["seq"] for r in log.drain()] == [7]
+
+
+def test_enter_leave_and_first_input():
+    log = TimingLog()
+    assert log.enter("k1") and not log.enter("k1")  # 같은 증례 rerun은 기록하지 않음
+    assert log.first_input("k1") and not log.first_input("k1")
+    assert log.enter("k2")  # k1 이탈 + k2 진입
+    assert log.current_case == "k2"
+    log.leave()
+    assert log.leave() is None
+    rows = log.drain()
+    assert [(r["event"], r["case_id"]) for r in rows] == [
+        ("enter", "k1"), ("first_input", "k1"), ("leave", "k1"), ("enter", "k2"), ("leave", "k2"),
+    ]
+    leaves = [r for r in rows if r["event"] == "leave"]
+    assert all("dwell_ms" in r and r["dwell_ms"] >= 0 for r in leaves)
+    assert "dwell_ms" not in rows[0]
+    assert set(log.dwell_ms) == {"k1", "k2"}
+
+
+def test_resumed_log_continues_elapsed_time():
+    log = TimingLog(offset_sec=90)
+    log.record("start")
+    assert log.drain()[0]["t_ms"] >= 90_000
+
+
+def test_due_by_count_and_age():
+    log = TimingLog()
+    assert not log.due()
+    log.record("start")
+    assert not log.due(flush_events=2, flush_sec=60)
+    assert log.due(flush_events=1, flush_sec=60)
+    assert log.due(flush_events=2, flush_sec=0)
+
+
+def test_write_events_appends_to_per_participant_journal(tmp_path):
+    log = TimingLog()
+    log.enter("k1")
+    rows = log.drain(session_uuid="s1", participant_id="tm1", arm="control")
+    timing.write_events([("tm1", r) for r in rows])
+    journal.close_all()
+    path = timing.events_path("tm1", "control")
+    assert [r["event"] for r in journal.read_journal(path)] == ["enter"]
@@ -0,0 +1,22 @@
+from llm_ddx_control_app import persistence, warmup
+from llm_ddx_control_app.metrics import REGISTRY
+
+
+def test_storage_warms_only_the_selected_backend(monkeypatch):
+    made = []
+    monkeypatch.setattr(persistence, "local_backend", lambda *a, **k: made.append(a))
+    monkeypatch.setattr(persistence, "_BACKEND", object.__new__(persistence.SheetsBackend))
+    warmup._warm_storage()
+    assert made == []  # Sheets가 선택돼 있으면 로컬 백엔드를 만들지 않음
+
+
+def test_failed_steps_are_counted(monkeypatch):
+    def boom():
+        raise RuntimeError("x")
+
+    monkeypatch.setattr(warmup, "_warm_pandas", boom)
+    monkeypatch.setattr(warmup, "_warm_storage", lambda: None)
+    before = REGISTRY.snapshot()["counters"].get("warmup.errors", 0)
+    out = warmup.warm_up()
+    assert set(out) == {"pandas", "case_sets", "storage"}
+    assert REGISTRY.snapshot()["counters"]["warmup.errors"] == before + 1
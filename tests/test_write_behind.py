@@ -0,0 +1,55 @@
+import threading
+import time
+
+from llm_ddx_control_app.write_behind import WriteBehindWriter
+
+
+def test_per_participant_order_and_batching():
+    written = []
+    lock = threading.Lock()
+
+    def sink(batch):
+        time.sleep(0.001)
+        with lock:
+            written.extend(batch)
+
+    w = WriteBehindWriter(workers=3, queue_max=1000, batch_max=50)
+    for i in range(200):
+        for pid in ("p1", "p2", "p3", "p4"):
+            w.submit(pid, sink, {"i": i})
+    assert w.flush(timeout=10)
+    w.close(10)
+    for pid in ("p1", "p2", "p3", "p4"):
+        assert [r["i"] for p, r in written if p == pid] == list(range(200))
+    assert w.stats["written"] == 800
+    assert w.stats["batches"] < 800
+
+
+def test_full_queue_writes_inline_in_order():
+    written = []
+    gate = threading.Event()
+
+    def slow(batch):
+        gate.wait(5)
+        written.extend(r["i"] for _, r in batch)
+
+    w = WriteBehindWriter(workers=1, queue_max=2, batch_max=1, put_timeout_sec=0.01)
+    t = threading.Thread(target=lambda: [w.submit("p1", slow, {"i": i}) for i in range(6)])
+    t.start()
+    time.sleep(0.2)
+    gate.set()
+    t.join(10)
+    w.close(10)
+    assert written == list(range(6))
+    assert w.stats["inline"] > 0
+
+
+def test_sink_errors_are_counted_not_raised():
+    def boom(batch):
+        raise OSError("disk full")
+
+    w = WriteBehindWriter(workers=1)
+    w.submit("p1", boom, {"i": 1})
+    w.flush(timeout=5)
+    w.close(5)
+    assert w.stats["errors"] == 1
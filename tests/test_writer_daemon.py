@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pytest
+
+from llm_ddx_control_app import journal, storage
+from llm_ddx_control_app.checkpoint import CheckpointStore, checkpoint_path
+from llm_ddx_control_app.metrics import REGISTRY
+from llm_ddx_control_app.writer_daemon import WriterClient, WriterDaemon
+
+
+@pytest.fixture
+def sock_dir():
+    d = tempfile.mkdtemp(prefix="wd", dir="/tmp")  # Unix 소켓 경로 길이 제한 때문에 짧은 경로
+    yield d
+    shutil.rmtree(d, ignore_errors=True)
+
+
+def _start(sock, save_dir, spill_dir, checkpoints=None):
+    daemon = WriterDaemon(sock, "journal", save_dir, spill_dir, checkpoints)
+    t = threading.Thread(target=daemon.serve_forever, daemon=True)
+    t.start()
+    for _ in range(200):
+        if os.path.exists(sock):
+            break
+        time.sleep(0.01)
+    return daemon
+
+
+def _row(pid, sid, i):
+    return {"session_uuid": sid, "participant_id": pid, "arm": "control", "case_index": i,
+            "file_name": f"c{i}.txt", "entered_ddx_list": "[]"}
+
+
+def _stop(daemon):
+    daemon.close()  # 다른 스레드에서 막혀 있는 accept()는 깨우지 않으므로 join하지 않음 (데몬 스레드)
+    storage.close_all()
+    journal.close_all()
+
+
+def test_rows_meta_and_checkpoint_go_through_the_daemon(sock_dir, tmp_path):
+    sock = os.path.join(sock_dir, "w.sock")
+    save_dir = str(tmp_path / "results")
+    store = CheckpointStore(str(tmp_path / "ckpt"))
+    daemon = _start(sock, save_dir, str(tmp_path / "spill"), store)
+    client = WriterClient(sock, save_dir, str(tmp_path / "spill"))
+    try:
+        client.write_checkpoint_meta([("wd1", {"participant_id": "wd1", "arm": "control", "session_uuid": "s1",
+                                               "dataset": "study:X", "started": "2026-10-17", "finalized": False})])
+        client.write_batch([("wd1", _row("wd1", "s1", i)) for i in (1, 2, 3)])
+        state = client.load_checkpoint("wd1")
+        assert state["case_index"] == 3 and state["dataset"] == "study:X"
+        assert os.path.exists(checkpoint_path("wd1", ckpt_dir=store.ckpt_dir))
+        errors = REGISTRY.snapshot()["counters"].get("writer_daemon.errors", 0)
+        client._call(("rows", None))  # 잘못된 배치: 응답은 없지만 오류 지표로 남음
+        assert client.stats()["metrics"]["counters"]["writer_daemon.errors"] == errors + 1
+        client.flush("wd1")
+        csv_path = storage.result_path("wd1", "control", ".csv", save_dir)
+        assert len(list(journal.read_csv_rows(csv_path))) == 3
+        assert client.stats()["rows_received"] == 3
+        with pytest.raises(ValueError):
+            client._call(("nope",), reply=True)  # 알 수 없는 op는 클라이언트에서 예외
+    finally:
+        client.close()
+        _stop(daemon)
+
+
+def test_spilled_rows_are_replayed_when_the_daemon_starts(sock_dir, tmp_path):
+    sock = os.path.join(sock_dir, "w.sock")
+    save_dir, spill_dir = str(tmp_path / "results"), str(tmp_path / "spill")
+    client = WriterClient(sock, save_dir, spill_dir)
+    client.write_batch([("wd2", _row("wd2", "s1", i)) for i in (1, 2)])  # 데몬 없음 → 임시 기록
+    client.write_checkpoint_meta([("wd2", {"participant_id": "wd2", "arm": "control", "session_uuid": "s1",
+                                           "finalized": True})])
+    assert sorted(os.path.splitext(p)[1] for p in os.listdir(spill_dir)) == [".jsonl", ".meta"]
+    # 이전 데몬이 재생 도중 중단돼 남긴 클레임 파일도 재생
+    journal.append_row(os.path.join(spill_dir, "1.jsonl.replaying"), _row("wd2", "s1", 3))
+    journal.close_journal(os.path.join(spill_dir, "1.jsonl.replaying"))
+
+    daemon = _start(sock, save_dir, spill_dir)
+    try:
+        for _ in range(500):  # 소켓을 연 뒤 재생하므로 끝날 때까지 대기
+            if not os.listdir(spill_dir):
+                break
+            time.sleep(0.01)
+        assert os.listdir(spill_dir) == []
+        daemon.writer.flush(timeout=10)
+        state = daemon.checkpoints.load("wd2")
+        assert daemon.checkpoints.ckpt_dir == os.path.join(save_dir, "checkpoints")  # --save-dir 아래
+        assert state["finalized"] is True and set(state["rows"]) == {"c1.txt", "c2.txt", "c3.txt"}
+        jpath = storage.result_path("wd2", "control", ".jsonl", save_dir)
+        assert [r["case_index"] for r in journal.read_journal(jpath)] == [3, 1, 2]
+    finally:
+        client.close()
+        _stop(daemon)
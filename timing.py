@@ -0,0 +1,165 @@
+# llm_ddx_control_app/timing.py
+# 증례별 체류 시간 측정용 경량 이벤트 기록기.
+# 결과 행의 seconds(자동저장 시점의 누적 경과)에 기대지 않고, 세션마다 monotonic 시각의 이벤트를
+# 고정 크기 링버퍼(array)에 쌓았다가 TIMING_FLUSH_EVENTS개 / TIMING_FLUSH_SEC마다 한 번에 전송합니다.
+#
+# 이벤트: start(세션 시작/재개) · enter/leave(증례 진입/이탈, leave에 dwell_ms) · first_input(증례별 첫 입력)
+#         prev/next(이동 버튼) · finalize(마지막 증례 저장) · end(세션 종료 버튼)
+# 파일 ({TIMING_EVENTS_DIR}/{participant_id}_{arm}_{날짜}.jsonl, 결과 파일과 분리):
+#   {"session_uuid", "participant_id", "arm", "seq", "event", "case_id", "t_ms", "ts"[, "dwell_ms"]}
+#   t_ms는 세션 시작 기준 monotonic 경과(ms, 재개 시 이어짐), ts는 그 값으로 환산한 벽시계 시각.
+#   seq는 기록기마다 1부터 (재개하면 start부터 다시); 중간 공백 = 버퍼 초과로 버린 이벤트.
+
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from llm_ddx_control_app import journal
+from llm_ddx_control_app.config import (
+    TIMING_BUFFER_EVENTS,
+    TIMING_EVENTS_DIR,
+    TIMING_FLUSH_EVENTS,
+    TIMING_FLUSH_SEC,
+)
+from llm_ddx_control_app.metrics import timer
+from llm_ddx_control_app.storage import result_path
+
+EVENTS = ("start", "enter", "leave", "first_input", "prev", "next", "finalize", "end")
+_CODE = {name: i for i, name in enumerate(EVENTS)}
+
+Batch = List[Tuple[str, Dict]]
+
+
+class TimingLog:
+    """세션별 이벤트 링버퍼. 이벤트 하나는 (종류, 증례 슬롯, 시각, 체류 시간) 배열 칸 4개만 차지합니다."""
+
+    def __init__(self, capacity: int = TIMING_BUFFER_EVENTS, offset_sec: float = 0.0):
+        self.capacity = max(1, capacity)
+        self._kind = array("b", bytes(self.capacity))
+        self._slot = array("i", [0]) * self.capacity
+        self._t = array("q", [0]) * self.capacity
+        self._dwell = array("q", [0]) * self.capacity
+        self._head = 0    # 가장 오래된 미전송 이벤트 위치
+        self._count = 0   # 미전송 이벤트 수
+        self._seq = 0     # 지금까지 기록한 이벤트 수
+        self.dropped = 0
+        self.flushed = 0
+        # 재개한 세션은 저장된 경과 시간만큼 앞당긴 기준점을 써서 t_ms가 이어지게 함
+        offset_ns = int(offset_sec * 1e9)
+        self.anchor_ns = time.monotonic_ns() - offset_ns
+        self.anchor_wall_ns = time.time_ns() - offset_ns
+        self._case_ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._current: Optional[int] = None
+        self._entered_ns = 0
+        self._touched = set()
+        self.dwell_ms: Dict[str, int] = {}  # case_id → 누적 체류 시간
+
+    def _case_slot(self, case_id: str) -> int:
+        slot = self._slots.get(case_id)
+        if slot is None:
+            slot = self._slots[case_id] = len(self._case_ids)
+            self._case_ids.append(case_id)
+        return slot
+
+    def record(self, event: str, case_id: str = "", dwell_ns: int = 0, now_ns: Optional[int] = None):
+        i = (self._head + self._count) % self.capacity
+        if self._count == self.capacity:
+            # 가득 차면 가장 오래된 미전송 이벤트를 덮어씀
+            self._head = (self._head + 1) % self.capacity
+            self.dropped += 1
+        else:
+            self._count += 1
+        self._kind[i] = _CODE[event]
+        self._slot[i] = self._case_slot(case_id)
+        self._t[i] = (now_ns if now_ns is not None else time.monotonic_ns()) - self.anchor_ns
+        self._dwell[i] = dwell_ns
+        self._seq += 1
+
+    # ---- 증례 진입/이탈 ----
+    @property
+    def current_case(self) -> Optional[str]:
+        return self._case_ids[self._current] if self._current is not None else None
+
+    def enter(self, case_id: str) -> bool:
+        """증례를 화면에 띄울 때 호출 (같은 증례 rerun이면 기록하지 않음)."""
+        slot = self._case_slot(case_id)
+        if self._current == slot:
+            return False
+        self.leave()
+        now = time.monotonic_ns()
+        self.record("enter", case_id, now_ns=now)
+        self._current, self._entered_ns = slot, now
+        return True
+
+    def leave(self) -> Optional[int]:
+        """현재 증례에서 나감. 이번 방문의 체류 시간(ms)을 반환."""
+        if self._current is None:
+            return None
+        case_id = self._case_ids[self._current]
+        now = time.monotonic_ns()
+        dwell = now - self._entered_ns
+        self.record("leave", case_id, dwell_ns=dwell, now_ns=now)
+        self.dwell_ms[case_id] = self.dwell_ms.get(case_id, 0) + dwell // 1_000_000
+        self._current = None
+        return dwell // 1_000_000
+
+    def first_input(self, case_id: str) -> bool:
+        """증례별 첫 입력 (세션당 한 번)."""
+        slot = self._case_slot(case_id)
+        if slot in self._touched:
+            return False
+        self._touched.add(slot)
+        self.record("first_input", case_id)
+        return True
+
+    # ---- 전송 ----
+    def __len__(self) -> int:
+        return self._count
+
+    def due(self, flush_events: int = TIMING_FLUSH_EVENTS, flush_sec: float = TIMING_FLUSH_SEC) -> bool:
+        if not self._count:
+            return False
+        if self._count >= flush_events:
+            return True
+        oldest = self._t[self._head] + self.anchor_ns
+        return time.monotonic_ns() - oldest >= flush_sec * 1e9
+
+    def drain(self, **context) -> List[Dict]:
+        """미전송 이벤트를 행(dict)으로 꺼내고 버퍼를 비움. context(session_uuid 등)는 모든 행에 들어감."""
+        rows = []
+        first_seq = self._seq - self._count + 1
+        for k in range(self._count):
+            i = (self._head + k) % self.capacity
+            t_ns = self._t[i]
+            row = dict(context)
+            row.update({
+                "seq": first_seq + k,
+                "event": EVENTS[self._kind[i]],
+                "case_id": self._case_ids[self._slot[i]],
+                "t_ms": round(t_ns / 1e6, 1),
+                "ts": datetime.fromtimestamp((self.anchor_wall_ns + t_ns) / 1e9).isoformat(timespec="milliseconds"),
+            })
+            if self._kind[i] == _CODE["leave"]:
+                row["dwell_ms"] = self._dwell[i] // 1_000_000
+            rows.append(row)
+        self._head = (self._head + self._count) % self.capacity
+        self._count = 0
+        self.flushed += len(rows)
+        return rows
+
+    def stats(self) -> Dict:
+        return {"pending": self._count, "recorded": self._seq, "flushed": self.flushed, "dropped": self.dropped}
+
+
+# ---- 파일 기록 (write-behind sink) ----
+def events_path(participant_id: str, arm: str = "control", events_dir: str = TIMING_EVENTS_DIR) -> str:
+    return result_path(participant_id, arm, ".jsonl", events_dir)
+
+
+def write_events(batch: Batch):
+    """이벤트 행 배치를 참가자별 이벤트 저널에 append (결과 행 sink와 같은 방식)."""
+    with timer("timing_append"):
+        for pid, row in batch:
+            journal.append_row(events_path(pid, str(row.get("arm") or "control")), row)
@@ -0,0 +1,96 @@
+# llm_ddx_control_app/warmup.py
+# 콜드 스타트 워밍업: 앱 모듈은 pandas/numpy를 첫 업로드·저장 때까지 import하지 않으므로
+# 새 워커의 첫 화면("CSV 업로드")은 바로 뜹니다. 그 사이 무거운 준비 작업을 미리 해 두는 진입점입니다.
+#   - app_control.main()이 WARMUP_ON_START일 때 start_warmup()으로 백그라운드 스레드에서 (프로세스당 한 번)
+#   - python -m llm_ddx_control_app.warmup   (단계별 소요 시간을 JSON으로 출력)
+# 단계별 시간은 metrics의 warmup.<단계> 타이머로, 실패한 단계 수는 warmup.errors 카운터로 남습니다.
+
+import io
+import json
+import time
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+from llm_ddx_control_app.config import CASE_SETS_DIR, WARMUP_ON_START
+from llm_ddx_control_app.metrics import incr, timer
+
+
+def _warm_pandas():
+    import numpy  # noqa: F401
+    import pandas as pd
+
+    # read_csv/to_csv가 처음 호출될 때 불러오는 하위 모듈까지 미리 로드
+    df = pd.read_csv(io.BytesIO("file_name,현병력-Free Text#13\na,b\n".encode("utf-8")))
+    df.to_csv(index=False)
+    pd.Series({"file_name": "a"}, dtype=object)
+
+
+def _warm_case_sets(root: str = CASE_SETS_DIR):
+    from llm_ddx_control_app.case_sets import list_case_sets, open_case_set
+
+    for meta in list_case_sets(root):
+        open_case_set(meta["code"], root)
+
+
+def _warm_storage():
+    """persistence가 실제로 쓸 저장 백엔드만 준비 (secrets로 결정; Sheets 구성 시 로컬 백엔드를 따로 만들지 않음)."""
+    from llm_ddx_control_app.persistence import resolve_backend
+    from llm_ddx_control_app.write_behind import get_writer
+
+    resolve_backend()
+    get_writer()
+
+
+def warm_up() -> Dict[str, float]:
+    """무거운 import와 프로세스 전역 객체를 미리 준비. {단계: 초}를 반환.
+
+    저장 백엔드는 st.secrets로 결정합니다 (스크립트 실행 밖에서는 secrets.toml 기준).
+    """
+    steps = [("pandas", _warm_pandas), ("case_sets", _warm_case_sets), ("storage", _warm_storage)]
+    out: Dict[str, float] = {}
+    for name, fn in steps:
+        t0 = time.perf_counter()
+        try:
+            with timer(f"warmup.{name}"):
+                fn()
+        except Exception:
+            incr("warmup.errors")  # 실제 요청 경로에서 다시 시도됨
+        out[name] = round(time.perf_counter() - t0, 4)
+    return out
+
+
+_THREAD: Optional[threading.Thread] = None
+_THREAD_LOCK = threading.Lock()
+
+
+def start_warmup(enabled: bool = WARMUP_ON_START) -> bool:
+    """warm_up()을 백그라운드 스레드로 (프로세스당 한 번) 시작."""
+    global _THREAD
+    if not enabled:
+        return False
+    with _THREAD_LOCK:
+        if _THREAD is None:
+            _THREAD = threading.Thread(target=warm_up, name="warmup", daemon=True)
+            _THREAD.start()
+        return True
+
+
+def wait_warmup(timeout: Optional[float] = None) -> bool:
+    """백그라운드 워밍업이 끝났는지 (시작하지 않았으면 True)."""
+    with _THREAD_LOCK:
+        t = _THREAD
+    if t is not None:
+        t.join(timeout)
+        return not t.is_alive()
+    return True
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="앱 프로세스 워밍업 (단계별 소요 시간 출력)")
+    ap.parse_args(argv)
+    print(json.dumps(warm_up(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# llm_ddx_control_app/write_behind.py
+# 결과 저장을 Streamlit 스크립트 스레드에서 분리하는 write-behind 워커 (프로세스당 1개).
+# participant_id 해시로 샤드를 고정하므로 같은 참가자의 행은 제출 순서대로 기록됩니다.
+# 워커는 큐에 쌓인 행을 최대 batch_max개까지 모아 sink(batch) 한 번으로 넘깁니다.
+
+import atexit
+import queue
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_ddx_control_app.config import WRITE_BEHIND_WORKERS, WRITE_BEHIND_QUEUE_MAX, WRITE_BEHIND_BATCH_MAX
+from llm_ddx_control_app.metrics import incr
+
+Sink = Callable[[List[Tuple[str, Dict]]], None]
+
+_STOP = object()
+
+
+class _Flush:
+    __slots__ = ("event",)
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class WriteBehindWriter:
+    """bounded 큐 + 샤드별 워커 스레드. 큐가 가득 차면 호출 스레드에서 직접 기록(백프레셔)."""
+
+    def __init__(
+        self,
+        workers: int = WRITE_BEHIND_WORKERS,
+        queue_max: int = WRITE_BEHIND_QUEUE_MAX,
+        batch_max: int = WRITE_BEHIND_BATCH_MAX,
+        put_timeout_sec: float = 0.05,
+    ):
+        self.put_timeout_sec = put_timeout_sec
+        self.batch_max = max(1, batch_max)
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_max) for _ in range(max(1, workers))]
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"write-behind-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        self._closed = False
+        self._lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "errors": 0, "inline": 0}
+        for t in self._threads:
+            t.start()
+
+    def _shard(self, participant_id: str) -> queue.Queue:
+        return self._queues[zlib.crc32(str(participant_id).encode("utf-8")) % len(self._queues)]
+
+    def submit(self, participant_id: str, sink: Sink, row: Dict):
+        """sink([(participant_id, row), ...])로 백그라운드 기록을 예약."""
+        if self._closed:
+            self._call(sink, [(participant_id, row)], inline=True)
+            return
+        try:
+            self._shard(participant_id).put((sink, participant_id, row), timeout=self.put_timeout_sec)
+            with self._lock:
+                self.stats["queued"] += 1
+        except queue.Full:
+            # 순서를 지키기 위해 해당 샤드를 비운 뒤 직접 기록
+            self.flush(participant_id)
+            self._call(sink, [(participant_id, row)], inline=True)
+
+    def pending(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def flush(self, participant_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """participant_id의 샤드(없으면 전체)에 제출된 행이 모두 기록될 때까지 대기."""
+        if self._closed:
+            return True
+        qs = [self._shard(participant_id)] if participant_id is not None else self._queues
+        markers = []
+        for q in qs:
+            m = _Flush()
+            q.put(m)
+            markers.append(m)
+        return all(m.event.wait(timeout) for m in markers)
+
+    def close(self, timeout: Optional[float] = None):
+        """남은 행을 모두 기록하고 워커 종료."""
+        if self._closed:
+            return
+        self._closed = True
+        for q in self._queues:
+            q.put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+
+    def _call(self, sink: Sink, batch: List[Tuple[str, Dict]], inline: bool = False):
+        try:
+            sink(batch)
+            with self._lock:
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                if inline:
+                    self.stats["inline"] += len(batch)
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += len(batch)
+            incr("write_behind.rows_failed", len(batch))
+
+    def _run(self, q: queue.Queue):
+        while True:
+            items = [q.get()]
+            while len(items) < self.batch_max:
+                try:
+                    items.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            # 같은 sink로 가는 연속 구간을 한 번에 기록 (flush/stop 표식에서 끊음)
+            sink, batch = None, []
+            for item in items:
+                if item is _STOP or isinstance(item, _Flush):
+                    if batch:
+                        self._call(sink, batch)
+                    sink, batch = None, []
+                    if item is _STOP:
+                        return
+                    item.event.set()
+                    continue
+                s, participant_id, row = item
+                if batch and s != sink:
+                    self._call(sink, batch)
+                    batch = []
+                sink = s
+                batch.append((participant_id, row))
+            if batch:
+                self._call(sink, batch)
+
+
+_WRITER: Optional[WriteBehindWriter] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_writer() -> WriteBehindWriter:
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = WriteBehindWriter()
+            atexit.register(_WRITER.close, 10)
+        return _WRITER
@@ -0,0 +1,318 @@
+# llm_ddx_control_app/writer_daemon.py
+# 여러 Streamlit 프로세스(로드 밸런서 뒤 워커)가 결과 파일을 직접 쓰지 않고 제출하는 단일 writer 데몬.
+#   python -m llm_ddx_control_app.writer_daemon serve --socket /run/llm_ddx/writer.sock
+#   python -m llm_ddx_control_app.writer_daemon stats --socket /run/llm_ddx/writer.sock
+# 앱 프로세스는 config.WRITER_SOCKET을 같은 경로로 설정하면 persistence가 WriterClient를 로컬 백엔드로 사용합니다.
+#
+# - 데몬 안에서는 기존 WriteBehindWriter(participant_id 샤드)로 기록하므로 참가자별 도착 순서가 유지됩니다.
+#   한 앱 프로세스의 행은 하나의 연결로 순서대로 전송되고, 한 참가자의 세션은 한 프로세스에 붙어 있습니다.
+# - 결과 파일/저널 압축/체크포인트는 데몬만 씁니다 (앱의 다운로드는 로컬 파일을 다시 쓰지 않음).
+# - 데몬에 연결할 수 없으면 클라이언트가 WRITER_SPILL_DIR/{pid}.jsonl에 임시 기록하고, 데몬이 시작할 때 재생합니다.
+#   타이밍 이벤트(timing.py)는 같은 연결로 보내고, 실패하면 {pid}.events에 따로 남깁니다.
+#   체크포인트 세션 메타도 마찬가지로 {pid}.meta에 남깁니다.
+#   재생할 파일은 먼저 {이름}.replaying으로 옮겨(원자적 rename) 클레임한 뒤 읽고 지우므로, 그 사이 클라이언트가
+#   새로 남기는 행은 새 파일로 가고 함께 지워지지 않습니다. 재생 도중 중단돼 남은 *.replaying은 다음 시작 때 먼저 재생합니다.
+# - 체크포인트는 --save-dir 아래 checkpoints/에 데몬 자신의 CheckpointStore로 기록하고 읽습니다.
+
+import os
+import glob
+import signal
+import time
+import argparse
+import threading
+from collections import deque
+from multiprocessing.connection import Client, Listener
+from typing import Deque, Dict, Optional, Tuple
+
+from llm_ddx_control_app import journal
+from llm_ddx_control_app.checkpoint import CheckpointStore, checkpoint_dir, checkpointed_sink, get_checkpoints
+from llm_ddx_control_app.config import (
+    SAVE_DIR,
+    LOCAL_RESULT_FORMAT,
+    RESUME_CHECKPOINTS,
+    WRITER_SOCKET,
+    WRITER_SPILL_DIR,
+)
+from llm_ddx_control_app.metrics import REGISTRY, incr, start_exporter, timer
+from llm_ddx_control_app.storage import Batch, StorageBackend, close_all, local_backend
+from llm_ddx_control_app.timing import write_events
+from llm_ddx_control_app.write_behind import WriteBehindWriter
+
+RATE_WINDOW_SEC = 60.0
+
+
+# ---- 데몬 ----
+class WriterDaemon:
+    """Unix 소켓으로 받은 행을 로컬 백엔드(+체크포인트)에 기록하는 프로세스."""
+
+    def __init__(self, address: str = WRITER_SOCKET, kind: str = LOCAL_RESULT_FORMAT, save_dir: str = SAVE_DIR,
+                 spill_dir: str = WRITER_SPILL_DIR, checkpoints: Optional[CheckpointStore] = None):
+        if not address:
+            raise ValueError("writer socket path is empty (set WRITER_SOCKET or --socket)")
+        self.address = address
+        self.spill_dir = spill_dir
+        self.backend = local_backend(kind, save_dir)
+        if checkpoints is None:
+            checkpoints = get_checkpoints() if save_dir == SAVE_DIR else CheckpointStore(checkpoint_dir(save_dir))
+        self.checkpoints = checkpoints
+        self.sink = checkpointed_sink(self.backend, checkpoints) if RESUME_CHECKPOINTS else self.backend.write_batch
+        self.writer = WriteBehindWriter()
+        self.started = time.monotonic()
+        self.received = 0
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._listener: Optional[Listener] = None
+
+    def _count(self, n: int):
+        now = time.monotonic()
+        with self._lock:
+            self.received += n
+            self._recent.append((now, n))
+            while self._recent and now - self._recent[0][0] > RATE_WINDOW_SEC:
+                self._recent.popleft()
+        incr("writer_daemon.rows_received", n)
+
+    def submit(self, batch: Batch):
+        for pid, row in batch:
+            self.writer.submit(pid, self.sink, row)
+        self._count(len(batch))
+
+    def submit_events(self, batch: Batch):
+        for pid, row in batch:
+            self.writer.submit(pid, write_events, row)
+        incr("writer_daemon.events_received", len(batch))
+
+    def submit_meta(self, batch: Batch):
+        for pid, row in batch:
+            self.writer.submit(pid, self.checkpoints.write_meta, row)
+
+    def _claim_spill(self, ext: str):
+        """재생할 임시 기록을 *.replaying으로 옮겨 클레임 (이전 재생에서 남은 것 먼저)."""
+        claimed = sorted(glob.glob(os.path.join(self.spill_dir, f"*{ext}.replaying")))
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, f"*{ext}"))):
+            try:
+                os.replace(path, f"{path}.replaying")
+            except FileNotFoundError:
+                continue  # 다른 재생이 먼저 가져감
+            claimed.append(f"{path}.replaying")
+        return claimed
+
+    def replay_spill(self) -> int:
+        """데몬이 없을 때 앱 프로세스가 남긴 임시 기록(결과 행 *.jsonl, 이벤트 *.events, 세션 메타 *.meta)을 재생하고 삭제."""
+        n = 0
+        for ext, submit in ((".jsonl", self.submit), (".events", self.submit_events), (".meta", self.submit_meta)):
+            for path in self._claim_spill(ext):
+                rows = [(str(r.get("participant_id", "")), r) for r in journal.read_journal(path)]
+                if rows:
+                    submit(rows)
+                    n += len(rows)
+                self.writer.flush(timeout=60)
+                os.remove(path)
+        return n
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            recent = sum(n for t, n in self._recent if now - t <= RATE_WINDOW_SEC)
+            received = self.received
+        uptime = now - self.started
+        return {
+            "uptime_sec": round(uptime, 1),
+            "rows_received": received,
+            "rows_per_sec": round(received / max(uptime, 1e-9), 2),
+            "rows_per_sec_1m": round(recent / min(max(uptime, 1e-9), RATE_WINDOW_SEC), 2),
+            "pending": self.writer.pending(),
+            "writer": dict(self.writer.stats),
+            "metrics": REGISTRY.snapshot(),
+        }
+
+    def _handle(self, conn):
+        with conn:
+            while not self._stopped.is_set():
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    return
+                op = msg[0]
+                try:
+                    if op == "rows":
+                        self.submit(msg[1])
+                    elif op == "events":
+                        self.submit_events(msg[1])
+                    elif op == "meta":
+                        self.submit_meta(msg[1])
+                    elif op == "flush":
+                        _, pid, arm, compact = msg
+                        with timer("writer_daemon.flush"):
+                            ok = self.writer.flush(pid, 30)
+                            if compact:
+                                self.backend.flush(pid, arm)
+                        conn.send(ok)
+                    elif op == "checkpoint":
+                        _, pid, arm = msg
+                        self.writer.flush(pid, 30)
+                        conn.send(self.checkpoints.load(pid, arm))
+                    elif op == "stats":
+                        conn.send(self.stats())
+                    else:
+                        conn.send(ValueError(f"unknown op: {op}"))
+                except (EOFError, OSError):
+                    return
+                except Exception as e:
+                    incr("writer_daemon.errors")
+                    if op not in ("rows", "events", "meta"):
+                        conn.send(e)  # 클라이언트에서 다시 raise (rows/events/meta는 응답을 기다리지 않으므로 지표로만)
+
+    def serve_forever(self):
+        os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # 이전 실행이 남긴 소켓 파일
+        self._listener = Listener(self.address, family="AF_UNIX")
+        os.chmod(self.address, 0o660)
+        start_exporter()
+        replayed = self.replay_spill()
+        print(f"writer daemon listening on {self.address} (backend={self.backend.name}, replayed={replayed})", flush=True)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    conn = self._listener.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._handle, args=(conn,), name="writer-daemon-conn", daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+        self.writer.close(30)
+        close_all()
+        if os.path.exists(self.address):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+
+# ---- 앱 프로세스 쪽 클라이언트 ----
+class WriterClient(StorageBackend):
+    """writer 데몬으로 행을 보내는 StorageBackend (프로세스당 연결 1개, 끊기면 한 번 재연결)."""
+
+    name = "daemon"
+
+    def __init__(self, address: str = WRITER_SOCKET, save_dir: str = SAVE_DIR, spill_dir: str = WRITER_SPILL_DIR):
+        super().__init__(save_dir)
+        self.address = address
+        self.spill_dir = spill_dir
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _call(self, msg: tuple, reply: bool = False):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = Client(self.address, family="AF_UNIX")
+                    self._conn.send(msg)
+                    result = self._conn.recv() if reply else None
+                    break
+                except (OSError, EOFError):
+                    self._close_conn()
+                    if attempt:
+                        raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _close_conn(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def _send(self, op: str, batch: Batch, spill_ext: str):
+        try:
+            with timer("writer_daemon.send"):
+                self._call((op, list(batch)))
+        except (OSError, EOFError):
+            # 데몬이 없으면 프로세스 전용 파일에 남겨 두고 다음 데몬 시작 때 재생
+            path = os.path.join(self.spill_dir, f"{os.getpid()}{spill_ext}")
+            for _, row in batch:
+                journal.append_row(path, row)
+            journal.close_journal(path)  # 데몬이 재생 후 지울 수 있도록 핸들을 잡아 두지 않음
+            incr("writer_daemon.spilled", len(batch))
+
+    def write_batch(self, batch: Batch):
+        self._send("rows", batch, ".jsonl")
+
+    def write_events(self, batch: Batch):
+        """타이밍 이벤트 배치 (데몬이 이벤트 저널에 기록)."""
+        self._send("events", batch, ".events")
+
+    def write_checkpoint_meta(self, batch: Batch):
+        """체크포인트 세션 메타 배치 (데몬이 결과 행과 같은 샤드에서 기록)."""
+        self._send("meta", batch, ".meta")
+
+    def flush(self, participant_id: Optional[str] = None, arm: str = "control"):
+        try:
+            self._call(("flush", participant_id, arm, participant_id is not None), reply=True)
+        except (OSError, EOFError):
+            pass  # 데몬이 없으면 임시 기록만 남음 (다음 데몬 시작 때 반영)
+
+    def load_checkpoint(self, participant_id: str, arm: str = "control") -> Optional[Dict]:
+        return self._call(("checkpoint", participant_id, arm), reply=True)
+
+    def stats(self) -> Dict:
+        return self._call(("stats",), reply=True)
+
+    def close(self):
+        with self._lock:
+            self._close_conn()
+
+
+_CLIENT: Optional[WriterClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> WriterClient:
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = WriterClient()
+        return _CLIENT
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="결과 저장 단일 writer 데몬")
+    ap.add_argument("cmd", choices=["serve", "stats"])
+    ap.add_argument("--socket", default=WRITER_SOCKET)
+    ap.add_argument("--backend", default=LOCAL_RESULT_FORMAT, choices=["csv", "journal", "sqlite"])
+    ap.add_argument("--save-dir", default=SAVE_DIR)
+    args = ap.parse_args(argv)
+    if args.cmd == "serve":
+        daemon = WriterDaemon(args.socket, args.backend, args.save_dir)
+
+        def _terminate(signum, frame):
+            raise KeyboardInterrupt  # SIGTERM도 남은 행을 기록하고 종료
+
+        signal.signal(signal.SIGTERM, _terminate)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            daemon.close()
+    else:
+        import json
+        print(json.dumps(WriterClient(args.socket).stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()